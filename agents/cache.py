@@ -0,0 +1,109 @@
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.tools import StructuredTool
+
+# Default number of entries kept by each cache
+CACHE_SIZE = 256
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with optional per-entry expiry and
+    hit/miss counters.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+def is_cacheable(result):
+    """
+    False for results that report a failure or a stale fallback: error
+    dicts ({"status": "error"}, {"stale": True}) and "❌ ..." messages.
+    """
+    if isinstance(result, dict):
+        return result.get("status", "ok") == "ok" and not result.get("stale")
+    if isinstance(result, str):
+        return not result.lstrip().startswith("❌")
+    return True
+
+
+def cached_tool(tool, cache, scope, ttl=None, on_uncacheable=None):
+    """
+    Copy of `tool` whose results are memoized in `cache`. The key is the
+    tool name, its arguments and whatever scope() returns (e.g. the store
+    version and today's date), so results go stale as soon as that changes.
+    Failed and stale results are returned but not memoized, and reported
+    to on_uncacheable() so answers built on them aren't cached either.
+    """
+    def run(**kwargs):
+        key = (tool.name, json.dumps(kwargs, sort_keys=True, default=str), *scope())
+        result = cache.get(key)
+        if result is None:
+            result = tool.invoke(kwargs)
+            if is_cacheable(result):
+                cache.put(key, result, ttl=ttl)
+            elif on_uncacheable:
+                on_uncacheable()
+        return copy.deepcopy(result)
+
+    return StructuredTool.from_function(
+        func=run, name=tool.name, description=tool.description, args_schema=tool.args_schema
+    )
+
+
+def write_tool(tool, on_write):
+    """Copy of `tool` that calls on_write() after every run."""
+    def run(**kwargs):
+        try:
+            return tool.invoke(kwargs)
+        finally:
+            on_write()
+
+    return StructuredTool.from_function(
+        func=run, name=tool.name, description=tool.description, args_schema=tool.args_schema
+    )
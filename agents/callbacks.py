@@ -0,0 +1,62 @@
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.tracing import tracer
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records a span per LLM call (latency and token counts) and per tool
+    call (wall time and argument size) into the turn that was current when
+    the handler was created.
+    """
+
+    def __init__(self, turn=None):
+        self.turn = turn if turn is not None else tracer.current_turn()
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, name, **attrs):
+        with self._lock:
+            self._started[run_id] = (name, time.perf_counter(), attrs)
+
+    def _end(self, run_id, kind, **attrs):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        name, start, start_attrs = started
+        tracer.record(kind, name, time.perf_counter() - start, turn=self.turn or False, **start_attrs, **attrs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name") or "chat_model")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name") or "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if not usage and response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+            metadata = getattr(message, "usage_metadata", None) or {}
+            usage = {"prompt_tokens": metadata.get("input_tokens"), "completion_tokens": metadata.get("output_tokens")}
+        self._end(run_id, "llm", prompt_tokens=usage.get("prompt_tokens") or 0,
+                  completion_tokens=usage.get("completion_tokens") or 0)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "llm", error=type(error).__name__)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        # The cache wrappers invoke the real tool inside their own run
+        with self._lock:
+            if parent_run_id in self._started:
+                return
+        self._start(run_id, (serialized or {}).get("name") or "tool", arg_bytes=len(input_str.encode("utf-8")))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, "tool")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "tool", error=type(error).__name__)
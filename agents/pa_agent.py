@@ -1,19 +1,37 @@
 import os
+import re
+import contextvars
 from datetime import datetime
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-from tools.event_scheduler import schedule_event
+from tools.event_scheduler import schedule_event, schedule_events
 from tools.get_events import get_event_schedule
 from tools.find_and_edit_tool import find_and_edit_event
 from tools.find_event_tool import find_event
 from tools.date_resolver_tool import resolve_day_from_date, resolve_date_from_phrase
-from tools.get_codeforces_contests import get_codeforces_contests_on_date
+from tools.get_codeforces_contests import get_codeforces_contests_on_date, CACHE_TTL
+from storage.event_store import get_store
+from agents.cache import LRUCache, cached_tool, write_tool
+from agents.callbacks import TracingCallbackHandler
+
+# Seconds a final answer stays cached (it may include Codeforces data)
+RESPONSE_TTL = int(os.getenv("PACLI_RESPONSE_TTL", "600"))
+
+
+# Per-request state; tools running on worker threads share it through the
+# copied context, so a write anywhere in the request is seen by run/arun
+_request_state = contextvars.ContextVar("request_state", default=None)
+
+
+def normalize_input(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower()).rstrip("?!. ")
+
 
 class PersonalAssistantAgent:
-    def __init__(self):
+    def __init__(self, verbose: bool = True):
         load_dotenv()
         self.llm = ChatGroq(model_name="llama3-70b-8192", temperature=0)
 
@@ -43,10 +61,97 @@ class PersonalAssistantAgent:
             MessagesPlaceholder(variable_name="agent_scratchpad")
         ])
 
-        self.tools = [get_codeforces_contests_on_date, resolve_date_from_phrase, resolve_day_from_date, get_event_schedule, schedule_event, find_and_edit_event, find_event]
+        # Read-only tools are memoized per store version and date (unless they
+        # failed or fell back to stale data); write tools drop every cached
+        # answer when they run
+        self.tool_cache = LRUCache()
+        self.response_cache = LRUCache()
+
+        def cached(tool, scope, ttl=None):
+            return cached_tool(tool, self.tool_cache, scope, ttl=ttl, on_uncacheable=self._on_uncacheable)
+
+        self.tools = [
+            cached(get_codeforces_contests_on_date, self._date_scope, ttl=CACHE_TTL),
+            cached(resolve_date_from_phrase, self._date_scope),
+            cached(resolve_day_from_date, self._date_scope),
+            cached(get_event_schedule, self._store_scope),
+            write_tool(schedule_event, self._on_write),
+            write_tool(schedule_events, self._on_write),
+            write_tool(find_and_edit_event, self._on_write),
+            cached(find_event, self._store_scope),
+        ]
         self.agent = create_tool_calling_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
-        self.agent_executor = AgentExecutor(agent=self.agent, tools=self.tools, verbose=True)
+        self.agent_executor = AgentExecutor(agent=self.agent, tools=self.tools, verbose=verbose)
+
+    def _date_scope(self):
+        return (datetime.now().date().isoformat(),)
+
+    def _store_scope(self):
+        store = get_store()
+        store.refresh()
+        return (datetime.now().date().isoformat(), store.version)
+
+    def _on_write(self):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        self.response_cache.clear()
+
+    def _on_uncacheable(self):
+        state = _request_state.get()
+        if state is not None:
+            state["uncacheable"] = True
 
     def run(self, user_input: str) -> str:
-        result = self.agent_executor.invoke({"input": user_input})
-        return result["output"]
\ No newline at end of file
+        key = (normalize_input(user_input), *self._store_scope())
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        state = {"wrote": False, "uncacheable": False}
+        token = _request_state.set(state)
+        try:
+            result = self.agent_executor.invoke(
+                {"input": user_input}, config={"callbacks": [TracingCallbackHandler()]}
+            )
+        finally:
+            _request_state.reset(token)
+        # Requests that changed something, or were answered from a failed or
+        # stale tool result, must run again if repeated
+        if not state["wrote"] and not state["uncacheable"]:
+            self.response_cache.put(key, result["output"], ttl=RESPONSE_TTL)
+        return result["output"]
+
+    async def arun(self, user_input: str, on_token=None) -> str:
+        """
+        Async version of run(). Model tokens are passed to on_token as they
+        arrive. Tool calls requested in the same step run concurrently, the
+        blocking ones on the event loop's default executor. Cancelling the
+        task abandons the request.
+        """
+        key = (normalize_input(user_input), *self._store_scope())
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        state = {"wrote": False, "uncacheable": False}
+        token = _request_state.set(state)
+        output = None
+        try:
+            async for event in self.agent_executor.astream_events(
+                {"input": user_input}, config={"callbacks": [TracingCallbackHandler()]}, version="v2"
+            ):
+                if event["event"] == "on_chat_model_stream" and on_token:
+                    content = event["data"]["chunk"].content
+                    if content:
+                        on_token(content)
+                elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+                    output = event["data"]["output"]["output"]
+        finally:
+            _request_state.reset(token)
+        if output is not None and not state["wrote"] and not state["uncacheable"]:
+            self.response_cache.put(key, output, ttl=RESPONSE_TTL)
+        return output
+
+    def cache_stats(self) -> dict:
+        return {"tools": self.tool_cache.stats(), "responses": self.response_cache.stats()}
\ No newline at end of file
@@ -0,0 +1,230 @@
+import importlib
+import json
+import re
+import threading
+from collections import Counter
+
+from utils.date_utils import resolve_date_phrase
+from utils.tracing import tracer
+
+_SCHEDULE = re.compile(
+    r"^(?:(?:show|list|display|get|give)(?: me)?(?: all)?(?: of)?(?: my)?"
+    r" (?:events|schedule|calendar|plans)"
+    # "what is ..." alone is as likely a date question ("what is tomorrow"), so
+    # require a cue: on, events, schedule/calendar or do i have
+    r"|what(?:'s| is)(?: on)?(?: my)? (?:schedule|calendar|events|plans)|what(?:'s| is) on"
+    r"|what do i have(?: on| planned)?"
+    r"|what events do i have|do i have any(?:thing| events| plans)?|my (?:events|schedule))"
+    r"(?: (?:for|on|in|during|from))? (?P<when>.+)$"
+)
+_CODEFORCES = re.compile(
+    r"^(?:(?:show|list|get|find|any|what are)(?: me)?(?: the)?(?: upcoming)? )?"
+    r"(?:upcoming )?codeforces (?:contests?|rounds?)(?: (?:on|for|in))?(?: (?P<when>.+))?$"
+)
+_DELETE = re.compile(
+    r"^(?:delete|remove|cancel)(?: the| my)?(?: event)? (?P<name>.+?) (?:on|for) (?P<when>.+)$"
+)
+_FIND = re.compile(
+    r"^(?:find|search for|look up|lookup|when is|where is)(?: the| my)?(?: event)? (?P<name>.+?)"
+    r"(?: (?:on|for) (?P<when>.+))?$"
+)
+# Names that mean the request isn't about a single named event
+# Tools are imported on first use so the router costs nothing at startup
+TOOLS = {
+    "get_event_schedule": "tools.get_events",
+    "find_event": "tools.find_event_tool",
+    "find_and_edit_event": "tools.find_and_edit_tool",
+    "get_codeforces_contests_on_date": "tools.get_codeforces_contests",
+}
+_GENERIC_NAMES = ("event", "events", "all", "anything", "everything", "my events", "codeforces")
+
+
+def _normalize(text):
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?!. ")
+
+
+def parse_day(phrase):
+    """
+    Resolve a single-day phrase ('today', 'tomorrow', 'friday', an explicit
+    date, ...) with the built-in date grammar. Returns None for ranges and
+    for anything that would need dateparser.
+    """
+    period = resolve_date_phrase(phrase, fallback=False)
+    if period and period[0] == period[1]:
+        return period[0]
+    return None
+
+
+def parse_period(phrase):
+    """
+    Resolve a period phrase to an inclusive (start, end) date range, or
+    None if the built-in date grammar doesn't know it.
+    """
+    return resolve_date_phrase(phrase, fallback=False)
+
+
+def exact_event_name(name, day):
+    """
+    The stored name of the one event on `day` whose name is exactly `name`
+    (ignoring case and spacing), or None. Deletes are only fast-pathed
+    when there is nothing to guess.
+    """
+    from storage.event_store import get_store
+    from storage.search_index import normalize_name
+    store = get_store()
+    matches = [e for e in store.on_date(day) if normalize_name(e.get("event_name")) == normalize_name(name)]
+    if store.error or len(matches) != 1:
+        return None
+    return matches[0]["event_name"]
+
+
+def format_schedule(result):
+    if not isinstance(result, dict):
+        return None
+    if result.get("status") != "ok":
+        return f"📭 {result.get('message', 'No events found.')}"
+    lines = [f"📅 Events from {result['start_date']} to {result['end_date']}:"]
+    for e in result["events"]:
+        line = f"- {e['event_name']} ({e['date']}, {e['day']})"
+        if e.get("time"):
+            line += f" at {e['time']}"
+        if e.get("extra_info") and e["extra_info"] != "None":
+            line += f" — {e['extra_info']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_found(found_json):
+    try:
+        found = json.loads(found_json)
+    except (TypeError, ValueError):
+        # A plain "❌ ..." message (e.g. a corrupted store); the agent explains it
+        return None
+    if isinstance(found, dict) and "error" in found:
+        return f"❌ {found['error']}"
+    events = found if isinstance(found, list) else [found]
+    lines = ["🔎 Found:"]
+    for e in events:
+        line = f"- {e.get('event_name')} ({e.get('date')}, {e.get('day')})"
+        if e.get("time"):
+            line += f" at {e['time']}"
+        if e.get("extra_info") and e["extra_info"] != "None":
+            line += f" — {e['extra_info']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_contests(result):
+    if not isinstance(result, dict):
+        return None
+    if result.get("status") != "ok":
+        return f"❌ {result.get('message', 'Could not fetch Codeforces contests.')}"
+    if not result["contests"]:
+        return "📭 No upcoming Codeforces contests" + (f" on {result['date']}." if result.get("date") else ".")
+    lines = ["🏁 Codeforces contests:"] + [f"- {c}" for c in result["contests"]]
+    if result.get("stale"):
+        lines.append(result["message"])
+    return "\n".join(lines)
+
+
+class IntentRouter:
+    """
+    Rule-based fast path in front of the LLM agent.
+
+    High-confidence requests (listing events for a period, finding or
+    deleting an event on a given day, Codeforces contests) are matched with
+    a small grammar, their dates resolved locally, and the tool called
+    directly. Anything the grammar isn't sure about returns None and goes to
+    the agent. Hits and misses are counted so the share of traffic kept
+    away from the LLM is visible.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.by_intent = Counter()
+        self._lock = threading.Lock()
+
+    def match(self, text):
+        """
+        Return (intent, tool name, args, formatter) for a recognized request,
+        or None.
+        """
+        text = _normalize(text)
+
+        match = _CODEFORCES.match(text)
+        if match:
+            when = match["when"]
+            if when in (None, "", "upcoming"):
+                return "codeforces", "get_codeforces_contests_on_date", {"date_str": None}, format_contests
+            day = parse_day(when)
+            if day:
+                return ("codeforces", "get_codeforces_contests_on_date",
+                        {"date_str": day.strftime("%d-%m-%Y")}, format_contests)
+            return None
+
+        match = _SCHEDULE.match(text)
+        if match:
+            period = parse_period(match["when"])
+            if period:
+                start, end = period
+                return ("schedule", "get_event_schedule",
+                        {"start_date_str": start.strftime("%d-%m-%Y"), "end_date_str": end.strftime("%d-%m-%Y")},
+                        format_schedule)
+            return None
+
+        match = _DELETE.match(text)
+        if match:
+            day = parse_day(match["when"])
+            name = exact_event_name(match["name"], day) if day else None
+            if name:
+                return ("delete", "find_and_edit_event",
+                        {"event_name": name, "field_to_edit": "delete", "new_value": "",
+                         "date": day.strftime("%d-%m-%Y")},
+                        str)
+            return None
+
+        match = _FIND.match(text)
+        if match and not match["name"].startswith(_GENERIC_NAMES) and "codeforces" not in match["name"]:
+            date_str = ""
+            if match["when"]:
+                day = parse_day(match["when"])
+                if not day:
+                    return None
+                date_str = day.strftime("%d-%m-%Y")
+            return ("find", "find_event", {"event_name": match["name"], "date": date_str, "time": ""},
+                    format_found)
+        return None
+
+    def route(self, text):
+        """
+        Answer `text` directly if it is a recognized intent.
+        Returns the response string, or None to fall back to the agent,
+        also when the tool's result isn't one the formatter understands.
+        """
+        matched = self.match(text)
+        output = None
+        if matched is not None:
+            intent, tool_name, args, formatter = matched
+            tool = getattr(importlib.import_module(TOOLS[tool_name]), tool_name)
+            with tracer.span("tool", tool_name, arg_bytes=len(json.dumps(args))):
+                result = tool.invoke(args)
+            output = formatter(result)
+        with self._lock:
+            if output is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.by_intent[intent] += 1
+        return output
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "by_intent": dict(self.by_intent),
+            }
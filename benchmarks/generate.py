@@ -0,0 +1,88 @@
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+from storage.event_store import with_canonical_fields
+
+NAMES = [
+    "OA", "Interview", "Team standup", "Dentist appointment", "Codeforces Round", "Project review",
+    "Gym", "Doctor visit", "Lab submission", "Mock interview", "Hackathon", "Client call",
+    "Birthday party", "Flight", "Sprint planning", "Book club", "Exam", "Guitar lesson",
+]
+QUALIFIERS = [
+    "Google", "Amazon", "Microsoft", "Atlassian", "with Priya", "with Rahul", "Div. 2", "Div. 3",
+    "Phase 1", "Phase 2", "CS301", "MA202", "weekly", "final", "round 1", "round 2",
+]
+EXTRA_WORDS = (
+    "bring laptop charger and ID card join the meeting link ten minutes early prepare system "
+    "design notes revise graphs dynamic programming and trees confirm venue with the organisers "
+    "share the agenda beforehand carry printed resume and certificates"
+).split()
+
+
+def _extra_info(rng):
+    if rng.random() < 0.4:
+        return "None"
+    return " ".join(rng.choice(EXTRA_WORDS) for _ in range(rng.randint(5, 80)))
+
+
+def generate_events(n, seed=42, center=None, span_days=730):
+    """
+    Generate n realistic events spread over span_days around center
+    (default today): mixed names, dates, times and visibility, and
+    extra_info from empty to a few hundred characters. The same seed always
+    yields the same calendar.
+    """
+    rng = random.Random(seed)
+    center = center or date.today()
+    first_day = center - timedelta(days=span_days // 2)
+    events = []
+    for i in range(n):
+        day = first_day + timedelta(days=rng.randrange(span_days))
+        name = rng.choice(NAMES)
+        if rng.random() < 0.7:
+            name = f"{name} {rng.choice(QUALIFIERS)}"
+        if rng.random() < 0.3:
+            name = f"{name} #{rng.randint(1, 999)}"
+        time_str = ""
+        if rng.random() < 0.8:
+            time_str = f"{rng.randint(1, 12)}:{rng.choice(['00', '15', '30', '45'])} {rng.choice(['AM', 'PM'])}"
+        events.append(with_canonical_fields({
+            "id": f"bench{i:07x}",
+            "event_name": name,
+            "date": day.strftime("%d-%m-%Y"),
+            "day": day.strftime("%A"),
+            "month": day.strftime("%B"),
+            "year": day.year,
+            "time": time_str,
+            "extra_info": _extra_info(rng),
+            "public": rng.random() < 0.75,
+        }))
+    return events
+
+
+def calendar_bytes(events, shuffled=False, seed=42):
+    """Serialize events like event_data.json; shuffled files need sorting on load."""
+    if shuffled:
+        events = list(events)
+        random.Random(seed).shuffle(events)
+    return json.dumps(events, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def write_calendar(path, n, seed=42, shuffled=False):
+    events = generate_events(n, seed=seed)
+    with open(path, "wb") as f:
+        f.write(calendar_bytes(events, shuffled=shuffled, seed=seed))
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic event_data.json")
+    parser.add_argument("path")
+    parser.add_argument("-n", "--events", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--shuffled", action="store_true", help="write events out of date order")
+    args = parser.parse_args()
+    write_calendar(args.path, args.events, seed=args.seed, shuffled=args.shuffled)
+    print(f"Wrote {args.events} events to {args.path}")
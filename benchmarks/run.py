@@ -0,0 +1,339 @@
+"""
+Benchmarks for PACLI's hot paths on synthetic calendars.
+
+    python -m benchmarks.run                          # 1k, 10k, 100k events
+    python -m benchmarks.run --sizes 1000000          # 1M events
+    python -m benchmarks.run --save-baseline          # write benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Every size gets a fresh calendar in a temporary directory (the real
+events/ folder is never touched) and a stub SMTP server in place of Gmail.
+Each operation reports latency percentiles, throughput and the peak
+memory traced during one extra run, and each size also reports the
+memory the loaded store keeps per event. The last operations archive the
+older months (see storage.archive) and time loads and range queries
+against what is left. Results can be saved as JSON and compared against a saved
+baseline; any operation whose p50 regresses past --threshold makes the
+run exit with status 1.
+
+Calendars are centred on a benchmark date (today, or --today) and every
+date-relative query uses it instead of the clock. The date is saved with
+the results, and a --baseline run reuses the baseline's, so both runs
+see the same calendar and query windows.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from benchmarks.generate import calendar_bytes, generate_events
+from benchmarks.smtp_stub import StubSMTPServer
+from storage.archive import months_before
+from storage.event_store import EventStore, set_store
+from storage.search_index import SearchIndex, get_search_index
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# p50 slower than baseline by more than this factor counts as a regression
+REGRESSION_THRESHOLD = 1.25
+# ...unless the absolute difference is below this (timer noise)
+NOISE_FLOOR_MS = 0.05
+DIGEST_RECIPIENTS = 20
+BULK_EVENTS = 50
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1))))]
+
+
+def measure(fn, iterations, setup=None):
+    """
+    Time fn(i) for each iteration (setup(i), if given, runs untimed first),
+    then run it once more under tracemalloc for the peak allocation.
+    """
+    timings = []
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup(iterations)
+    tracemalloc.start()
+    try:
+        fn(iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "mean_ms": total / iterations * 1000,
+        "ops_per_s": iterations / total if total else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def bench_size(n, seed, iterations, cold_iterations, smtp, today):
+    from tools.event_scheduler import schedule_event, schedule_events
+    from tools.find_and_edit_tool import find_and_edit_event
+    from tools.find_event_tool import find_event
+    from tools.get_events import get_event_schedule
+    from sort_events_json import sort_events_json
+    from utils.digest import DEFAULT_WINDOWS, DigestEngine, parse_windows
+    import send_scheduled_mail
+
+    rng = random.Random(seed)
+    events = generate_events(n, seed=seed, center=today)
+    shuffled = calendar_bytes(events, shuffled=True, seed=seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="pacli-bench-") as tmp:
+        path = os.path.join(tmp, "event_data.json")
+        journal = os.path.splitext(path)[0] + ".journal"
+
+        def write_shuffled(_):
+            with open(path, "wb") as f:
+                f.write(shuffled)
+            if os.path.exists(journal):
+                os.remove(journal)
+            set_store(EventStore(path))
+
+        # Cold start on a hand-edited (unsorted) file: load, sort, rewrite
+        results["sort_events_json"] = measure(lambda i: sort_events_json(), cold_iterations, setup=write_shuffled)
+        # Cold load of an already sorted file
+        results["load"] = measure(lambda i: EventStore(path).refresh(), cold_iterations)
+        resident = resident_bytes(path) / n
+
+        store = EventStore(path)
+        store.refresh()
+        set_store(store)
+        # Each build gets its own loaded store, so no extra index stays subscribed to `store`
+        fresh = {}
+
+        def load_fresh(_):
+            fresh["store"] = EventStore(path)
+            fresh["store"].refresh()
+
+        results["index_build"] = measure(lambda i: SearchIndex(fresh["store"]), cold_iterations, setup=load_fresh)
+        fresh.clear()
+        get_search_index()
+
+        windows = [(today + timedelta(days=rng.randrange(-300, 300))) for _ in range(iterations + 1)]
+        results["get_event_schedule"] = measure(lambda i: get_event_schedule.invoke({
+            "start_date_str": windows[i].strftime("%d-%m-%Y"),
+            "end_date_str": (windows[i] + timedelta(days=6)).strftime("%d-%m-%Y"),
+        }), iterations)
+
+        # Quarter-long public-only scans, like the mailer and month views; own RNG
+        # so the other operations keep their inputs
+        quarter_rng = random.Random(seed + 1)
+        quarters = [today + timedelta(days=quarter_rng.randrange(-300, 210)) for _ in range(iterations + 1)]
+        results["range_filter"] = measure(
+            lambda i: store.range(quarters[i], quarters[i] + timedelta(days=89), public=True), iterations)
+
+        targets = [rng.choice(events) for _ in range(iterations + 1)]
+        results["find_event"] = measure(lambda i: find_event.invoke({
+            "event_name": targets[i]["event_name"].lower(),
+            "date": targets[i]["date"] if i % 2 else "",
+            "time": "",
+        }), iterations)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["find_and_edit_event"] = measure(lambda i: find_and_edit_event.invoke({
+                "event_name": targets[i]["event_name"],
+                "field_to_edit": "extra_info",
+                "new_value": f"edited {i}",
+                "date": targets[i]["date"],
+                "time": targets[i]["time"],
+            }), iterations)
+
+            results["schedule_event"] = measure(lambda i: schedule_event.invoke({
+                "date": windows[i].strftime("%d-%m-%Y"),
+                "time": "10:00 AM",
+                "event_name": f"Benchmark event {i}",
+                "extra_info": "",
+                "public": bool(i % 2),
+            }), iterations)
+
+            # A timetable import: BULK_EVENTS events in one call and one write
+            results["schedule_events"] = measure(lambda i: schedule_events.invoke({"events": [{
+                "date": (windows[i] + timedelta(days=j % 7)).strftime("%d-%m-%Y"),
+                "time": f"{j % 12 + 1}:00 PM",
+                "event_name": f"Bulk event {i}-{j}",
+            } for j in range(BULK_EVENTS)]}), iterations)
+
+        digest_windows = parse_windows(DEFAULT_WINDOWS, today)
+        keys = tuple(w.key for w in digest_windows)
+
+        def build_digests(_):
+            upcoming = store.range(today + timedelta(days=1), max(w.end for w in digest_windows))
+            engine = DigestEngine(upcoming, digest_windows)
+            engine.digest(keys, public_only=True)
+            engine.digest(keys)
+
+        results["digest"] = measure(build_digests, iterations)
+
+        # Whole mailer run (range read, digests, delivery) against the stub server
+        os.environ.update({"SMTP_HOST": "127.0.0.1", "SMTP_PORT": str(smtp.port), "SMTP_SECURITY": "none"})
+        send_scheduled_mail.GMAIL_ADDRESS = "pacli-benchmark@example.com"
+        send_scheduled_mail.GMAIL_APP_PASSWORD = "benchmark"
+        send_scheduled_mail.MY_EMAIL = "owner@example.com"
+        send_scheduled_mail.RECIPIENT_EMAILS = [f"recipient{i}@example.com" for i in range(DIGEST_RECIPIENTS)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["send_scheduled_mail"] = measure(lambda i: send_scheduled_mail.send_scheduled_mail(today),
+                                                     cold_iterations)
+        store._wait_for_compactor()
+
+        # Move everything before the last KEEP_MONTHS months into the archive,
+        # then check that recent queries and loads only pay for live events
+        cutoff = months_before(today)
+        results["archive"] = measure(lambda i: store.archive_before(cutoff), 1)
+        results["load_archived"] = measure(lambda i: EventStore(path).refresh(), cold_iterations)
+        week = today - timedelta(days=today.weekday())
+        results["this_week_archived"] = measure(lambda i: store.range(week, week + timedelta(days=6)), iterations)
+        past = [cutoff - timedelta(days=rng.randrange(7, 300)) for _ in range(iterations + 1)]
+        results["archived_range"] = measure(lambda i: store.range(past[i], past[i] + timedelta(days=6)), iterations)
+        store._wait_for_compactor()
+    return results, resident
+
+
+def resident_bytes(path):
+    """Memory a loaded store keeps for its events, i.e. what a long-running process pays."""
+    tracemalloc.start()
+    try:
+        store = EventStore(path)
+        store.refresh()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del store
+    return retained
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Return (size, op, baseline p50, current p50) for every regressed operation."""
+    regressions = []
+    for size, ops in current["results"].items():
+        for op, stats in ops.items():
+            base = baseline.get("results", {}).get(size, {}).get(op)
+            if not base:
+                continue
+            if (stats["p50_ms"] > base["p50_ms"] * threshold
+                    and stats["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS):
+                regressions.append((size, op, base["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+def print_report(current, baseline=None):
+    for size, ops in current["results"].items():
+        resident = current.get("resident", {}).get(size)
+        print(f"\n{int(size):,} events")
+        header = f"  {'operation':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>11}{'peak KiB':>11}"
+        if baseline:
+            header += f"{'base p50':>10}{'change':>9}"
+        print(header)
+        for op, s in ops.items():
+            line = (f"  {op:<22}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}"
+                    f"{s['ops_per_s']:>11.1f}{s['peak_kb']:>11.0f}")
+            base = (baseline or {}).get("results", {}).get(size, {}).get(op)
+            if base:
+                change = (s["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0.0
+                line += f"{base['p50_ms']:>10.3f}{change:>+8.0f}%"
+            print(line)
+        if resident is not None:
+            line = f"  resident store: {resident:.0f} bytes/event"
+            base = (baseline or {}).get("resident", {}).get(size)
+            if base:
+                line += f" (baseline {base:.0f})"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PACLI's hot paths on synthetic calendars")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated calendar sizes (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", help="benchmark date, DD-MM-YYYY (default: the baseline's, else today)")
+    parser.add_argument("--iterations", type=int, default=200, help="runs per warm operation")
+    parser.add_argument("--cold-iterations", type=int, default=3, help="runs per load/sort/mail operation")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write results to {BASELINE_FILE}")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="p50 slowdown factor that counts as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.today:
+        today = datetime.strptime(args.today, "%d-%m-%Y").date()
+    elif baseline and baseline.get("meta", {}).get("today"):
+        today = date.fromisoformat(baseline["meta"]["today"])
+    else:
+        today = date.today()
+    current = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "today": today.isoformat(),
+            "iterations": args.iterations,
+            "cold_iterations": args.cold_iterations,
+        },
+        "results": {},
+        "resident": {},
+    }
+    smtp = StubSMTPServer().start()
+    try:
+        for n in sizes:
+            print(f"Benchmarking {n:,} events...", file=sys.stderr)
+            current["results"][str(n)], current["resident"][str(n)] = bench_size(
+                n, args.seed, args.iterations, args.cold_iterations, smtp, today)
+    finally:
+        smtp.stop()
+        set_store(None)
+    current["meta"]["smtp_messages"] = smtp.messages
+    current["meta"]["smtp_connections"] = smtp.connections
+
+    print_report(current, baseline)
+
+    for path in filter(None, [args.output, BASELINE_FILE if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nSaved results to {path}")
+
+    if baseline:
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for size, op, before, after in regressions:
+                print(f"  {op} @ {int(size):,} events: p50 {before:.3f} ms -> {after:.3f} ms")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import Calendar from "react-calendar";
 import "react-calendar/dist/Calendar.css";
 import './calendar-custom.css';
@@ -11,6 +11,38 @@ function formatDate(date) {
   return `${d}-${m}-${y}`;
 }
 
+function startOfMonth(date) {
+  return new Date(date.getFullYear(), date.getMonth(), 1);
+}
+
+function endOfMonth(date) {
+  return new Date(date.getFullYear(), date.getMonth() + 1, 0);
+}
+
+function parseDate(str) {
+  const [d, m, y] = str.split("-").map(Number);
+  return new Date(y, m - 1, d);
+}
+
+// Apply upserts/deletes from the server's change log to the loaded month
+function applyChanges(events, changes, month) {
+  const byId = new Map(events.map(e => [e.id, e]));
+  for (const change of changes) {
+    if (change.op === "delete") {
+      byId.delete(change.id);
+    } else {
+      const e = change.event;
+      const date = parseDate(e.date);
+      if (date >= startOfMonth(month) && date <= endOfMonth(month)) {
+        byId.set(e.id, e);
+      } else {
+        byId.delete(e.id); // moved out of the visible month
+      }
+    }
+  }
+  return [...byId.values()].sort((a, b) => parseDate(a.date) - parseDate(b.date));
+}
+
 function CalendarEvents() {
   const [selectedDate, setSelectedDate] = useState(null);
   const [events, setEvents] = useState([]);
@@ -18,19 +50,31 @@ function CalendarEvents() {
   const [error, setError] = useState(null);
   const [showToast, setShowToast] = useState(false);
   const [toastMessage, setToastMessage] = useState("");
+  // First day of the month currently shown by the calendar
+  const [activeMonth, setActiveMonth] = useState(startOfMonth(new Date()));
+  const activeMonthRef = useRef(activeMonth);
+  // Store version ({boot, version}) the loaded events correspond to
+  const versionRef = useRef(null);
 
   // Use local network IP for event data fetch
-  const EVENTS_API_URL = window.location.hostname === "localhost"
-    ? "http://localhost:8000/events/event_data.json"
-    : `http://${window.location.hostname}:8000/events/event_data.json`;
+  const API_BASE = window.location.hostname === "localhost"
+    ? "http://localhost:8000"
+    : `http://${window.location.hostname}:8000`;
+  const EVENTS_API_URL = `${API_BASE}/api/events`;
 
-  // Fetch events from backend
-  const fetchEvents = () => {
+  // Fetch only the visible month; the server answers repeat requests with 304
+  const fetchEvents = (month = activeMonthRef.current) => {
     setLoading(true);
     setError(null);
-    fetch(EVENTS_API_URL)
+    const url = `${EVENTS_API_URL}?start=${formatDate(startOfMonth(month))}&end=${formatDate(endOfMonth(month))}`;
+    fetch(url)
       .then(res => {
         if (!res.ok) throw new Error("Network response was not ok");
+        const header = res.headers.get("X-Store-Version");
+        if (header) {
+          const [boot, version] = header.split("-");
+          versionRef.current = { boot, version: Number(version) };
+        }
         return res.json();
       })
       .then(data => {
@@ -45,43 +89,55 @@ function CalendarEvents() {
   };
 
   useEffect(() => {
-    fetchEvents();
-  }, []);
+    activeMonthRef.current = activeMonth;
+    fetchEvents(activeMonth);
+  }, [activeMonth]);
+
+  // Patch local events with deltas, or refetch the month if they can't be applied
+  const handleChanges = (msg) => {
+    const known = versionRef.current;
+    if (msg.resync || !known || known.boot !== msg.boot || known.version < msg.since) {
+      fetchEvents();
+      return;
+    }
+    if (msg.changes.length) {
+      setEvents(prev => applyChanges(prev, msg.changes, activeMonthRef.current));
+      setToastMessage('Event data updated!');
+      setShowToast(true);
+    }
+    versionRef.current = { boot: msg.boot, version: msg.version };
+  };
 
-  // Listen for SSE updates and show persistent toast, refetch events on update
+  // Listen for SSE change notifications and apply their deltas
   useEffect(() => {
-    const streamUrl = window.location.hostname === "localhost"
-      ? "http://localhost:8000/events/stream"
-      : `http://${window.location.hostname}:8000/events/stream`;
-    const eventSource = new window.EventSource(streamUrl);
+    const eventSource = new window.EventSource(`${API_BASE}/events/stream`);
     eventSource.onmessage = (e) => {
-      if (e.data === 'updated') {
-        setToastMessage('Event data updated!');
-        setShowToast(true);
-        fetchEvents(); // Refetch events when backend notifies update
+      const msg = JSON.parse(e.data);
+      if (msg.since === undefined) {
+        // Stream (re)connected: catch up on anything missed while disconnected
+        const known = versionRef.current;
+        if (known && (known.boot !== msg.boot || known.version < msg.version)) {
+          fetch(`${API_BASE}/api/changes?since=${known.version}&boot=${known.boot}`)
+            .then(res => res.json())
+            .then(handleChanges)
+            .catch(() => fetchEvents());
+        }
+        return;
       }
+      handleChanges(msg);
     };
     return () => eventSource.close();
   }, []);
 
-  // Get all events for the selected month, sorted by date
+  // Get all events for the selected month; the API returns them sorted by date
   const eventsForMonth = selectedDate
-    ? events
-        .filter(e => {
-          const [d, m, y] = e.date.split("-");
-          return (
-            parseInt(m, 10) === selectedDate.getMonth() + 1 &&
-            parseInt(y, 10) === selectedDate.getFullYear()
-          );
-        })
-        .sort((a, b) => {
-          // Sort by date (DD-MM-YYYY)
-          const [ad, am, ay] = a.date.split("-").map(Number);
-          const [bd, bm, by] = b.date.split("-").map(Number);
-          const aDate = new Date(ay, am - 1, ad);
-          const bDate = new Date(by, bm - 1, bd);
-          return aDate - bDate;
-        })
+    ? events.filter(e => {
+        const [, m, y] = e.date.split("-");
+        return (
+          parseInt(m, 10) === selectedDate.getMonth() + 1 &&
+          parseInt(y, 10) === selectedDate.getFullYear()
+        );
+      })
     : [];
 
   // Get events for the selected date
@@ -128,6 +184,7 @@ function CalendarEvents() {
       <h2 className="calendar-title">Event Calendar</h2>
       <Calendar
         onClickDay={setSelectedDate}
+        onActiveStartDateChange={({ activeStartDate }) => setActiveMonth(startOfMonth(activeStartDate))}
         tileContent={tileContent}
         tileClassName={tileClassName}
         className="custom-calendar"
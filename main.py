@@ -1,18 +1,84 @@
-from agents.pa_agent import PersonalAssistantAgent
-from utils.terminal_utils import print_title, print_prompt, print_success, print_info, print_event
-from sort_events_json import sort_events_json
-
 import os
-import json
+import sys
+import asyncio
+import threading
+import time
+import importlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Modules on the path to the first prompt, loaded up front
+PROMPT_IMPORTS = ["utils.terminal_utils", "agents.router", "sort_events_json"]
+# Loaded by the background agent build
+AGENT_IMPORTS = ["langchain_core", "langchain", "langchain_groq", "agents.pa_agent"]
+# Loaded by the tools that need them, on first use
+FIRST_USE_IMPORTS = ["dateparser", "rapidfuzz", "requests"]
+# Threads for blocking tool calls in --async mode
+TOOL_WORKERS = 8
+
+
+def build_agent_in_background(**kwargs):
+    """Import LangChain and build the agent on a daemon thread; returns a Future."""
+    future = Future()
+
+    def build():
+        try:
+            from agents.pa_agent import PersonalAssistantAgent
+            future.set_result(PersonalAssistantAgent(**kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=build, name="agent-loader", daemon=True).start()
+    return future
+
+
+def profile_startup():
+    """Print how long each startup stage and heavy import takes, in a cold process."""
+    def timed(label, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+            status = ""
+        except Exception as e:
+            status = f"  (failed: {e.__class__.__name__})"
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {label:<40}{elapsed:9.1f} ms{status}")
+        return elapsed
+
+    start = time.perf_counter()
+    print("Before the prompt:")
+    prompt = sum(timed(name, lambda name=name: importlib.import_module(name)) for name in PROMPT_IMPORTS)
+    print(f"  {'time to prompt':<40}{prompt:9.1f} ms")
+    print("Background agent build:")
+    for name in AGENT_IMPORTS:
+        timed(name, lambda name=name: importlib.import_module(name))
+
+    def construct():
+        from agents.pa_agent import PersonalAssistantAgent
+        PersonalAssistantAgent()
+    timed("PersonalAssistantAgent()", construct)
+    print("First use:")
+    for name in FIRST_USE_IMPORTS:
+        timed(name, lambda name=name: importlib.import_module(name))
+    print(f"  {'total':<40}{(time.perf_counter() - start) * 1000:9.1f} ms")
+
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        profile_startup()
+        sys.exit(0)
+
+    from agents.router import IntentRouter
+    from utils.terminal_utils import print_title, print_prompt, print_success, print_info, print_event, print_error, print_warning, print_token, print_table
+    from utils.tracing import tracer
+    from sort_events_json import sort_events_json
+
     # Ensure events folder and event_data.json exist
     events_folder = os.path.join(os.path.dirname(__file__), "events")
     os.makedirs(events_folder, exist_ok=True)
     events_file = os.path.join(events_folder, "event_data.json")
     if not os.path.exists(events_file):
-        with open(events_file, "w", encoding="utf-8") as f:
-            json.dump([], f)
+        from storage.event_store import write_atomic
+        write_atomic(events_file, b"[]")
 
     print_title("""
 ██████╗   █████╗   ██████╗ ██╗      ██╗
@@ -23,17 +89,80 @@ if __name__ == "__main__":
 ╚═╝      ╚═╝  ╚═╝  ╚═════╝ ╚══════╝ ╚═╝
     """)
     print_success("Welcome to PACLI - Your AI-powered Personal Assistant!\n")
-    print_info("Type your task below, or 'exit' to quit.")
-    agent = PersonalAssistantAgent()
-    
+    print_info("Type your task below, '/stats' for latency stats, or 'exit' to quit.")
+    # --async streams the answer as it is generated, runs a step's tool
+    # calls concurrently and lets Ctrl-C cancel a request
+    async_mode = "--async" in sys.argv
+    runner = None
+    if async_mode:
+        runner = asyncio.Runner()
+        runner.get_loop().set_default_executor(ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool"))
+
+    # The agent (and LangChain) load while the user types
+    agent_future = build_agent_in_background(verbose=not async_mode)
+    # Common requests are answered locally without an LLM round trip
+    router = IntentRouter()
+    # Load the store (and re-sort the file if it was edited by hand) off the
+    # prompt's critical path; writes keep it sorted from then on
+    threading.Thread(target=sort_events_json, daemon=True).start()
+
     while True:
-        sort_events_json()
         print_prompt("\nHow can I help you today? > ", end="")
         task = input()
         print_success(task)
         if task.lower() == 'exit':
+            stats = router.stats()
+            if stats["hits"] + stats["misses"]:
+                print_info(f"Fast path answered {stats['hits']} of {stats['hits'] + stats['misses']} requests without the LLM.")
+            if agent_future.done() and not agent_future.exception():
+                cache_stats = agent_future.result().cache_stats()
+                print_info(f"Cache hit rate: answers {cache_stats['responses']['hit_rate']:.0%}, tool calls {cache_stats['tools']['hit_rate']:.0%}.")
             print_success("Goodbye! Have a productive day with PACLI.")
+            if runner:
+                runner.close()
             break
-        output = agent.run(task)
+        if task.strip().lower() == '/stats':
+            stats = tracer.stats()
+            if not stats:
+                print_info("No traced requests yet.")
+                continue
+            print_table("Latency per operation (ms)", ["kind", "name", "count", "p50", "p95", "mean"], [
+                (kind, name, s["count"], f"{s['p50_ms']:.1f}", f"{s['p95_ms']:.1f}", f"{s['mean_ms']:.1f}")
+                for (kind, name), s in stats.items()
+            ])
+            continue
+        with tracer.turn(task) as turn:
+            turn["path"] = "router"
+            try:
+                output = router.route(task)
+            except Exception:
+                # A fast-path bug must never end the session; the agent gets it instead
+                output = None
+            if output is None:
+                turn["path"] = "agent"
+                try:
+                    agent = agent_future.result()
+                except Exception as e:
+                    print_error(f"❌ Could not start the assistant: {e}")
+                    continue
+                if async_mode:
+                    streamed = []
+
+                    def on_token(token):
+                        if not streamed:
+                            print_success("\n✅ Final Output:\n")
+                        streamed.append(token)
+                        print_token(token)
+
+                    try:
+                        output = runner.run(agent.arun(task, on_token=on_token))
+                    except (KeyboardInterrupt, asyncio.CancelledError):
+                        print_warning("\n⏹️ Request cancelled.")
+                        continue
+                    if streamed:
+                        print_token("\n")
+                        continue
+                else:
+                    output = agent.run(task)
         print_success("\n✅ Final Output:\n")
         print_event(output)
\ No newline at end of file
@@ -1,6 +1,31 @@
-from http.server import SimpleHTTPRequestHandler, HTTPServer
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+import gzip
+import json
 import os
 import socket
+import uuid
+from storage.event import as_dict
+from storage.event_store import get_store
+from storage.watcher import ChangeWatcher
+from utils.tracing import tracer, TRACE_FILE
+
+# Seconds between SSE heartbeat comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Don't bother compressing responses smaller than this
+GZIP_MIN_BYTES = 1024
+# Distinguishes ETags across server restarts, since store versions restart at 0
+BOOT_ID = uuid.uuid4().hex[:8]
+
+watcher = ChangeWatcher()
+
+
+def gzip_etag(etag):
+    """ETag of the gzip-encoded representation of the body tagged `etag`."""
+    return etag[:-1] + '-gz"'
+
 
 class CORSRequestHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
@@ -11,20 +36,159 @@ class CORSRequestHandler(SimpleHTTPRequestHandler):
             self.send_header('Connection', 'keep-alive')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            import time
+            store = get_store()
+            seen = watcher.generation
+            version = store.version
             try:
+                # Tell the client where the stream starts so it can catch up via /api/changes
+                self.send_event({"boot": BOOT_ID, "version": version})
+                self.wfile.flush()
                 while True:
-                    self.wfile.write(b"data: updated\n\n")
+                    current = watcher.wait_for_change(seen, timeout=HEARTBEAT_INTERVAL)
+                    if current != seen:
+                        seen = current
+                        new_version, changes = store.changes_since(version)
+                        if new_version == version:
+                            continue
+                        message = {"boot": BOOT_ID, "version": new_version, "since": version}
+                        if changes is None:
+                            message["resync"] = True
+                        else:
+                            message["changes"] = changes
+                        version = new_version
+                        self.send_event(message)
+                    else:
+                        # Comment line: keeps proxies from closing the stream, ignored by EventSource
+                        self.wfile.write(b": ping\n\n")
                     self.wfile.flush()
-                    time.sleep(10)  # Send update every 10 seconds (demo)
-            except Exception:
+            except (BrokenPipeError, ConnectionResetError, OSError):
                 pass
+        elif self.path.split('?')[0] == '/api/events':
+            with tracer.span("http", "/api/events"):
+                self.serve_event_range()
+        elif self.path.split('?')[0] == '/api/changes':
+            with tracer.span("http", "/api/changes"):
+                self.serve_changes()
+        elif self.path.split('?')[0] == '/metrics':
+            # This server's own spans plus the CLI's turns from PACLI_TRACE_FILE
+            if TRACE_FILE:
+                tracer.ingest(TRACE_FILE)
+            body = tracer.prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path.split('?')[0] == '/events/event_data.json':
+            # Serve the materialized view (snapshot + journal), not the raw snapshot
+            body = json.dumps(get_store().all(), ensure_ascii=False, default=as_dict).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
             super().do_GET()
+    def serve_event_range(self):
+        """
+        GET /api/events?start=DD-MM-YYYY&end=DD-MM-YYYY&public=true|false
+
+        Returns the events in [start, end] from the store's date index. The
+        ETag is derived from the store version, so unchanged ranges answer
+        If-None-Match with 304, and bodies are gzipped when accepted (with a
+        "-gz" suffix on the ETag, since that is a different representation).
+        """
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            start = datetime.strptime(query['start'][0], '%d-%m-%Y').date()
+            end = datetime.strptime(query['end'][0], '%d-%m-%Y').date()
+        except (KeyError, ValueError):
+            self.send_json(400, {"status": "error", "message": "start and end must be DD-MM-YYYY dates."})
+            return
+        public = query.get('public', [''])[0].lower()
+        public = {'true': True, 'false': False}.get(public)
+
+        store = get_store()
+        store.refresh()
+        # Read the version before the data: a race can only make the ETag
+        # older than the body, which costs a refetch rather than a stale 304
+        version = store.version
+        etag = f'"{BOOT_ID}-{version}"'
+        # The same version always gives the same body, so a gzip ETag means
+        # the body is big enough to be gzipped again: answer without building it
+        if self.accepts_gzip() and gzip_etag(etag) in self.headers.get('If-None-Match', ''):
+            self.send_not_modified(gzip_etag(etag), version)
+            return
+        self.send_json(200, store.range(start, end, public=public), etag=etag, version=version)
+
+    def serve_changes(self):
+        """
+        GET /api/changes?since=<version>&boot=<boot id>
+
+        Returns the upserts/deletes after `since`, or resync: true when the
+        client's version is from another server run or has fallen off the
+        end of the store's change log.
+        """
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            since = int(query['since'][0])
+        except (KeyError, ValueError):
+            self.send_json(400, {"status": "error", "message": "since must be a store version."})
+            return
+        version, changes = get_store().changes_since(since)
+        payload = {"boot": BOOT_ID, "version": version, "since": since}
+        if changes is None or query.get('boot', [BOOT_ID])[0] != BOOT_ID:
+            payload["resync"] = True
+        else:
+            payload["changes"] = changes
+        self.send_json(200, payload)
+
+    def send_event(self, payload):
+        self.wfile.write(b"data: " + json.dumps(payload, ensure_ascii=False, default=as_dict).encode('utf-8') + b"\n\n")
+
+    def accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def send_not_modified(self, etag, version):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('X-Store-Version', f'{BOOT_ID}-{version}')
+        self.end_headers()
+
+    def send_json(self, status, payload, etag=None, version=None):
+        # Stored events are converted to plain dicts only here
+        body = json.dumps(payload, ensure_ascii=False, default=as_dict).encode('utf-8')
+        gzipped = len(body) >= GZIP_MIN_BYTES and self.accepts_gzip()
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
+            # Each encoding is its own representation, so it gets its own strong ETag
+            etag = etag and gzip_etag(etag)
+        if status == 200 and etag and etag in self.headers.get('If-None-Match', ''):
+            self.send_not_modified(etag, version)
+            return
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag:
+            self.send_header('ETag', etag)
+            # Let browsers cache the body but revalidate it on every use
+            self.send_header('Cache-Control', 'no-cache')
+        if version is not None:
+            # Lets the frontend pick up deltas from exactly this version
+            self.send_header('X-Store-Version', f'{BOOT_ID}-{version}')
+        self.end_headers()
+        self.wfile.write(body)
+
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS, PUT, DELETE')
         self.send_header('Access-Control-Allow-Headers', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, X-Store-Version')
         super().end_headers()
 
     def do_OPTIONS(self):
@@ -49,6 +213,8 @@ def get_local_ip():
 if __name__ == '__main__':
     os.chdir(os.path.dirname(__file__))
     local_ip = get_local_ip()
-    server = HTTPServer((local_ip, 8000), CORSRequestHandler)
+    watcher.start()
+    server = ThreadingHTTPServer((local_ip, 8000), CORSRequestHandler)
+    server.daemon_threads = True
     print(f'Serving with CORS at http://{local_ip}:8000')
     server.serve_forever()
\ No newline at end of file
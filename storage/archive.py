@@ -0,0 +1,233 @@
+"""
+Compressed per-month archive of past events.
+
+Usage:
+    python -m storage.archive archive [--keep-months 3]
+    python -m storage.archive restore 2024-01
+    python -m storage.archive list
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from utils.tracing import tracer
+
+# Months before the current one left in the live store by `archive`
+KEEP_MONTHS = 3
+# Decompressed months kept in memory for repeated queries
+ARCHIVE_CACHE_MONTHS = 12
+
+
+def month_key(day):
+    """'YYYY-MM' of a date."""
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def month_bounds(month):
+    """(first, last) date ordinals of a 'YYYY-MM' month."""
+    year, number = (int(part) for part in month.split("-"))
+    first = date(year, number, 1)
+    after = date(year + number // 12, number % 12 + 1, 1)
+    return first.toordinal(), after.toordinal() - 1
+
+
+def months_before(today, keep=KEEP_MONTHS):
+    """First day of the oldest month `archive` keeps live."""
+    index = today.year * 12 + today.month - 1 - keep
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class EventArchive:
+    """
+    Past one-off events as one gzip-compressed JSON shard per month
+    (archive/2024-01.json.gz, next to event_data.json) plus manifest.json,
+    which lists each shard's file, event count and date range.
+
+    Range queries read the manifest (re-read only when it changes on disk)
+    and decompress just the shards they overlap, keeping the last
+    ARCHIVE_CACHE_MONTHS in memory, so a query for this week never opens
+    the archive at all. Shards and the manifest are replaced atomically;
+    writers hold the event store's exclusive lock.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self._lock = threading.RLock()
+        self._manifest_stat = False
+        self._months = {}
+        self._last = None
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _shard_path(self, month):
+        return os.path.join(self.directory, f"{month}.json.gz")
+
+    def _refresh(self):
+        stat = self._stat(self.manifest_path)
+        if stat == self._manifest_stat:
+            return
+        months = {}
+        if stat is not None:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    months = json.load(f).get("months", {})
+            except (OSError, ValueError):
+                months = {}
+        self._manifest_stat = stat
+        self._months = months
+        self._last = max((m["last"] for m in months.values()), default=None)
+
+    def months(self):
+        """Archived months as {'YYYY-MM': {"file", "count", "first", "last"}}."""
+        with self._lock:
+            self._refresh()
+            return dict(self._months)
+
+    def load(self, month):
+        """Every archived event of a 'YYYY-MM' month, in date order."""
+        with self._lock:
+            path = self._shard_path(month)
+            stat = self._stat(path)
+            cached = self._cache.get(month)
+            if cached is not None and cached[0] == stat:
+                self._cache.move_to_end(month)
+                return cached[1]
+            events = []
+            if stat is not None:
+                with tracer.span("archive", "read_shard", month=month), gzip.open(path, "rt", encoding="utf-8") as f:
+                    events = json.load(f)
+            self._cache[month] = (stat, events)
+            while len(self._cache) > ARCHIVE_CACHE_MONTHS:
+                self._cache.popitem(last=False)
+            return events
+
+    def range(self, start, end):
+        """
+        Archived events dated within [start, end] (date ordinals), in date
+        order. Only shards overlapping the range are opened.
+        """
+        with self._lock:
+            self._refresh()
+            if self._last is None or start > self._last:
+                return []
+            events = []
+            for month in sorted(self._months):
+                meta = self._months[month]
+                if meta["first"] <= end and meta["last"] >= start:
+                    events.extend(e for e in self.load(month) if start <= e.get("date_ordinal", 0) <= end)
+            return events
+
+    def find(self, event_id, ordinal=None):
+        """
+        An archived event by id. With the event's date ordinal only its
+        month is searched; otherwise every shard, newest first.
+        """
+        with self._lock:
+            self._refresh()
+            if ordinal is not None:
+                months = [month_key(date.fromordinal(ordinal))] if ordinal < date.max.toordinal() else []
+            else:
+                months = sorted(self._months, reverse=True)
+            for month in months:
+                if month not in self._months:
+                    continue
+                for event in self.load(month):
+                    if event.get("id") == event_id:
+                        return event
+            return None
+
+    # ----- writes (under the store's exclusive lock) -----
+
+    def _write_shard(self, month, events):
+        from storage.event_store import write_atomic
+        path = self._shard_path(month)
+        if not events:
+            if os.path.exists(path):
+                os.remove(path)
+            self._months.pop(month, None)
+            return
+        events = sorted(events, key=lambda e: e["date_ordinal"])
+        data = gzip.compress(json.dumps(events, ensure_ascii=False).encode("utf-8"), mtime=0)
+        with tracer.span("archive", "write_shard", month=month, bytes=len(data)):
+            write_atomic(path, data)
+        first, last = month_bounds(month)
+        self._months[month] = {"file": os.path.basename(path), "count": len(events), "first": first, "last": last}
+
+    def _write_manifest(self):
+        from storage.event_store import write_atomic
+        data = json.dumps({"months": dict(sorted(self._months.items()))}, indent=2).encode("utf-8")
+        write_atomic(self.manifest_path, data)
+        self._refresh()
+
+    def add(self, events):
+        """
+        Merge dated events into their months' shards (replacing any with
+        the same id), then publish them in the manifest.
+        """
+        with self._lock:
+            self._refresh()
+            os.makedirs(self.directory, exist_ok=True)
+            by_month = {}
+            for event in events:
+                by_month.setdefault(month_key(date.fromordinal(event["date_ordinal"])), []).append(event)
+            for month, new in by_month.items():
+                ids = {e["id"] for e in new}
+                kept = [e for e in self.load(month) if e["id"] not in ids] if month in self._months else []
+                self._write_shard(month, kept + new)
+            self._write_manifest()
+
+    def remove(self, events):
+        """Drop archived events (e.g. ones restored into the live store)."""
+        with self._lock:
+            self._refresh()
+            by_month = {}
+            for event in events:
+                by_month.setdefault(month_key(date.fromordinal(event["date_ordinal"])), set()).add(event["id"])
+            changed = False
+            for month, ids in by_month.items():
+                if month in self._months:
+                    self._write_shard(month, [e for e in self.load(month) if e["id"] not in ids])
+                    changed = True
+            if changed:
+                self._write_manifest()
+
+
+def main():
+    from storage.event_store import get_store
+
+    parser = argparse.ArgumentParser(description="Move past months of events into the compressed archive and back.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    archive = sub.add_parser("archive", help="Archive every month older than --keep-months")
+    archive.add_argument("--keep-months", type=int, default=KEEP_MONTHS)
+    restore = sub.add_parser("restore", help="Move an archived month (YYYY-MM) back into the live store")
+    restore.add_argument("month")
+    sub.add_parser("list", help="List archived months")
+    args = parser.parse_args()
+
+    store = get_store()
+    if not hasattr(store, "archive_before"):
+        parser.error("The archive is only used by the JSON store (PACLI_STORAGE=json).")
+    if args.command == "archive":
+        cutoff = months_before(date.today(), args.keep_months)
+        print(f"Archived {store.archive_before(cutoff)} events dated before {cutoff:%d-%m-%Y}.")
+    elif args.command == "restore":
+        print(f"Restored {store.restore_month(args.month)} events from {args.month}.")
+    else:
+        for month, meta in sorted(store.archive.months().items()):
+            print(f"{month}  {meta['count']:>6} events  {meta['file']}")
+
+
+if __name__ == "__main__":
+    main()
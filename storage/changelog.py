@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+from collections.abc import Mapping
+
+# Number of recent changes kept for delta sync
+CHANGE_LOG_SIZE = 1000
+
+
+class ChangeLog:
+    """
+    Bounded log of recent store changes, each tagged with the store version
+    it produced. Clients that know a version can ask for everything after
+    it; once that version has fallen off the end of the log (or a full
+    reload cleared it) they have to resync from scratch.
+    """
+
+    def __init__(self, size=CHANGE_LOG_SIZE):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.size = size
+
+    def record(self, version, op, payload):
+        """
+        Record a store notification. 'add' becomes an upsert of the event,
+        'delete' a delete by id, and 'reset' drops the log. A recurring
+        event's occurrences can't be sent as a delta, so changing one drops
+        the log too and clients refetch their window.
+        """
+        with self._lock:
+            if op == "reset" or (isinstance(payload, Mapping) and payload.get("recurrence")):
+                self._entries.clear()
+            elif op == "add":
+                self._entries.append({"version": version, "op": "upsert", "event": payload})
+            elif op == "delete":
+                self._entries.append({"version": version, "op": "delete", "id": payload.get("id")})
+
+    def since(self, since, current):
+        """
+        Changes after version `since`, or None if they are no longer
+        available and the caller must resync.
+        """
+        with self._lock:
+            if since > current:
+                return None
+            if since == current:
+                return []
+            if not self._entries or self._entries[0]["version"] > since + 1:
+                return None
+            return [entry for entry in self._entries if entry["version"] > since]
@@ -0,0 +1,176 @@
+import gc
+import operator
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+# Fields every event written by PACLI has, in the order they are serialized
+FIELDS = (
+    "event_name", "date", "day", "month", "year", "time", "extra_info", "public",
+    "date_ordinal", "start_minutes", "id",
+)
+_FIELD_SET = frozenset(FIELDS)
+_SLOTS = FIELDS + ("extra",)
+_get_fields = operator.itemgetter(*FIELDS)
+_MISSING = object()
+
+
+def _same(value):
+    return value
+
+
+class StringTable(dict):
+    """
+    One shared object per distinct value (names, times, dates, ordinals),
+    so a calendar with many events per day stores each value once.
+    """
+
+    def intern(self, value):
+        try:
+            return self.setdefault(value, value)
+        except TypeError:  # unhashable
+            return value
+
+
+class Event(Mapping):
+    """
+    Compact, read-only stored event: one slot per standard field plus a
+    dict for anything else (recurrence, series_id, ...), instead of a
+    per-event dict holding its own copy of every key and value.
+
+    It reads like the event dict it was built from (event["date"],
+    event.get("time"), {**event}, ==), so tools need no changes to read
+    one; as_dict() turns it back into plain JSON data at the tool/API
+    boundary.
+    """
+
+    __slots__ = _SLOTS
+
+    @classmethod
+    def from_dict(cls, data, strings=None):
+        """
+        Build an event from its dict form. Values that repeat across events
+        (names, times, dates, ordinals) go through `strings` if given; ids
+        and extra fields are kept as they are.
+        """
+        event = cls.__new__(cls)
+        if strings is not None and len(data) == len(FIELDS):
+            # Fast path for events written by PACLI: exactly the standard fields
+            try:
+                (name, day_str, day, month, year, time, extra_info, public,
+                 ordinal, minutes, event_id) = _get_fields(data)
+                share = strings.setdefault
+                event.event_name = share(name, name)
+                event.date = share(day_str, day_str)
+                event.day = share(day, day)
+                event.month = share(month, month)
+                event.year = share(year, year)
+                event.time = share(time, time)
+                event.extra_info = share(extra_info, extra_info)
+                event.public = public
+                event.date_ordinal = share(ordinal, ordinal)
+                event.start_minutes = share(minutes, minutes)
+                event.id = event_id
+                event.extra = None
+                return event
+            except (KeyError, TypeError):  # another field, or an unhashable value
+                pass
+        intern = strings.intern if strings is not None else _same
+        get = data.get
+        event.event_name = intern(get("event_name", _MISSING))
+        event.date = intern(get("date", _MISSING))
+        event.day = intern(get("day", _MISSING))
+        event.month = intern(get("month", _MISSING))
+        event.year = intern(get("year", _MISSING))
+        event.time = intern(get("time", _MISSING))
+        event.extra_info = intern(get("extra_info", _MISSING))
+        event.public = get("public", _MISSING)
+        event.date_ordinal = intern(get("date_ordinal", _MISSING))
+        event.start_minutes = intern(get("start_minutes", _MISSING))
+        event.id = get("id", _MISSING)
+        other = data.keys() - _FIELD_SET
+        event.extra = {k: data[k] for k in data if k in other} if other else None
+        return event
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in _SLOTS)
+
+    def __eq__(self, other):
+        if type(other) is Event:
+            return self._values() == other._values()
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Event({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return Event.from_dict, (self.to_dict(),)
+
+    def to_dict(self):
+        """The event as a plain dict, as it is stored in event_data.json."""
+        data = {field: value for field in FIELDS if (value := getattr(self, field)) is not _MISSING}
+        if self.extra is not None:
+            data.update(self.extra)
+        return data
+
+
+def as_dict(event):
+    """
+    Plain-dict form of a stored event, for JSON responses. Also usable as
+    json.dumps(..., default=as_dict).
+    """
+    if type(event) is Event:
+        return event.to_dict()
+    if isinstance(event, dict):
+        return event
+    raise TypeError(f"Object of type {type(event).__name__} is not JSON serializable")
+
+
+@contextmanager
+def bulk_load():
+    """
+    Pause the cyclic garbage collector while a snapshot is parsed into
+    Events, restoring its previous state afterwards. Events never form
+    cycles, but the collector tracks them, and the collections a large
+    parse would trigger would re-scan every event built so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
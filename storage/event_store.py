@@ -0,0 +1,851 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import uuid
+from array import array
+from datetime import date, datetime
+from itertools import compress
+
+from storage.archive import EventArchive
+from storage.changelog import ChangeLog
+from storage.event import Event, StringTable, as_dict, bulk_load
+from storage.locking import FileLock
+from storage.recurrence import FOREVER, expand, find_occurrence, resolve_records, split_occurrence_id, until_ordinal
+from utils.date_utils import parse_time_minutes
+from utils.tracing import tracer
+
+# Path to events/event_data.json
+EVENTS_FILE = os.path.join(os.path.dirname(__file__), '..', 'events', 'event_data.json')
+
+# Events whose date can't be parsed sort after everything else
+UNDATED = date.max.toordinal() + 1
+
+# Flips the public column into a private one
+PRIVATE = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+
+# Compact the journal into the snapshot once it grows past either limit
+COMPACT_RECORDS = 200
+COMPACT_BYTES = 1 << 20
+
+
+def parse_ordinal(date_str):
+    """
+    Return the proleptic ordinal of a DD-MM-YYYY date string, or None.
+    """
+    try:
+        return datetime.strptime(date_str, "%d-%m-%Y").toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def event_ordinal(event):
+    """
+    Return an event's date ordinal, preferring the stored date_ordinal field
+    and only parsing the DD-MM-YYYY date for events written before it
+    existed. Undated events get UNDATED.
+    """
+    ordinal = event.date_ordinal if type(event) is Event else event.get("date_ordinal")
+    if not isinstance(ordinal, int):
+        ordinal = parse_ordinal(event.get("date", ""))
+    return UNDATED if ordinal is None else ordinal
+
+
+def canonical_fields(event):
+    """
+    Machine-readable fields derived from an event's date and time:
+    date_ordinal (date.toordinal(), or None) and start_minutes (minutes
+    since midnight, or None), plus until_ordinal (last possible occurrence)
+    for recurring events. Stored on every write so readers compare
+    integers instead of re-parsing strings.
+    """
+    fields = {
+        "date_ordinal": parse_ordinal(event.get("date", "")),
+        "start_minutes": parse_time_minutes(event.get("time", "")),
+    }
+    if event.get("recurrence"):
+        fields["until_ordinal"] = until_ordinal(event)
+    return fields
+
+
+def with_canonical_fields(event):
+    return {**event, **canonical_fields(event)}
+
+
+def date_fields(date_str):
+    """day, month and year of a DD-MM-YYYY date, or {} if it doesn't parse."""
+    try:
+        day = datetime.strptime(str(date_str), "%d-%m-%Y")
+    except ValueError:
+        return {}
+    return {"day": day.strftime("%A"), "month": day.strftime("%B"), "year": day.year}
+
+
+def canonical_updates(fields):
+    """
+    Extend a partial update with refreshed canonical fields (and day,
+    month and year) for any date or time it changes.
+    """
+    fields = dict(fields)
+    if "date" in fields:
+        fields.update(date_fields(fields["date"]))
+        fields["date_ordinal"] = parse_ordinal(fields["date"])
+    if "time" in fields:
+        fields["start_minutes"] = parse_time_minutes(fields["time"])
+    return fields
+
+
+class ConflictError(RuntimeError):
+    """
+    An event changed (or was deleted) since the caller read it; re-read it
+    and retry the edit.
+    """
+
+
+def new_event_id():
+    return uuid.uuid4().hex[:12]
+
+
+def with_occurrences(events, series, start, end):
+    """
+    Replace the recurring rows in date-sorted events with the occurrences
+    of `series` (recurring events that may occur in the window) within
+    [start, end], keeping date order.
+    """
+    if not series:
+        return events
+    merged = [e for e in events if not e.get("recurrence")]
+    for event in series:
+        merged.extend(expand(event, start, end))
+    merged.sort(key=event_ordinal)
+    return merged
+
+
+def same_event(a, b):
+    """Compare stored events, ignoring annotations like find_event's match_score."""
+    strip = lambda e: {k: v for k, v in e.items() if k != "match_score"}
+    return a is not None and b is not None and strip(a) == strip(b)
+
+
+def normalize_record(record):
+    """
+    Return a copy of a write record with canonical fields filled in (and an
+    id for new events), ready to journal. day/month/year always follow the
+    date, so direct callers can't store a row that contradicts itself.
+    """
+    if record.get("op") == "add":
+        event = with_canonical_fields({**record["event"], **date_fields(record["event"].get("date", ""))})
+        event.setdefault("id", new_event_id())
+        return {"op": "add", "event": event}
+    if record.get("op") == "update":
+        return {"op": "update", "id": record["id"], "fields": canonical_updates(record.get("fields", {}))}
+    if record.get("op") == "delete":
+        return {"op": "delete", "id": record["id"]}
+    raise ValueError(f"Unknown write op: {record.get('op')!r}")
+
+
+def write_temp(path, data):
+    """
+    Write bytes to a fresh temp file next to path (unique per writer) and
+    fsync it. Returns the temp path, to be os.replace()d over path.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def write_atomic(path, data):
+    """
+    Write bytes to path via a temp file, fsync and os.replace so readers
+    never observe a half-written file.
+    """
+    os.replace(write_temp(path, data), path)
+
+
+class EventStore:
+    """
+    In-memory, date-sorted view of event_data.json shared by all tools.
+
+    The snapshot (event_data.json) is parsed once and writes are appended as
+    add/update/delete records (or a batch of them) to a journal next to it
+    (event_data.journal), which is replayed on load. Once the journal passes COMPACT_RECORDS or
+    COMPACT_BYTES it is folded back into the snapshot on a background thread.
+    Replaying a record twice is harmless, so a crash between writing the
+    snapshot and truncating the journal loses nothing.
+
+    Events are kept ordered by date as compact read-only Event objects
+    (storage.event), whose repeated values (names, times, dates) are shared
+    through a string table. Parallel columns hold each event's date ordinal
+    (array of ints) and public flag (bytearray), so a range query is a pair
+    of binary searches and its public/private filter runs over the column
+    instead of reading every event. Callers get the Events themselves and
+    convert with as_dict() only where they leave as JSON.
+
+    Several processes (CLI, mailer, HTTP server) may share the files. A
+    side lock file (event_data.lock) is held shared while the snapshot and
+    journal are reloaded and exclusive while writing, and every write first
+    catches up on other processes' records. Reading new journal records
+    needs no lock: they are appended whole, under the exclusive lock, and
+    the snapshot and journal are only ever swapped in with os.replace.
+    Updates and deletes can pass the event as it was read (`expect`) and
+    get a ConflictError if it has changed since.
+
+    A recurring event is one row with a `recurrence` rule (see
+    storage.recurrence). Range queries expand it into occurrences
+    ("<id>@YYYYMMDD") only inside the queried window, and editing or deleting
+    one occurrence is stored as an exception date on the series plus, for
+    edits, an override row.
+
+    Past months can be moved into a compressed per-month archive
+    (archive/, see storage.archive) with archive_before(), which keeps the
+    snapshot, loads and compactions the size of recent history. Range
+    queries still return archived events for the months they overlap, and
+    editing or deleting one moves it back into the live store first. all()
+    and the name index only cover live events.
+    """
+
+    def __init__(self, path=EVENTS_FILE):
+        self.path = os.path.abspath(path)
+        self.journal_path = os.path.splitext(self.path)[0] + ".journal"
+        self.lock = FileLock(os.path.splitext(self.path)[0] + ".lock")
+        self.archive = EventArchive(os.path.join(os.path.dirname(self.path), "archive"))
+        self._lock = threading.RLock()
+        self._signature = None
+        self._events = []
+        self._ordinals = array("i")
+        self._public = bytearray()
+        self._strings = StringTable()
+        self._by_id = {}
+        # Recurring events by id, expanded per query
+        self._series = {}
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._needs_snapshot = False
+        self._snapshot_sorted = True
+        self._compactor = None
+        self._listeners = []
+        # Bumped on every in-memory change; cheap to compare for caching
+        self.version = 0
+        self.changes = ChangeLog()
+        self._quiet = False
+        self.error = None
+
+    # ----- loading -----
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _current_signature(self):
+        return (self._stat(self.path), self._stat(self.journal_path))
+
+    def subscribe(self, listener):
+        """
+        Register listener(op, payload), called under the store lock on every
+        in-memory change: ('add', event) for adds and updates, ('delete', event)
+        and ('reset', events) after a full reload.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Stop calling a listener registered with subscribe."""
+        # Replaced rather than mutated, so a notification in progress isn't disturbed
+        self._listeners = [l for l in self._listeners if l != listener]
+
+    def _notify(self, op, payload):
+        if self._quiet:
+            return
+        self.version += 1
+        self.changes.record(self.version, op, payload)
+        for listener in self._listeners:
+            listener(op, payload)
+
+    def _notify_diff(self, old_by_id):
+        """
+        After a full reload, report what actually changed relative to
+        old_by_id as individual adds/deletes, so a compaction or a small
+        hand edit doesn't look like a brand new calendar. Large or initial
+        loads are reported as a single reset. Returns True if anything changed.
+        """
+        new_by_id = self._by_id
+        changes = [("delete", e) for i, e in old_by_id.items() if i not in new_by_id]
+        for event_id, event in new_by_id.items():
+            old = old_by_id.get(event_id)
+            if old is None or (old is not event and old != event):
+                changes.append(("add", event))
+        if not changes:
+            return False
+        if not old_by_id or len(changes) > self.changes.size // 2:
+            self._notify("reset", self._events)
+        else:
+            for op, event in changes:
+                self._notify(op, event)
+        return True
+
+    def _index(self, events):
+        """
+        Rebuild the sorted view. Returns True if events were already in date
+        order, in which case the sort is skipped.
+        """
+        events = [e if type(e) is Event else self._stored(e) for e in events]
+        ordinals = [event_ordinal(e) for e in events]
+        in_order = all(a <= b for a, b in zip(ordinals, ordinals[1:]))
+        if in_order:
+            self._ordinals = array("i", ordinals)
+            self._events = events
+        else:
+            keyed = sorted(zip(ordinals, events), key=lambda pair: pair[0])
+            self._ordinals = array("i", [k for k, _ in keyed])
+            self._events = [e for _, e in keyed]
+        # Every row is an Event here, so read its slots directly
+        self._public = bytearray(e.public is not False for e in self._events)
+        self._by_id = {e.id: e for e in self._events}
+        self._series = {e["id"]: e for e in self._events if e.get("recurrence")}
+        self._notify("reset", self._events)
+        return in_order
+
+    def _stored(self, event):
+        return Event.from_dict(event, self._strings)
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.path):
+            return []
+        # A fresh table, so values only old events used can be freed
+        self._strings = StringTable()
+        try:
+            # Events are made compact as they are parsed, so the dicts never pile up
+            with tracer.span("store", "read_snapshot"), open(self.path, "r", encoding="utf-8") as f, bulk_load():
+                events = json.load(f, object_hook=lambda data: self._stored(data) if "id" in data else data)
+        except json.JSONDecodeError:
+            self.error = "corrupted"
+            return []
+        if not isinstance(events, list):
+            return []
+        for i, e in enumerate(events):
+            if not e.get("id"):
+                # Legacy rows: give them ids and persist before journaling
+                events[i] = {**e, "id": new_event_id()}
+                self._needs_snapshot = True
+        return events
+
+    def _replay_journal(self, offset, inode=None):
+        """
+        Apply complete journal lines from offset onwards. A torn last line
+        (no trailing newline) is left for the next refresh. Returns False
+        without reading if the journal is no longer the file `inode` (another
+        process compacted it since it was stat()ed).
+        """
+        try:
+            with tracer.span("store", "read_journal") as span, open(self.journal_path, "rb") as f:
+                if inode is not None and os.fstat(f.fileno()).st_ino != inode:
+                    return False
+                f.seek(offset)
+                data = f.read()
+                span["bytes"] = len(data)
+        except FileNotFoundError:
+            if inode is not None:
+                return False
+            self._journal_offset = 0
+            self._journal_records = 0
+            return True
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._apply(record)
+            self._journal_records += 1
+        self._journal_offset = offset + end
+        return True
+
+    def refresh(self):
+        """
+        Pick up changes made on disk since the last load. New journal records
+        are replayed incrementally; anything else triggers a full reload.
+        Returns True if the in-memory view changed.
+        """
+        with self._lock:
+            signature = self._current_signature()
+            if signature == self._signature:
+                return False
+            old_snapshot, old_journal = self._signature or (None, None)
+            new_snapshot, new_journal = signature
+            appended = (
+                self._signature is not None
+                and new_snapshot == old_snapshot
+                and old_journal is not None and new_journal is not None
+                and new_journal[0] == old_journal[0]
+                and new_journal[2] >= self._journal_offset
+            )
+            if appended:
+                self._signature = signature
+                if self._replay_journal(self._journal_offset, inode=new_journal[0]):
+                    return True
+            # Hold off writers so the snapshot and journal are read as a pair
+            with self.lock.shared():
+                self._signature = self._current_signature()
+                self.error = None
+                self._needs_snapshot = False
+                old_by_id = self._by_id
+                self._quiet = True
+                try:
+                    # Our own snapshots are always sorted; anything else was edited by hand
+                    self._snapshot_sorted = self._index(self._load_snapshot())
+                    # Memory is sorted either way; the next write puts the file back in order
+                    self._needs_snapshot = self._needs_snapshot or not self._snapshot_sorted
+                    self._journal_offset = 0
+                    self._journal_records = 0
+                    self._replay_journal(0)
+                finally:
+                    self._quiet = False
+            return self._notify_diff(old_by_id)
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    # ----- queries -----
+
+    def all(self):
+        """Return every event in date order."""
+        with self._lock:
+            self.refresh()
+            return list(self._events)
+
+    def range(self, start, end, public=None):
+        """
+        Return events whose date falls within [start, end] (inclusive).
+        Args:
+            start, end: date objects.
+            public: Optional; True for only public events, False for only private ones.
+        """
+        wanted = lambda e: public is None or (e.get("public", True) is not False) == public
+        with self._lock:
+            self.refresh()
+            lo = bisect.bisect_left(self._ordinals, start.toordinal())
+            hi = bisect.bisect_right(self._ordinals, end.toordinal())
+            if public is None:
+                events = self._events[lo:hi]
+            else:
+                flags = self._public[lo:hi]
+                events = list(compress(self._events[lo:hi], flags if public else flags.translate(PRIVATE)))
+            series = [
+                e for e in self._series.values()
+                if event_ordinal(e) <= end.toordinal() and e.get("until_ordinal", FOREVER) >= start.toordinal()
+                and wanted(e)
+            ]
+            # Live copies win over archived ones left by an interrupted restore
+            archived = [
+                e for e in self.archive.range(start.toordinal(), end.toordinal())
+                if e["id"] not in self._by_id and wanted(e)
+            ]
+        events = with_occurrences(events, series, start, end)
+        if archived:
+            events = sorted(archived + events, key=event_ordinal)
+        return events
+
+    def on_date(self, day):
+        """Return events scheduled on a single date."""
+        return self.range(day, day)
+
+    def _lookup(self, event_id, restored=None):
+        """
+        A stored event, one occurrence of a recurring event, or an event in
+        `restored` (archived events being written back), by id.
+        """
+        event = self._by_id.get(event_id) or (restored or {}).get(event_id)
+        target = split_occurrence_id(event_id) if event is None else None
+        if target and target[0] in self._series:
+            return find_occurrence(self._series[target[0]], target[1])
+        return event
+
+    def get(self, event_id):
+        with self._lock:
+            self.refresh()
+            return self._lookup(event_id)
+
+    def changes_since(self, since):
+        """
+        Return (version, changes) where changes lists the upserts/deletes
+        after version `since`, or None if the caller must resync.
+        """
+        with self._lock:
+            self.refresh()
+            return self.version, self.changes.since(since, self.version)
+
+    # ----- in-memory mutation -----
+
+    def _insert(self, event):
+        key = event_ordinal(event)
+        pos = bisect.bisect_right(self._ordinals, key)
+        self._ordinals.insert(pos, key)
+        self._public.insert(pos, event.get("public", True) is not False)
+        self._events.insert(pos, event)
+        self._by_id[event["id"]] = event
+        if event.get("recurrence"):
+            self._series[event["id"]] = event
+
+    def _remove(self, event):
+        key = event_ordinal(event)
+        lo = bisect.bisect_left(self._ordinals, key)
+        hi = bisect.bisect_right(self._ordinals, key)
+        for pos in range(lo, hi):
+            if self._events[pos] is event:
+                del self._ordinals[pos]
+                del self._public[pos]
+                del self._events[pos]
+                break
+        self._by_id.pop(event["id"], None)
+        self._series.pop(event["id"], None)
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "batch":
+            return [self._apply(r) for r in record.get("records", [])]
+        if op == "archive":
+            # Moved to the archive, not deleted: readers resync their view
+            for event_id in record.get("ids", []):
+                existing = self._by_id.get(event_id)
+                if existing is not None:
+                    self._remove(existing)
+            self._notify("reset", self._events)
+            return None
+        if op == "add":
+            event = self._stored(record["event"])
+            existing = self._by_id.get(event["id"])
+            if existing is not None:
+                self._remove(existing)
+            self._insert(event)
+            self._notify("add", event)
+            return event
+        existing = self._by_id.get(record.get("id"))
+        if existing is None:
+            return None
+        self._remove(existing)
+        if op == "update":
+            # Events are read-only: build a new one, so readers holding the
+            # old one (and the background compactor) see a consistent object
+            updated = {**existing, **record.get("fields", {})}
+            if updated.get("recurrence"):
+                updated["until_ordinal"] = until_ordinal(updated)
+            updated = self._stored(updated)
+            self._insert(updated)
+            self._notify("add", updated)
+            return updated
+        self._notify("delete", existing)
+        return existing
+
+    # ----- writes -----
+
+    def _reload_after_conflict(self):
+        # Memory no longer matches what is on disk; drop it and re-read
+        self._signature = None
+        self.refresh()
+        raise ConflictError("The event files were replaced by another process; reloaded them.")
+
+    def _append(self, record):
+        if self._needs_snapshot:
+            # The journal record may refer to ids only this snapshot contains
+            if not self._write_snapshot(list(self._events), self._journal_offset, self._signature):
+                self._reload_after_conflict()
+            self._needs_snapshot = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with tracer.span("store", "append_journal"), open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset += len(line)
+        self._journal_records += 1
+        self._signature = self._current_signature()
+        if self._journal_records >= COMPACT_RECORDS or self._journal_offset >= COMPACT_BYTES:
+            self._compact_in_background()
+
+    def _check_expected(self, event_id, expect, restored=None):
+        if expect is not None and not same_event(self._lookup(event_id, restored), expect):
+            raise ConflictError(f"Event {event_id} was changed or deleted since it was read.")
+
+    def _archived_targets(self, records):
+        """Archived events that update/delete records refer to, by id."""
+        restored = {}
+        for record in records:
+            event_id = record.get("id")
+            if record.get("op") == "add" or event_id in self._by_id or split_occurrence_id(event_id):
+                continue
+            expect = record.get("expect")
+            event = self.archive.find(event_id, event_ordinal(expect) if expect else None)
+            if event is not None:
+                restored[event_id] = event
+        return restored
+
+    def add(self, event):
+        """
+        Add an event and journal it. Returns the stored event (with its id).
+        """
+        with self._lock, self.lock.exclusive():
+            self.refresh()
+            event = with_canonical_fields(event)
+            event.setdefault("id", new_event_id())
+            record = {"op": "add", "event": event}
+            self._apply(record)
+            self._append(record)
+            return event
+
+    def add_many(self, events):
+        """
+        Add several events as one journal record, so they cost a single
+        write and fsync and are replayed all or nothing. Returns the stored
+        events (with their ids).
+        """
+        return self.write_batch([{"op": "add", "event": e} for e in events])
+
+    def write_batch(self, records):
+        """
+        Apply add/update/delete records ({"op": "add", "event": ...},
+        {"op": "update", "id": ..., "fields": ...}, {"op": "delete", "id": ...})
+        as one transaction: a single journal record that is replayed all or
+        nothing. Updates and deletes of unknown ids are dropped, ones
+        aimed at an occurrence of a recurring event become an exception
+        (plus an override for edits), and ones aimed at an archived event
+        move it back into the live store first. Returns, per record, the
+        added or updated event, the deleted event, or None.
+        Updates and deletes may also carry "expect", the event as the caller
+        read it; if any no longer matches, ConflictError is raised and
+        nothing is written.
+        """
+        with self._lock, self.lock.exclusive():
+            self.refresh()
+            restored = self._archived_targets(records)
+            for record in records:
+                if record.get("op") != "add":
+                    self._check_expected(record.get("id"), record.get("expect"), restored)
+            known = set(self._by_id) | restored.keys()
+            kept = [(None, normalize_record({"op": "add", "event": e}), None) for e in restored.values()]
+            overrides = lambda series_id: [e for e in self._events if e.get("series_id") == series_id]
+            lookup = lambda i: self._by_id.get(i) or restored.get(i)
+            for i, record, result in resolve_records(records, lookup, overrides):
+                record = normalize_record(record)
+                if record["op"] == "add":
+                    known.add(record["event"]["id"])
+                elif record["id"] not in known:
+                    continue
+                elif record["op"] == "delete":
+                    known.discard(record["id"])
+                kept.append((i, record, result))
+            results = [None] * len(records)
+            if not kept:
+                return results
+            if len(kept) == 1:
+                record = kept[0][1]
+                applied = [self._apply(record)]
+            else:
+                record = {"op": "batch", "records": [r for _, r, _ in kept]}
+                applied = self._apply(record)
+            for (i, _, result), applied in zip(kept, applied):
+                if result is not None:
+                    results[i] = applied if result == "applied" else result
+            self._append(record)
+            if restored:
+                self.archive.remove(restored.values())
+            return results
+
+    def update(self, event_id, fields, expect=None):
+        """
+        Merge fields into an existing event (or one occurrence of a
+        recurring event). Returns the updated event, or None if no event has
+        that id. Raises ConflictError if `expect` is given and the stored
+        event no longer matches it.
+        """
+        return self.write_batch([{"op": "update", "id": event_id, "fields": fields, "expect": expect}])[0]
+
+    def delete(self, event_id, expect=None):
+        """
+        Delete an event (or one occurrence of a recurring event) by id.
+        Returns True if it existed. Raises ConflictError if `expect` is
+        given and the event no longer matches it.
+        """
+        return self.write_batch([{"op": "delete", "id": event_id, "expect": expect}])[0] is not None
+
+    # ----- compaction -----
+
+    def _write_snapshot(self, events, journal_offset, base):
+        """
+        Atomically write events as the new snapshot, then drop the journal
+        records up to journal_offset that it now contains. `base` is the
+        (snapshot, journal) signature the events were read at; if another
+        process has replaced either file since, the snapshot is discarded.
+        Returns True if it was written.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = json.dumps(events, indent=2, ensure_ascii=False, default=as_dict).encode("utf-8")
+        # The slow part (serializing, writing, fsync) happens before taking any lock
+        with tracer.span("store", "write_snapshot", bytes=len(data)):
+            tmp_path = write_temp(self.path, data)
+        try:
+            with self._lock, self.lock.exclusive():
+                # Replay other processes' appends, so the tail we keep is also in memory
+                self.refresh()
+                snapshot, journal = self._current_signature()
+                base_snapshot, base_journal = base or (None, None)
+                journal_replaced = base_journal is not None and (journal is None or journal[0] != base_journal[0])
+                if snapshot != base_snapshot or journal_replaced:
+                    return False
+                os.replace(tmp_path, self.path)
+                try:
+                    with open(self.journal_path, "rb") as f:
+                        f.seek(journal_offset)
+                        tail = f.read()
+                except FileNotFoundError:
+                    tail = b""
+                if tail or os.path.exists(self.journal_path):
+                    write_atomic(self.journal_path, tail)
+                self._journal_offset = len(tail)
+                self._journal_records = tail.count(b"\n")
+                self._snapshot_sorted = True
+                self._signature = self._current_signature()
+                return True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _wait_for_compactor(self):
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot now (blocking). Returns False if
+        another process replaced the files first; nothing is lost then, the
+        journal simply stays until the next compaction.
+        """
+        self._wait_for_compactor()
+        with self._lock, self.lock.exclusive():
+            self.refresh()
+            written = self._write_snapshot(list(self._events), self._journal_offset, self._signature)
+            if written:
+                self._needs_snapshot = False
+            return written
+
+    def sort_on_disk(self):
+        """
+        Rewrite the snapshot in date order if it was modified outside the
+        store and is no longer sorted. Returns True if it was rewritten.
+        Otherwise the next write or compaction does this, as snapshots are
+        always written from the sorted in-memory view.
+        """
+        with self._lock:
+            self.refresh()
+            if self._snapshot_sorted:
+                return False
+        return self.compact()
+
+    def _compact_in_background(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        events = list(self._events)
+        offset = self._journal_offset
+        self._compactor = threading.Thread(
+            target=self._write_snapshot, args=(events, offset, self._signature), name="event-store-compactor"
+        )
+        self._compactor.start()
+
+    def save(self, events):
+        """
+        Replace every stored event and write a fresh snapshot. Raises
+        ConflictError (with the store reloaded from disk) if the snapshot
+        could not be written.
+        """
+        self._wait_for_compactor()
+        with self._lock, self.lock.exclusive():
+            events = [dict(e) for e in events]
+            for e in events:
+                e.setdefault("id", new_event_id())
+            self.refresh()
+            self._index(events)
+            if not self._write_snapshot(list(self._events), self._journal_offset, self._signature):
+                self._reload_after_conflict()
+            self.error = None
+
+    # ----- archive -----
+
+    def archive_before(self, cutoff):
+        """
+        Move one-off events dated before cutoff (a date) into the compressed
+        archive and compact the live store. Recurring and undated events
+        stay live. Returns the number of events moved.
+        """
+        self._wait_for_compactor()
+        with self._lock, self.lock.exclusive():
+            self.refresh()
+            hi = bisect.bisect_left(self._ordinals, cutoff.toordinal())
+            moving = [e for e in self._events[:hi] if not e.get("recurrence")]
+            if not moving:
+                return 0
+            # Written before the live copies go, so a crash in between only leaves duplicates
+            self.archive.add([{**e, "date_ordinal": event_ordinal(e)} for e in moving])
+            record = {"op": "archive", "ids": [e["id"] for e in moving]}
+            self._apply(record)
+            self._append(record)
+        self.compact()
+        return len(moving)
+
+    def restore_month(self, month):
+        """
+        Move an archived month ('YYYY-MM') back into the live store.
+        Returns the number of events restored.
+        """
+        with self._lock, self.lock.exclusive():
+            self.refresh()
+            events = [e for e in self.archive.load(month) if e["id"] not in self._by_id]
+            if events:
+                self.add_many(events)
+            self.archive.remove(self.archive.load(month))
+            return len(events)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Return the process-wide event store. PACLI_STORAGE selects the backend:
+    'json' (default, events/event_data.json) or 'sqlite' (events/events.db,
+    or the path in PACLI_SQLITE_PATH).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.getenv("PACLI_STORAGE", "json").strip().lower()
+            if backend == "sqlite":
+                from storage.sqlite_store import SqliteEventStore, SQLITE_FILE
+                _store = SqliteEventStore(os.getenv("PACLI_SQLITE_PATH") or SQLITE_FILE)
+            else:
+                _store = EventStore()
+        return _store
+
+
+def set_store(store):
+    """
+    Replace the process-wide event store, e.g. to point the tools at a
+    benchmark calendar. Returns the previous store.
+    """
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+        return previous
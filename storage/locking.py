@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Seconds between attempts while another process holds a msvcrt lock
+RETRY_INTERVAL = 0.05
+
+
+class FileLock:
+    """
+    Inter-process reader/writer lock on a small side file (e.g.
+    events/event_data.lock).
+
+    Uses flock() shared/exclusive locks on POSIX. msvcrt has no shared
+    locks, so on Windows both modes take the exclusive byte-range lock.
+    Re-entrant within a process: a nested acquire in the same or a weaker
+    mode is free, and a shared lock is upgraded to exclusive in place
+    (and downgraded again on exit) when a write needs it.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    def _lock_fd(self, exclusive):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            return
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(RETRY_INTERVAL)
+
+    def _unlock_fd(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _acquire(self, exclusive):
+        with self._lock:
+            if self._depth == 0:
+                if self._fd is None:
+                    # Opened once and kept, so each acquire is a single syscall
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd(exclusive)
+                self._exclusive = exclusive
+                upgraded = False
+            else:
+                upgraded = exclusive and not self._exclusive
+                if upgraded:
+                    if fcntl is not None:
+                        self._lock_fd(True)
+                    self._exclusive = True
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._exclusive = False
+                    self._unlock_fd()
+                elif upgraded:
+                    if fcntl is not None:
+                        self._lock_fd(False)
+                    self._exclusive = False
+
+    def shared(self):
+        """Hold the lock for reading; other readers may hold it too."""
+        return self._acquire(False)
+
+    def exclusive(self):
+        """Hold the lock for writing; waits for every reader and writer."""
+        return self._acquire(True)
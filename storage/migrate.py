@@ -0,0 +1,83 @@
+"""
+One-shot conversions between the JSON and SQLite event stores.
+
+Usage:
+    python -m storage.migrate to-sqlite [--json events/event_data.json] [--db events/events.db]
+    python -m storage.migrate to-json   [--json events/event_data.json] [--db events/events.db]
+    python -m storage.migrate canonicalize
+"""
+import argparse
+import json
+import os
+
+from storage.event_store import EVENTS_FILE, EventStore, get_store, with_canonical_fields, write_atomic
+from storage.sqlite_store import SQLITE_FILE, SqliteEventStore
+
+
+def json_to_sqlite(json_path=EVENTS_FILE, db_path=SQLITE_FILE):
+    """
+    Copy every event (snapshot + journal, and every archived month) from
+    the JSON store into SQLite, which keeps them all in one table.
+    Returns the number of events copied.
+    """
+    store = EventStore(json_path)
+    events = store.all()
+    live = {e["id"] for e in events}
+    for month in sorted(store.archive.months()):
+        events += [e for e in store.archive.load(month) if e["id"] not in live]
+    SqliteEventStore(db_path).save(events)
+    return len(events)
+
+
+def sqlite_to_json(db_path=SQLITE_FILE, json_path=EVENTS_FILE):
+    """
+    Export the SQLite store as a plain event_data.json array, as the
+    calendar frontend expects. Returns the number of events written.
+    """
+    events = SqliteEventStore(db_path).all()
+    json_path = os.path.abspath(json_path)
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    # Exclusive, so running PACLI processes don't interleave their writes
+    with EventStore(json_path).lock.exclusive():
+        write_atomic(json_path, json.dumps(events, indent=2, ensure_ascii=False).encode("utf-8"))
+        # A stale journal would be replayed on top of the export
+        journal_path = os.path.splitext(json_path)[0] + ".journal"
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+    return len(events)
+
+
+def canonicalize(store=None):
+    """
+    Add or refresh date_ordinal/start_minutes on every event, e.g. for files
+    written before those fields existed. Returns the number of events changed.
+    """
+    store = store or get_store()
+    events = store.all()
+    updated = [with_canonical_fields(e) for e in events]
+    changed = sum(1 for old, new in zip(events, updated) if old != new)
+    if changed:
+        store.save(updated)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert or upgrade the event stores.")
+    parser.add_argument("command", choices=["to-sqlite", "to-json", "canonicalize"])
+    parser.add_argument("--json", default=EVENTS_FILE, help="Path to event_data.json")
+    parser.add_argument("--db", default=os.getenv("PACLI_SQLITE_PATH") or SQLITE_FILE, help="Path to the SQLite database")
+    args = parser.parse_args()
+
+    if args.command == "canonicalize":
+        count = canonicalize()
+        print(f"Added date_ordinal/start_minutes to {count} events")
+    elif args.command == "to-sqlite":
+        count = json_to_sqlite(args.json, args.db)
+        print(f"Copied {count} events from {args.json} to {args.db}")
+    else:
+        count = sqlite_to_json(args.db, args.json)
+        print(f"Exported {count} events from {args.db} to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+from datetime import date, datetime, timedelta
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+# Upper bound for count, so the last occurrence can be worked out on write
+MAX_COUNT = 1000
+# until_ordinal of a series without an end
+FOREVER = date.max.toordinal()
+
+
+def _parse_date(value):
+    return datetime.strptime(str(value), "%d-%m-%Y").date()
+
+
+def _month_day(start, months):
+    """start moved by `months` months, or None if that month has no such day."""
+    index = start.year * 12 + start.month - 1 + months
+    try:
+        return start.replace(year=index // 12, month=index % 12 + 1)
+    except ValueError:
+        return None
+
+
+def normalize_rule(rule):
+    """
+    Validate a recurrence rule and return it in stored form:
+    {"freq": "daily" | "weekly" | "monthly", "interval": int,
+     "until": "DD-MM-YYYY" | None, "count": int | None, "exdates": [...]}.
+    Monthly series skip months without the start's day (e.g. the 31st).
+    Raises ValueError if the rule is invalid.
+    """
+    if isinstance(rule, str):
+        rule = {"freq": rule}
+    freq = str(rule.get("freq") or "").strip().lower()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Repeat must be one of {', '.join(FREQUENCIES)}.")
+    try:
+        interval = int(rule.get("interval") or 1)
+        count = int(rule["count"]) if rule.get("count") else None
+    except (TypeError, ValueError):
+        raise ValueError("Interval and count must be whole numbers.")
+    if interval < 1 or (count is not None and not 1 <= count <= MAX_COUNT):
+        raise ValueError(f"Interval must be at least 1 and count between 1 and {MAX_COUNT}.")
+    try:
+        until = _parse_date(rule["until"]).strftime("%d-%m-%Y") if rule.get("until") else None
+        exdates = sorted({_parse_date(d).strftime("%d-%m-%Y") for d in rule.get("exdates") or []},
+                         key=lambda d: _parse_date(d))
+    except ValueError:
+        raise ValueError("Until and exception dates must be DD-MM-YYYY.")
+    return {"freq": freq, "interval": interval, "until": until, "count": count, "exdates": exdates}
+
+
+def _dates(start, rule, lo, hi):
+    """Rule dates within [lo, hi] ignoring until/count/exdates, in order."""
+    if lo < start:
+        lo = start
+    if rule["freq"] == "monthly":
+        step = rule["interval"]
+        months = (lo.year - start.year) * 12 + lo.month - start.month
+        k = max(0, months // step)
+        while (start.year - hi.year) * 12 + start.month - hi.month + k * step <= 0:
+            day = _month_day(start, k * step)
+            k += 1
+            if day is not None and lo <= day <= hi:
+                yield day
+        return
+    step = rule["interval"] * (7 if rule["freq"] == "weekly" else 1)
+    k = -(-(lo - start).days // step)
+    day = start + timedelta(days=k * step)
+    while day <= hi:
+        yield day
+        day += timedelta(days=step)
+
+
+def until_ordinal(event):
+    """
+    Ordinal of the last possible occurrence of a recurring event (FOREVER
+    if it never ends), or None for one-off or undated events.
+    """
+    rule = event.get("recurrence")
+    if not rule:
+        return None
+    try:
+        start = _parse_date(event.get("date", ""))
+    except ValueError:
+        return None
+    last = FOREVER
+    if rule.get("until"):
+        last = min(last, _parse_date(rule["until"]).toordinal())
+    if rule.get("count"):
+        for i, day in enumerate(_dates(start, rule, start, date.max)):
+            if i + 1 == rule["count"]:
+                last = min(last, day.toordinal())
+                break
+    return last
+
+
+def occurrence_id(series_id, day):
+    return f"{series_id}@{day.strftime('%Y%m%d')}"
+
+
+def split_occurrence_id(event_id):
+    """(series id, date) for an occurrence id, or None for any other id."""
+    series_id, sep, stamp = str(event_id or "").rpartition("@")
+    if not sep:
+        return None
+    try:
+        return series_id, datetime.strptime(stamp, "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def occurrence(series, day):
+    """One occurrence of a recurring event as a plain dated event."""
+    event = {k: v for k, v in series.items() if k not in ("recurrence", "until_ordinal")}
+    event.update({
+        "id": occurrence_id(series["id"], day),
+        "date": day.strftime("%d-%m-%Y"),
+        "day": day.strftime("%A"),
+        "month": day.strftime("%B"),
+        "year": day.year,
+        "date_ordinal": day.toordinal(),
+        "series_id": series["id"],
+        "occurrence": day.strftime("%d-%m-%Y"),
+    })
+    return event
+
+
+def expand(series, start, end):
+    """
+    Occurrences of a recurring event within [start, end] (date objects),
+    skipping its exception dates. Only the window is generated, so the cost
+    does not depend on how long the series runs.
+    """
+    rule = series["recurrence"]
+    try:
+        first = _parse_date(series.get("date", ""))
+    except ValueError:
+        return []
+    last = series.get("until_ordinal")
+    if not isinstance(last, int):
+        last = until_ordinal(series)
+    if last < end.toordinal():
+        end = date.fromordinal(last)
+    skip = set(rule.get("exdates") or ())
+    return [occurrence(series, day) for day in _dates(first, rule, start, end)
+            if day.strftime("%d-%m-%Y") not in skip]
+
+
+def find_occurrence(series, day):
+    """The occurrence of series on day, or None if it doesn't occur then."""
+    for event in expand(series, day, day):
+        return event
+    return None
+
+
+# Fields a whole-series edit doesn't copy onto its overrides, which keep their own dates
+SERIES_ONLY = ("date", "day", "month", "year", "recurrence", "until_ordinal")
+
+
+def _cascade(record, overrides):
+    """Records applying a whole-series update/delete to the series' override events."""
+    if record["op"] == "delete":
+        return [{"op": "delete", "id": event["id"]} for event in overrides]
+    fields = {k: v for k, v in record.get("fields", {}).items() if k not in SERIES_ONLY}
+    if not fields:
+        return []
+    return [{"op": "update", "id": event["id"], "fields": fields} for event in overrides]
+
+
+def resolve_records(records, lookup, overrides=None):
+    """
+    Rewrite update/delete records that target a single occurrence
+    ("<series id>@YYYYMMDD") into records on stored rows: deleting an
+    occurrence adds an exception date to the series, and editing one adds
+    the exception plus an override event (a one-off copy carrying series_id
+    and its original occurrence date). `lookup(id)` returns a stored event.
+    Updates and deletes of a whole series also reach its overrides, found
+    with `overrides(series id)`: they are deleted with it, and get the same
+    edits except for dates and the rule.
+
+    Returns (index, record, result) triples, where index is the position of
+    the source record and result says what to report for it: "applied" for
+    the record's own outcome, an event (the deleted occurrence), or None.
+    Occurrences that don't exist are dropped.
+    """
+    resolved = []
+    rules = {}
+    for i, record in enumerate(records):
+        if record.get("op") not in ("update", "delete"):
+            resolved.append((i, record, "applied"))
+            continue
+        target = split_occurrence_id(record.get("id"))
+        series = lookup(target[0]) if target else None
+        if series is None or not series.get("recurrence"):
+            resolved.append((i, record, "applied"))
+            stored = lookup(record.get("id")) if overrides is not None and not target else None
+            if stored is not None and stored.get("recurrence"):
+                resolved.extend((i, cascaded, None) for cascaded in _cascade(record, overrides(record["id"])))
+            continue
+        series_id, day = target
+        current = find_occurrence(series, day)
+        if current is None:
+            continue
+        rule = rules.setdefault(series_id, dict(series["recurrence"]))
+        rule["exdates"] = sorted(set(rule.get("exdates") or []) | {current["date"]}, key=_parse_date)
+        exclude = {"op": "update", "id": series_id, "fields": {"recurrence": dict(rule)}}
+        if record["op"] == "delete":
+            resolved.append((i, exclude, current))
+        else:
+            override = {k: v for k, v in current.items() if k not in ("id", "date_ordinal", "start_minutes")}
+            resolved.append((i, exclude, None))
+            resolved.append((i, {"op": "add", "event": {**override, **record.get("fields", {})}}, "applied"))
+    return resolved
@@ -0,0 +1,208 @@
+import threading
+from collections import Counter, defaultdict
+
+from storage.event_store import get_store
+from storage.recurrence import split_occurrence_id
+from utils.date_utils import time_key
+from utils.tracing import tracer
+
+# Above this many events only the best trigram candidates get fuzzy-scored
+MAX_CANDIDATES = 200
+# Stop walking trigram postings once this many have been counted
+MAX_POSTINGS = 20000
+
+
+def normalize_name(name):
+    return " ".join(str(name or "").lower().split())
+
+
+def trigrams(text):
+    """
+    Character trigrams of text, padded so short words and word edges
+    still produce grams ('oa' -> '  o', ' oa', 'oa ').
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def rank(query, events, limit=3):
+    """
+    Fuzzy-score a short list of events against query directly, without an
+    index. Returns (event, score) pairs, best match first.
+    """
+    choices = {i: normalize_name(e["event_name"]) for i, e in enumerate(events) if e.get("event_name")}
+    if not choices:
+        return []
+    from rapidfuzz import fuzz, process
+    with tracer.span("rapidfuzz", "extract", candidates=len(choices)):
+        matches = process.extract(normalize_name(query), choices, scorer=fuzz.WRatio, limit=limit)
+    return [(events[key], score) for _, score, key in matches]
+
+
+class SearchIndex:
+    """
+    Fuzzy event-name index kept in sync with an event store.
+
+    Names and times are normalized once when an event is added (times keyed
+    by start_minutes), and a trigram -> event id map narrows large calendars
+    down to a few hundred candidates before they are scored in a single
+    rapidfuzz call. The index
+    subscribes to the store, so writes and reloads update it incrementally.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.RLock()
+        self._events = {}
+        self._names = {}
+        self._times = {}
+        self._grams = defaultdict(set)
+        self._by_time = defaultdict(set)
+        store.subscribe(self._on_change)
+        self._reset(store.all())
+
+    # ----- maintenance -----
+
+    def close(self):
+        """Stop following the store, e.g. once the index is replaced."""
+        self._store.unsubscribe(self._on_change)
+
+    def _on_change(self, op, payload):
+        if op == "reset":
+            self._reset(payload)
+        elif op == "add":
+            self._add(payload)
+        elif op == "delete":
+            self._remove(payload.get("id"))
+
+    def _reset(self, events):
+        with self._lock:
+            self._events.clear()
+            self._names.clear()
+            self._times.clear()
+            self._grams.clear()
+            self._by_time.clear()
+            for event in events:
+                self._add(event)
+
+    def _add(self, event):
+        event_id = event.get("id")
+        if not event_id or "event_name" not in event:
+            return
+        with self._lock:
+            self._remove(event_id)
+            name = normalize_name(event["event_name"])
+            time = time_key(event.get("time", ""), event.get("start_minutes"))
+            self._events[event_id] = event
+            self._names[event_id] = name
+            self._times[event_id] = time
+            self._by_time[time].add(event_id)
+            for gram in trigrams(name):
+                self._grams[gram].add(event_id)
+
+    def _remove(self, event_id):
+        with self._lock:
+            if event_id not in self._events:
+                return
+            del self._events[event_id]
+            name = self._names.pop(event_id)
+            time = self._times.pop(event_id)
+            self._by_time[time].discard(event_id)
+            if not self._by_time[time]:
+                del self._by_time[time]
+            for gram in trigrams(name):
+                postings = self._grams.get(gram)
+                if postings is not None:
+                    postings.discard(event_id)
+                    if not postings:
+                        del self._grams[gram]
+
+    # ----- queries -----
+
+    def _candidates(self, query, pool):
+        """
+        Rank ids by the number of trigrams shared with the query, visiting
+        the rarest grams first, and keep the top MAX_CANDIDATES.
+        """
+        postings = sorted(
+            (self._grams[g] for g in trigrams(query) if g in self._grams), key=len
+        )
+        counts = Counter()
+        visited = 0
+        for ids in postings:
+            if visited and visited + len(ids) > MAX_POSTINGS:
+                break
+            visited += len(ids)
+            counts.update(ids if pool is None else ids & pool)
+        return [event_id for event_id, _ in counts.most_common(MAX_CANDIDATES)]
+
+    def at_time(self, time):
+        """Return events at the same time of day as time."""
+        self._store.refresh()
+        with self._lock:
+            return [self._events[i] for i in self._by_time.get(time_key(time), ())]
+
+    def search(self, query, time=None, within=None, limit=3):
+        """
+        Fuzzy-match query against event names.
+        Args:
+            query: Event name (or part of it) to look for.
+            time: Optional time; only events at this time are considered.
+            within: Optional events (e.g. one day's) to restrict the search to.
+                Occurrences of recurring events match by their series' name,
+                and archived events (not indexed) are scored directly.
+            limit: Maximum number of matches to return.
+        Returns:
+            list: (event, score) pairs, best match first.
+        """
+        # Refresh before taking our lock; the store calls back into _on_change
+        self._store.refresh()
+        query = normalize_name(query)
+        with self._lock:
+            pool = None
+            occurrences = {}
+            unindexed = {}
+            if within is not None:
+                # Occurrences aren't indexed; search their series and map back
+                occurrences = {e["series_id"]: e for e in within if split_occurrence_id(e.get("id"))}
+                pool = ({e.get("id") for e in within} | occurrences.keys()) & self._names.keys()
+                # Nor are archived events; score those as they are
+                unindexed = {
+                    e["id"]: e for e in within
+                    if e.get("id") and "event_name" in e
+                    and e["id"] not in self._names and not split_occurrence_id(e["id"])
+                    and (not time or time_key(e.get("time", ""), e.get("start_minutes")) == time_key(time))
+                }
+            if time:
+                at_time = self._by_time.get(time_key(time), set())
+                pool = at_time if pool is None else pool & at_time
+            size = len(self._names) if pool is None else len(pool)
+            if size > MAX_CANDIDATES:
+                ids = self._candidates(query, pool)
+            else:
+                ids = self._names.keys() if pool is None else pool
+            choices = {i: self._names[i] for i in ids}
+            choices.update((i, normalize_name(e["event_name"])) for i, e in unindexed.items())
+            from rapidfuzz import fuzz, process  # imported on first search to keep startup fast
+            with tracer.span("rapidfuzz", "extract", candidates=len(choices)):
+                matches = process.extract(query, choices, scorer=fuzz.WRatio, limit=limit)
+            return [
+                (occurrences.get(key) or unindexed.get(key) or self._events[key], score) for _, score, key in matches
+            ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the search index for the process-wide event store."""
+    global _index
+    store = get_store()
+    with _index_lock:
+        # Rebuilt if the process-wide store was replaced (set_store)
+        if _index is None or _index._store is not store:
+            if _index is not None:
+                _index.close()
+            _index = SearchIndex(store)
+        return _index
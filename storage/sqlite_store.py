@@ -0,0 +1,342 @@
+import json
+import os
+import sqlite3
+import threading
+
+from storage.changelog import ChangeLog
+from storage.event_store import (
+    ConflictError, event_ordinal, new_event_id, normalize_record, same_event, with_canonical_fields,
+    with_occurrences,
+)
+from storage.recurrence import find_occurrence, resolve_records, split_occurrence_id
+from utils.tracing import tracer
+
+# Path to events/events.db
+SQLITE_FILE = os.path.join(os.path.dirname(__file__), '..', 'events', 'events.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    date_ordinal INTEGER NOT NULL,
+    event_name TEXT NOT NULL DEFAULT '',
+    public INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events(date_ordinal);
+CREATE INDEX IF NOT EXISTS idx_events_public_date ON events(public, date_ordinal);
+CREATE INDEX IF NOT EXISTS idx_events_name ON events(event_name COLLATE NOCASE);
+"""
+
+# Last possible occurrence of a recurring event (NULL for one-off events);
+# added to databases created before recurring events existed
+RULE_END_SCHEMA = """
+ALTER TABLE events ADD COLUMN rule_end INTEGER;
+"""
+RULE_END_INDEX = "CREATE INDEX IF NOT EXISTS idx_events_rule_end ON events(rule_end, date_ordinal)"
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    id UNINDEXED, event_name, extra_info
+);
+"""
+
+
+class SqliteEventStore:
+    """
+    SQLite-backed event store with the same interface as EventStore.
+
+    Each row keeps the full event as JSON plus the columns we filter on:
+    an ordinal date (indexed, so range queries are an index range scan),
+    the event name and the public flag. Names and extra_info are mirrored
+    into an FTS5 table for full-text search when SQLite supports it.
+    Recurring events also fill rule_end, so a range query only expands the
+    series that can occur within it.
+    """
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = os.path.abspath(path)
+        self._lock = threading.RLock()
+        self._conn = None
+        self.has_fts = False
+        self._data_version = None
+        self._listeners = []
+        # Bumped on every change seen by this process; see EventStore.version
+        self.version = 0
+        self.changes = ChangeLog()
+        self.error = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            if "rule_end" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+                conn.executescript(RULE_END_SCHEMA)
+            conn.execute(RULE_END_INDEX)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(event):
+        return (
+            event["id"],
+            event_ordinal(event),
+            event.get("event_name", ""),
+            0 if event.get("public", True) is False else 1,
+            event.get("until_ordinal") if event.get("recurrence") else None,
+            json.dumps(event, ensure_ascii=False),
+        )
+
+    def _upsert(self, conn, event):
+        conn.execute(
+            "INSERT OR REPLACE INTO events (id, date_ordinal, event_name, public, rule_end, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            self._row(event),
+        )
+        if self.has_fts:
+            conn.execute("DELETE FROM events_fts WHERE id = ?", (event["id"],))
+            conn.execute(
+                "INSERT INTO events_fts (id, event_name, extra_info) VALUES (?, ?, ?)",
+                (event["id"], event.get("event_name", ""), str(event.get("extra_info", ""))),
+            )
+
+    def _select(self, where="", params=()):
+        with self._lock, tracer.span("store", "sqlite_read"):
+            rows = self._connect().execute(
+                f"SELECT data FROM events {where} ORDER BY date_ordinal, rowid", params
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def subscribe(self, listener):
+        """
+        Register listener(op, payload); see EventStore.subscribe.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Stop calling a listener registered with subscribe."""
+        # Replaced rather than mutated, so a notification in progress isn't disturbed
+        self._listeners = [l for l in self._listeners if l != listener]
+
+    def _notify(self, op, payload):
+        self.version += 1
+        self.changes.record(self.version, op, payload)
+        for listener in self._listeners:
+            listener(op, payload)
+
+    def refresh(self):
+        """
+        Queries always see other writers' commits; this only reports (and
+        tells listeners) when another connection changed the database since
+        the last check.
+        """
+        with self._lock:
+            data_version = self._connect().execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return False
+            first_check = self._data_version is None
+            self._data_version = data_version
+            if first_check:
+                return False
+            self._notify("reset", self.all() if self._listeners else None)
+            return True
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # ----- queries -----
+
+    def all(self):
+        """Return every event in date order."""
+        return self._select()
+
+    def range(self, start, end, public=None):
+        """
+        Return events whose date falls within [start, end] (inclusive),
+        optionally only public (True) or private (False) ones.
+        """
+        where = "WHERE date_ordinal BETWEEN ? AND ? AND rule_end IS NULL"
+        params = [start.toordinal(), end.toordinal()]
+        series_where = "WHERE rule_end >= ? AND date_ordinal <= ?"
+        series_params = [start.toordinal(), end.toordinal()]
+        if public is not None:
+            where += " AND public = ?"
+            series_where += " AND public = ?"
+            params.append(1 if public else 0)
+            series_params.append(1 if public else 0)
+        events = self._select(where, params)
+        return with_occurrences(events, self._select(series_where, series_params), start, end)
+
+    def on_date(self, day):
+        """Return events scheduled on a single date."""
+        return self.range(day, day)
+
+    def get(self, event_id):
+        """A stored event, or one occurrence of a recurring event, by id."""
+        events = self._select("WHERE id = ?", (event_id,))
+        target = split_occurrence_id(event_id) if not events else None
+        if target:
+            series = self._select("WHERE id = ?", (target[0],))
+            if series and series[0].get("recurrence"):
+                return find_occurrence(series[0], target[1])
+        return events[0] if events else None
+
+    def changes_since(self, since):
+        """
+        Return (version, changes); see EventStore.changes_since. Writes from
+        other connections can't be diffed here and always force a resync.
+        """
+        with self._lock:
+            self.refresh()
+            return self.version, self.changes.since(since, self.version)
+
+    def search(self, text, limit=20, any_token=False):
+        """
+        Full-text search over event names and extra_info, matching every
+        word as a prefix (or any of them with any_token, e.g. to collect
+        fuzzy-match candidates). Falls back to a LIKE match on the name
+        without FTS5.
+        """
+        with self._lock, tracer.span("store", "sqlite_search"):
+            conn = self._connect()
+            if self.has_fts:
+                join = " OR " if any_token else " "
+                query = join.join(f'"{token}"*' for token in text.replace('"', " ").split())
+                if not query:
+                    return []
+                rows = conn.execute(
+                    "SELECT e.data FROM events_fts f JOIN events e ON e.id = f.id "
+                    "WHERE events_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (query, limit),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT data FROM events WHERE event_name LIKE ? ORDER BY date_ordinal LIMIT ?",
+                    (f"%{text}%", limit),
+                ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    # ----- writes -----
+
+    def add(self, event):
+        """
+        Add an event. Returns the stored event (with its id).
+        """
+        event = with_canonical_fields(event)
+        event.setdefault("id", new_event_id())
+        with self._lock:
+            conn = self._connect()
+            with tracer.span("store", "sqlite_write"), conn:
+                self._upsert(conn, event)
+            self._notify("add", event)
+        return event
+
+    def add_many(self, events):
+        """
+        Add several events in one transaction. Returns the stored events.
+        """
+        return self.write_batch([{"op": "add", "event": e} for e in events])
+
+    @staticmethod
+    def _fetch(conn, event_id):
+        row = conn.execute("SELECT data FROM events WHERE id = ?", (event_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _fetch_or_occurrence(self, conn, event_id):
+        event = self._fetch(conn, event_id)
+        target = split_occurrence_id(event_id) if event is None else None
+        if target:
+            series = self._fetch(conn, target[0])
+            if series and series.get("recurrence"):
+                return find_occurrence(series, target[1])
+        return event
+
+    def write_batch(self, records):
+        """
+        Apply add/update/delete records in one transaction; see
+        EventStore.write_batch (including "expect", ConflictError and
+        single-occurrence edits of recurring events).
+        """
+        results = [None] * len(records)
+        changes = []
+        with self._lock:
+            conn = self._connect()
+            with tracer.span("store", "sqlite_write", records=len(records)), conn:
+                # Take the write lock up front so rows read here can't change before we write
+                conn.execute("BEGIN IMMEDIATE")
+                for record in records:
+                    expect = record.get("expect")
+                    if record.get("op") != "add" and expect is not None:
+                        if not same_event(self._fetch_or_occurrence(conn, record.get("id")), expect):
+                            raise ConflictError(f"Event {record.get('id')} was changed or deleted since it was read.")
+                overrides = lambda series_id: [json.loads(data) for (data,) in conn.execute(
+                    "SELECT data FROM events WHERE json_extract(data, '$.series_id') = ?", (series_id,))]
+                lookup = lambda event_id: self._fetch(conn, event_id)
+                for i, record, result in resolve_records(records, lookup, overrides):
+                    record = normalize_record(record)
+                    if record["op"] == "add":
+                        event = record["event"]
+                    else:
+                        event = self._fetch(conn, record["id"])
+                        if event is None:
+                            continue
+                    if record["op"] == "delete":
+                        conn.execute("DELETE FROM events WHERE id = ?", (event["id"],))
+                        if self.has_fts:
+                            conn.execute("DELETE FROM events_fts WHERE id = ?", (event["id"],))
+                        changes.append(("delete", event))
+                    else:
+                        if record["op"] == "update":
+                            event = with_canonical_fields({**event, **record["fields"]})
+                        self._upsert(conn, event)
+                        changes.append(("add", event))
+                    if result is not None:
+                        results[i] = event if result == "applied" else result
+            for op, event in changes:
+                self._notify(op, event)
+        return results
+
+    def update(self, event_id, fields, expect=None):
+        """
+        Merge fields into an existing event. Returns the updated event,
+        or None if no event has that id. See EventStore.update for `expect`.
+        """
+        return self.write_batch([{"op": "update", "id": event_id, "fields": fields, "expect": expect}])[0]
+
+    def delete(self, event_id, expect=None):
+        """
+        Delete an event by id. Returns True if it existed.
+        """
+        return self.write_batch([{"op": "delete", "id": event_id, "expect": expect}])[0] is not None
+
+    def save(self, events):
+        """
+        Replace every stored event in one transaction.
+        """
+        with self._lock:
+            conn = self._connect()
+            with tracer.span("store", "sqlite_write"), conn:
+                conn.execute("DELETE FROM events")
+                if self.has_fts:
+                    conn.execute("DELETE FROM events_fts")
+                for event in events:
+                    event = dict(event)
+                    event.setdefault("id", new_event_id())
+                    self._upsert(conn, event)
+            self._notify("reset", self.all())
+
+    def sort_on_disk(self):
+        # Rows are ordered by the date index at query time
+        return False
+
+    def compact(self):
+        with self._lock:
+            self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
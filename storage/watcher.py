@@ -0,0 +1,65 @@
+import threading
+
+from storage.event_store import get_store
+
+# Seconds between checks of the store's files for changes
+POLL_INTERVAL = 1.0
+
+
+class ChangeWatcher:
+    """
+    Single background poller for event store changes.
+
+    One thread calls store.refresh() every POLL_INTERVAL seconds (a couple
+    of stat() calls when nothing changed). The store's change listener only
+    marks the watcher dirty, so changes picked up by any other reader's
+    refresh are seen too, and a burst of records read in one poll becomes a
+    single bump of `generation`. Any number of subscribers can block in
+    wait_for_change() on a shared condition, so idle listeners cost nothing
+    but a parked thread.
+    """
+
+    def __init__(self, store=None, interval=POLL_INTERVAL):
+        self.store = store or get_store()
+        self.interval = interval
+        self.generation = 0
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._dirty = False
+
+    def start(self):
+        if self._thread is None:
+            self.store.subscribe(self._on_change)
+            self.store.refresh()
+            self._dirty = False
+            self._thread = threading.Thread(target=self._run, name="event-store-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _on_change(self, op, payload):
+        self._dirty = True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.store.refresh()
+            except Exception:
+                continue
+            if self._dirty:
+                self._dirty = False
+                with self._changed:
+                    self.generation += 1
+                    self._changed.notify_all()
+
+    def wait_for_change(self, seen, timeout):
+        """
+        Block until generation moves past `seen` or timeout elapses.
+        Returns the current generation.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.generation != seen, timeout=timeout)
+            return self.generation
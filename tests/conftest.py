@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.event_store import EventStore, set_store  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    """An empty JSON event store in tmp_path, installed as the process-wide store."""
+    store = EventStore(str(tmp_path / "event_data.json"))
+    previous = set_store(store)
+    yield store
+    store._wait_for_compactor()
+    set_store(previous)
@@ -0,0 +1,39 @@
+from langchain_core.tools import tool
+
+from agents.cache import LRUCache, cached_tool
+
+calls = []
+answers = []
+
+
+@tool
+def contests(day: str) -> dict:
+    """Stand-in for a tool that may fail or fall back to stale data."""
+    calls.append(day)
+    return answers.pop(0)
+
+
+def test_failed_and_stale_results_are_not_memoized():
+    calls.clear()
+    answers[:] = [
+        {"status": "error", "message": "unreachable"},
+        {"status": "ok", "contests": ["Round 1"], "stale": True},
+        {"status": "ok", "contests": ["Round 1"]},
+    ]
+    uncacheable = []
+    cached = cached_tool(contests, LRUCache(), lambda: ("2025-08-05",), on_uncacheable=lambda: uncacheable.append(1))
+    assert cached.invoke({"day": "05-08-2025"})["status"] == "error"
+    assert cached.invoke({"day": "05-08-2025"})["stale"]
+    fresh = cached.invoke({"day": "05-08-2025"})
+    assert cached.invoke({"day": "05-08-2025"}) == fresh
+    assert len(calls) == 3 and len(uncacheable) == 2
+
+
+def test_error_messages_are_not_memoized():
+    calls.clear()
+    answers[:] = ["❌ Failed to load events.", "[]"]
+    cached = cached_tool(contests, LRUCache(), lambda: ())
+    assert cached.invoke({"day": "x"}).startswith("❌")
+    assert cached.invoke({"day": "x"}) == "[]"
+    assert cached.invoke({"day": "x"}) == "[]"
+    assert len(calls) == 2
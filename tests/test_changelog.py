@@ -0,0 +1,60 @@
+from storage.changelog import ChangeLog
+from tools.event_scheduler import build_event
+
+
+def ops(changes):
+    return [(c["op"], c["event"]["event_name"] if c["op"] == "upsert" else c["id"]) for c in changes]
+
+
+def test_since_returns_the_changes_after_a_version():
+    log = ChangeLog()
+    log.record(1, "add", {"id": "a", "event_name": "A"})
+    log.record(2, "delete", {"id": "a"})
+    assert [c["version"] for c in log.since(0, 2)] == [1, 2]
+    assert ops(log.since(1, 2)) == [("delete", "a")]
+    assert log.since(2, 2) == []
+    # A client ahead of us (e.g. after a restart) has to resync
+    assert log.since(3, 2) is None
+
+
+def test_changes_that_fell_off_the_log_force_a_resync():
+    log = ChangeLog(size=2)
+    for version in (1, 2, 3):
+        log.record(version, "add", {"id": str(version), "event_name": str(version)})
+    assert log.since(0, 3) is None
+    assert ops(log.since(1, 3)) == [("upsert", "2"), ("upsert", "3")]
+
+
+def test_reset_and_recurring_changes_clear_the_log():
+    log = ChangeLog()
+    log.record(1, "add", {"id": "a", "event_name": "A"})
+    log.record(2, "reset", [])
+    assert log.since(0, 2) is None and log.since(2, 2) == []
+    log.record(3, "add", {"id": "b", "event_name": "B"})
+    log.record(4, "add", {"id": "s", "event_name": "Standup", "recurrence": {"freq": "weekly"}})
+    assert log.since(2, 4) is None
+
+
+def test_store_delta_sequence(store):
+    start, changes = store.changes_since(0)
+    event = store.add(build_event("05-08-2025", "10:00 AM", "Amazon OA"))
+    store.update(event["id"], {"time": "11:00 AM"})
+    other = store.add(build_event("06-08-2025", "", "Standup"))
+    store.delete(event["id"])
+
+    version, changes = store.changes_since(start)
+    assert version > start
+    assert changes[0]["op"] == "upsert" and changes[-1] == {"version": version, "op": "delete", "id": event["id"]}
+    # Replaying the deltas on an empty client ends where the store is
+    client = {}
+    for change in changes:
+        if change["op"] == "upsert":
+            client[change["event"]["id"]] = change["event"]["event_name"]
+        else:
+            client.pop(change["id"], None)
+    assert client == {other["id"]: "Standup"}
+    assert store.changes_since(version) == (version, [])
+
+    # A full replace can't be diffed
+    store.save([build_event("07-08-2025", "", "Fresh")])
+    assert store.changes_since(version)[1] is None
@@ -0,0 +1,88 @@
+import importlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tools.get_codeforces_contests as codeforces
+
+
+class StubCodeforces(BaseHTTPRequestHandler):
+    status = 200
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        start = int(time.time()) + 86400
+        body = json.dumps({"status": "OK", "result": [
+            {"id": 1, "name": "Codeforces Round 1", "phase": "BEFORE", "startTimeSeconds": start,
+             "durationSeconds": 7200},
+            {"id": 0, "name": "Finished Round", "phase": "FINISHED", "startTimeSeconds": start - 864000},
+        ]}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    """The contests tool pointed at a local stub via CODEFORCES_API_URL, with a TTL of 0."""
+    StubCodeforces.status, StubCodeforces.requests = 200, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCodeforces)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("CODEFORCES_API_URL", f"http://127.0.0.1:{server.server_port}/api/contest.list")
+    monkeypatch.setenv("CODEFORCES_CACHE_TTL", "0")
+    module = importlib.reload(codeforces)
+    module._cache.path = str(tmp_path / "codeforces_cache.json")
+    yield module, server
+    server.shutdown()
+    server.server_close()
+    monkeypatch.undo()
+    importlib.reload(codeforces)
+
+
+def test_fetches_upcoming_contests(stub):
+    module, _ = stub
+    result = module.get_codeforces_contests_on_date.invoke({"date_str": None})
+    assert result["status"] == "ok" and not result.get("stale")
+    assert [c.split(",")[0] for c in result["contests"]] == ["Codeforces Round 1"]
+
+
+def test_api_error_serves_stale_copy_and_backs_off(stub):
+    module, _ = stub
+    module.get_codeforces_contests_on_date.invoke({"date_str": None})
+    StubCodeforces.status = 500
+    for _ in range(3):
+        result = module.get_codeforces_contests_on_date.invoke({"date_str": None})
+        assert result["stale"] and len(result["contests"]) == 1
+    # Only the first failure reached the API; the rest were served from the cache
+    assert StubCodeforces.requests == 2
+
+
+def test_offline_serves_cached_file(stub):
+    module, server = stub
+    module.get_codeforces_contests_on_date.invoke({"date_str": None})
+    server.shutdown()
+    server.server_close()
+    # A new process: nothing in memory, only the cache file
+    module._cache = module.ContestCache(url=module.CONTEST_LIST_URL, path=module._cache.path, ttl=0)
+    started = time.monotonic()
+    result = module.get_codeforces_contests_on_date.invoke({"date_str": None})
+    assert result["stale"] and len(result["contests"]) == 1
+    assert module.get_codeforces_contests_on_date.invoke({"date_str": None})["stale"]
+    assert time.monotonic() - started < 5
+
+
+def test_offline_without_cache_reports_an_error(stub):
+    module, server = stub
+    server.shutdown()
+    server.server_close()
+    result = module.get_codeforces_contests_on_date.invoke({"date_str": None})
+    assert result["status"] == "error"
@@ -0,0 +1,100 @@
+import multiprocessing
+
+import storage.event_store as event_store
+import tools.find_and_edit_tool as find_and_edit_tool
+from storage.event_store import ConflictError, EventStore, set_store
+from tools.event_scheduler import build_event, schedule_event
+from tools.find_and_edit_tool import find_and_edit_event
+
+WORKERS = 4
+EVENTS_PER_WORKER = 25
+INCREMENTS_PER_WORKER = 5
+DAY = "05-08-2025"
+
+
+def increment(store, event_id):
+    """Read-modify-write of the shared counter, retried on conflicts."""
+    event = store.get(event_id)
+    while True:
+        try:
+            return store.update(event_id, {"n": event["n"] + 1}, expect=event)
+        except ConflictError:
+            event = store.get(event_id)
+
+
+def worker(path, k, counter_id):
+    # Small enough that compactions race with the other writers
+    event_store.COMPACT_RECORDS = 10
+    store = EventStore(path)
+    set_store(store)
+    for i in range(EVENTS_PER_WORKER):
+        assert schedule_event.invoke({"date": DAY, "time": f"{i % 12 + 1}:00 PM", "event_name": f"Worker {k} event {i}"}).startswith("✅")
+        if i % 5 == 0:
+            result = find_and_edit_event.invoke({"event_name": f"Worker {k} notes", "field_to_edit": "extra_info",
+                                                 "new_value": f"edit {i}", "date": DAY})
+            assert result.startswith("✅"), result
+            increment(store, counter_id)
+    store._wait_for_compactor()
+
+
+def context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+def test_concurrent_writers_lose_nothing(store):
+    [counter] = store.add_many([{**build_event(DAY, "", "Counter"), "n": 0}])
+    store.add_many([build_event(DAY, "", f"Worker {k} notes") for k in range(WORKERS)])
+    store._wait_for_compactor()
+
+    ctx = context()
+    processes = [ctx.Process(target=worker, args=(store.path, k, counter["id"])) for k in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(120)
+    assert [p.exitcode for p in processes] == [0] * WORKERS
+
+    events = EventStore(store.path).all()
+    ids = [e["id"] for e in events]
+    assert len(ids) == len(set(ids))
+    assert len(events) == 1 + WORKERS + WORKERS * EVENTS_PER_WORKER
+    by_name = {e["event_name"]: e for e in events}
+    assert by_name["Counter"]["n"] == WORKERS * INCREMENTS_PER_WORKER
+    for k in range(WORKERS):
+        assert by_name[f"Worker {k} notes"]["extra_info"] == "edit 20"
+        assert all(f"Worker {k} event {i}" in by_name for i in range(EVENTS_PER_WORKER))
+
+
+def test_edit_retries_after_a_conflict(store, monkeypatch):
+    [event] = store.add_many([build_event(DAY, "10:00 AM", "Dentist")])
+    other_session = EventStore(store.path)
+    find_events = find_and_edit_tool.find_events
+    calls = []
+
+    def find_then_change(*args):
+        found = find_events(*args)
+        calls.append(found)
+        if len(calls) == 1:
+            # Another session edits the event between our read and our write
+            other_session.update(event["id"], {"time": "11:00 AM"})
+        return found
+
+    monkeypatch.setattr(find_and_edit_tool, "find_events", find_then_change)
+    original_write_batch = store.write_batch
+    conflicts = []
+
+    def write_batch(records):
+        try:
+            return original_write_batch(records)
+        except ConflictError:
+            conflicts.append(records)
+            raise
+
+    monkeypatch.setattr(store, "write_batch", write_batch)
+    result = find_and_edit_event.invoke({"event_name": "Dentist", "field_to_edit": "extra_info",
+                                         "new_value": "Bring X-rays", "date": DAY})
+    assert result.startswith("✅"), result
+    assert len(calls) == 2 and len(conflicts) == 1
+    stored = EventStore(store.path).get(event["id"])
+    assert (stored["time"], stored["extra_info"]) == ("11:00 AM", "Bring X-rays")
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from utils.date_utils import parse_time_minutes, resolve_date_phrase, time_key
+
+# A Wednesday
+TODAY = date(2025, 8, 6)
+
+
+def resolve(phrase):
+    return resolve_date_phrase(phrase, today=TODAY, fallback=False)
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("today", (date(2025, 8, 6), date(2025, 8, 6))),
+    ("Tomorrow?", (date(2025, 8, 7), date(2025, 8, 7))),
+    ("friday", (date(2025, 8, 8), date(2025, 8, 8))),
+    ("wednesday", (date(2025, 8, 6), date(2025, 8, 6))),
+    ("next wednesday", (date(2025, 8, 13), date(2025, 8, 13))),
+    ("in 2 weeks", (date(2025, 8, 20), date(2025, 8, 20))),
+    ("three days ago", (date(2025, 8, 3), date(2025, 8, 3))),
+    ("next week", (date(2025, 8, 11), date(2025, 8, 17))),
+    ("this weekend", (date(2025, 8, 9), date(2025, 8, 10))),
+    ("rest of the month", (date(2025, 8, 6), date(2025, 8, 31))),
+    ("next 10 days", (date(2025, 8, 7), date(2025, 8, 16))),
+    ("past 2 weeks", (date(2025, 7, 23), date(2025, 8, 5))),
+    ("5th of september", (date(2025, 9, 5), date(2025, 9, 5))),
+    ("january 2026", (date(2026, 1, 1), date(2026, 1, 31))),
+    ("from tomorrow to next friday", (date(2025, 8, 7), date(2025, 8, 8))),
+    ("between 5th august and 10th august", (date(2025, 8, 5), date(2025, 8, 10))),
+    ("2025-12-24", (date(2025, 12, 24), date(2025, 12, 24))),
+])
+def test_grammar(phrase, expected):
+    assert resolve(phrase) == expected
+
+
+@pytest.mark.parametrize("phrase", [
+    "whenever you like",
+    "next fortnight",
+    "31st february",
+    "from next friday to tomorrow",
+    "",
+])
+def test_unsupported_phrases_return_none(phrase):
+    assert resolve(phrase) is None
+
+
+def test_results_follow_today():
+    assert resolve_date_phrase("tomorrow", today=date(2025, 12, 31), fallback=False) == (date(2026, 1, 1), date(2026, 1, 1))
+    assert resolve("tomorrow") == (date(2025, 8, 7), date(2025, 8, 7))
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("5:00 PM", 1020), ("05:00pm", 1020), ("5pm", 1020), ("17:00", 1020), ("12:30 a.m.", 30),
+    ("", None), ("None", None), ("after lunch", None),
+])
+def test_parse_time_minutes(text, minutes):
+    assert parse_time_minutes(text) == minutes
+
+
+def test_time_key_prefers_stored_minutes():
+    assert time_key("5pm") == time_key("17:00") == 1020
+    assert time_key("whatever", 600) == 600
+    assert time_key("After Lunch") == time_key("after lunch")
@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+import send_scheduled_mail as mail
+from tools.event_scheduler import build_event
+from utils.digest import DigestEngine, make_window, parse_windows
+
+
+def span(window):
+    return window.start, window.end
+
+
+def test_window_boundaries_midweek():
+    # Wednesday
+    today = date(2025, 8, 6)
+    windows = {w.key: w for w in parse_windows("next_day, this_week,next_week,rest_of_month,next_days:3", today)}
+    assert span(windows["next_day"]) == (date(2025, 8, 7), date(2025, 8, 7))
+    assert span(windows["this_week"]) == (date(2025, 8, 6), date(2025, 8, 10))
+    assert span(windows["next_week"]) == (date(2025, 8, 11), date(2025, 8, 17))
+    assert span(windows["rest_of_month"]) == (date(2025, 8, 6), date(2025, 8, 31))
+    assert span(windows["next_days:3"]) == (date(2025, 8, 7), date(2025, 8, 9))
+
+
+def test_window_boundaries_at_the_end_of_a_week_and_month():
+    # Sunday, last day of the month
+    today = date(2025, 8, 31)
+    assert span(make_window("this_week", today)) == (today, today)
+    assert span(make_window("next_week", today)) == (date(2025, 9, 1), date(2025, 9, 7))
+    assert span(make_window("rest_of_month", today)) == (today, today)
+    assert span(make_window("next_day", date(2024, 12, 31))) == (date(2025, 1, 1), date(2025, 1, 1))
+    assert span(make_window("rest_of_month", date(2024, 2, 10)))[1] == date(2024, 2, 29)
+
+
+def test_unknown_window_is_rejected():
+    with pytest.raises(ValueError):
+        make_window("next_year", date(2025, 8, 6))
+
+
+def test_events_on_window_edges_are_included():
+    today = date(2025, 8, 6)
+    events = [build_event(d, "", f"On {d}") for d in ("06-08-2025", "07-08-2025", "10-08-2025", "11-08-2025", "17-08-2025", "18-08-2025")]
+    events[2]["public"] = False
+    engine = DigestEngine(events, parse_windows("next_day,this_week,next_week", today))
+
+    def names(key, public_only=False):
+        return [e["event_name"] for e in engine.events(key, public_only)]
+
+    assert names("next_day") == ["On 07-08-2025"]
+    assert names("this_week") == ["On 06-08-2025", "On 07-08-2025", "On 10-08-2025"]
+    assert names("this_week", public_only=True) == ["On 06-08-2025", "On 07-08-2025"]
+    assert names("next_week") == ["On 11-08-2025", "On 17-08-2025"]
+    assert "On 10-08-2025" not in engine.digest(("this_week",), public_only=True)
+
+
+class FakeDelivery:
+    sent = []
+
+    def __init__(self, username=None, password=None):
+        self.host = "smtp.test"
+
+    def send_all(self, messages):
+        FakeDelivery.sent = messages
+        return [{"ok": True, "recipient": m["To"], "attempts": 1, "error": None} for m in messages]
+
+
+def test_per_recipient_windows(store, monkeypatch):
+    store.add_many([build_event("07-08-2025", "", "Tomorrow"), build_event("15-08-2025", "", "Next week"),
+                    build_event("21-08-2025", "", "Later")])
+    monkeypatch.setattr(mail, "SMTPDelivery", FakeDelivery)
+    monkeypatch.setattr(mail, "RECIPIENT_EMAILS", ["a@example.com", "b@example.com"])
+    monkeypatch.setattr(mail, "RECIPIENT_WINDOWS", mail.parse_recipient_windows("b@example.com = next_days:14"))
+    monkeypatch.setattr(mail, "DIGEST_WINDOWS", "next_day")
+    monkeypatch.setattr(mail, "MY_EMAIL", None)
+
+    results = mail.send_scheduled_mail(today=date(2025, 8, 6))
+    assert [r["recipient"] for r in results] == ["a@example.com", "b@example.com"]
+    a, b = (m.get_body(("html",)).get_content() for m in FakeDelivery.sent)
+    assert "Tomorrow" in a and "Next week" not in a
+    assert "Tomorrow" in b and "Next week" in b and "Later" not in b
+    assert FakeDelivery.sent[1]["Subject"] == "Your Calendar: Upcoming Public Events (Next 14 Days)"
@@ -0,0 +1,40 @@
+import json
+import pickle
+
+from storage.event import Event, StringTable, as_dict
+from tools.event_scheduler import build_event
+
+
+def test_event_reads_like_its_dict():
+    data = {**build_event("05-08-2025", "5:00 PM", "Amazon OA"), "id": "abc"}
+    event = Event.from_dict(data, StringTable())
+    assert event == data and dict(event) == data and {**event} == data
+    assert event["event_name"] == "Amazon OA" and event.get("missing", "x") == "x"
+    assert "time" in event and "recurrence" not in event
+    assert len(event) == len(data) and list(event) == list(data)
+    assert as_dict(event) == data and json.loads(json.dumps(event, default=as_dict)) == data
+    assert pickle.loads(pickle.dumps(event)) == event
+
+
+def test_extra_and_missing_fields():
+    data = {"id": "s1", "event_name": "Standup", "date": "06-01-2025", "recurrence": {"freq": "weekly"}}
+    event = Event.from_dict(data, StringTable())
+    assert event == data and event.to_dict() == data
+    assert event["recurrence"] == {"freq": "weekly"}
+    assert event.get("time") is None and "time" not in event
+
+
+def test_repeated_values_are_shared():
+    strings = StringTable()
+    # Separately built strings, as json.load would produce them
+    first, second = (Event.from_dict({**build_event("05-08-2025", "5:00 PM", "".join(["Stand", "up"])), "id": str(i)},
+                                     strings) for i in range(2))
+    assert first["event_name"] is second["event_name"]
+    assert first["date"] is second["date"]
+    assert first["id"] != second["id"]
+
+
+def test_store_returns_events_that_compare_to_dicts(store):
+    added = store.add(build_event("05-08-2025", "5:00 PM", "Amazon OA"))
+    [stored] = store.all()
+    assert type(stored) is Event and stored == added
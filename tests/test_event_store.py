@@ -0,0 +1,133 @@
+import json
+import os
+
+import pytest
+
+import storage.event_store as event_store
+from storage.event import as_dict
+from storage.event_store import ConflictError, EventStore
+from tools.event_scheduler import build_event
+
+
+def names(store):
+    return sorted(e["event_name"] for e in store.all())
+
+
+def plain(store):
+    return sorted((as_dict(e) for e in store.all()), key=lambda e: e["id"])
+
+
+def test_torn_last_journal_line_is_skipped_until_complete(store):
+    for i in range(3):
+        store.add(build_event("05-08-2025", "", f"Event {i}"))
+    with open(store.journal_path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    # A crash halfway through appending the third record
+    with open(store.journal_path, "wb") as f:
+        f.write(b"".join(lines[:2]) + lines[2][:20])
+
+    reopened = EventStore(store.path)
+    assert names(reopened) == ["Event 0", "Event 1"]
+
+    with open(store.journal_path, "ab") as f:
+        f.write(lines[2][20:])
+    assert reopened.refresh()
+    assert names(reopened) == ["Event 0", "Event 1", "Event 2"]
+
+
+def test_compacts_past_the_record_threshold(store, monkeypatch):
+    monkeypatch.setattr(event_store, "COMPACT_RECORDS", 5)
+    for i in range(6):
+        store.add(build_event("05-08-2025", "", f"Event {i}"))
+    store._wait_for_compactor()
+
+    with open(store.path, encoding="utf-8") as f:
+        assert len(json.load(f)) >= 5
+    assert store._journal_records < 5
+    assert names(EventStore(store.path)) == [f"Event {i}" for i in range(6)]
+
+
+def test_compacts_past_the_byte_threshold(store, monkeypatch):
+    monkeypatch.setattr(event_store, "COMPACT_BYTES", 4096)
+    for i in range(3):
+        store.add(build_event("05-08-2025", "", f"Event {i}", extra_info="x" * 2000))
+    store._wait_for_compactor()
+
+    assert os.path.getsize(store.journal_path) < 4096
+    assert names(EventStore(store.path)) == ["Event 0", "Event 1", "Event 2"]
+
+
+def test_reload_from_journal_reaches_the_same_state(store):
+    added = store.add_many([build_event(f"0{i}-08-2025", "10:00 AM", f"Event {i}") for i in range(1, 6)])
+    store.update(added[0]["id"], {"time": "11:00 AM"})
+    store.delete(added[1]["id"])
+    store.write_batch([
+        {"op": "update", "id": added[2]["id"], "fields": {"event_name": "Renamed"}},
+        {"op": "add", "event": build_event("09-08-2025", "", "Late")},
+    ])
+    assert not os.path.exists(store.path)
+
+    from_journal = EventStore(store.path)
+    assert plain(from_journal) == plain(store)
+    store.compact()
+    assert os.path.getsize(store.journal_path) == 0
+    assert plain(EventStore(store.path)) == plain(store)
+
+
+def test_save_reports_a_snapshot_that_was_not_written(store, monkeypatch):
+    store.add(build_event("05-08-2025", "", "Kept"))
+    monkeypatch.setattr(store, "_write_snapshot", lambda events, offset, base: False)
+    with pytest.raises(ConflictError):
+        store.save([build_event("06-08-2025", "", "Lost")])
+    # Memory was reloaded, so it agrees with the disk again
+    assert names(store) == names(EventStore(store.path)) == ["Kept"]
+
+
+def test_next_write_sorts_a_file_edited_by_hand(store):
+    store.add_many([build_event(f"0{i}-08-2025", "", f"Event {i}") for i in range(1, 4)])
+    store.compact()
+    # Someone edits event_data.json while the store is running
+    with open(store.path, encoding="utf-8") as f:
+        events = json.load(f)
+    with open(store.path, "w", encoding="utf-8") as f:
+        json.dump(events[::-1], f)
+
+    store.refresh()
+    store.add(build_event("09-08-2025", "", "Late"))
+    with open(store.path, encoding="utf-8") as f:
+        assert [e["event_name"] for e in json.load(f)][:3] == ["Event 1", "Event 2", "Event 3"]
+    assert store.sort_on_disk() is False
+
+
+def test_range_is_inclusive_and_filters_public(store):
+    from datetime import date
+
+    store.add_many([build_event(d, "", f"On {d}") for d in ("04-08-2025", "05-08-2025", "07-08-2025", "08-08-2025")])
+    private = store.add({**build_event("06-08-2025", "", "Private"), "public": False})
+    # Added out of order, still returned in date order
+    store.add(build_event("05-08-2025", "", "Late addition"))
+
+    in_range = [e["event_name"] for e in store.range(date(2025, 8, 5), date(2025, 8, 7))]
+    assert in_range == ["On 05-08-2025", "Late addition", "Private", "On 07-08-2025"]
+    assert "Private" not in [e["event_name"] for e in store.range(date(2025, 8, 5), date(2025, 8, 7), public=True)]
+    assert [e["id"] for e in store.range(date(2025, 8, 1), date(2025, 8, 31), public=False)] == [private["id"]]
+    assert store.on_date(date(2025, 8, 9)) == []
+
+    # Moving an event to another date moves it in the index too
+    store.update(private["id"], {"date": "09-08-2025"})
+    assert [e["event_name"] for e in store.on_date(date(2025, 8, 9))] == ["Private"]
+    assert "Private" not in [e["event_name"] for e in store.on_date(date(2025, 8, 6))]
+
+
+def test_canonical_fields_follow_date_and_time(store):
+    from datetime import date
+
+    event = store.add(build_event("05-08-2025", "5:00 PM", "Amazon OA"))
+    assert event["date_ordinal"] == date(2025, 8, 5).toordinal() and event["start_minutes"] == 1020
+    moved = store.update(event["id"], {"date": "07-08-2025", "time": "9am"})
+    assert moved["date_ordinal"] == date(2025, 8, 7).toordinal() and moved["start_minutes"] == 540
+    assert moved["day"] == "Thursday"
+
+    # Rows written before the fields existed still sort by their date
+    assert event_store.event_ordinal({"date": "06-08-2025"}) == date(2025, 8, 6).toordinal()
+    assert event_store.event_ordinal({"date": ""}) == event_store.UNDATED
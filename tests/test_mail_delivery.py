@@ -0,0 +1,50 @@
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+from benchmarks.smtp_stub import StubSMTPServer
+from utils.mail_delivery import SMTPDelivery
+
+
+@pytest.fixture
+def smtp():
+    server = StubSMTPServer().start()
+    yield server
+    server.stop()
+
+
+def message(to):
+    msg = EmailMessage()
+    msg["From"], msg["To"], msg["Subject"] = "pacli@example.com", to, "Tomorrow"
+    msg.set_content("Nothing planned.")
+    return msg
+
+
+def test_refused_recipient_keeps_the_connection(smtp):
+    smtp.refused.add("bad@example.com")
+    delivery = SMTPDelivery("pacli", "secret", "127.0.0.1", smtp.port, "none", workers=1, backoff=0)
+    results = delivery.send_all([message(to) for to in ("a@example.com", "bad@example.com", "b@example.com")])
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert results[1]["attempts"] == 1
+    assert smtp.connections == 1 and smtp.messages == 2
+
+
+def test_failed_setup_closes_the_socket(smtp, monkeypatch):
+    closed = []
+    close = smtplib.SMTP.close
+    monkeypatch.setattr(smtplib.SMTP, "close", lambda conn: (closed.append(conn), close(conn)))
+    # The stub doesn't offer STARTTLS, so every connection fails after it is opened
+    delivery = SMTPDelivery("pacli", "secret", "127.0.0.1", smtp.port, "starttls", workers=1, retries=2, backoff=0)
+    results = delivery.send_all([message("a@example.com"), message("b@example.com")])
+    assert not any(r["ok"] for r in results)
+    assert smtp.connections == 2 and len(set(map(id, closed))) == 2
+
+
+def test_protocol_error_fails_once_and_keeps_the_connection(smtp):
+    # The stub doesn't advertise SMTPUTF8, so smtplib raises SMTPNotSupportedError
+    delivery = SMTPDelivery("pacli", "secret", "127.0.0.1", smtp.port, "none", workers=1, backoff=0)
+    results = delivery.send_all([message("a@example.com"), message("jürgen@example.com"), message("b@example.com")])
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert results[1]["attempts"] == 1 and "SMTPUTF8" in results[1]["error"]
+    assert smtp.connections == 1 and smtp.messages == 2
@@ -0,0 +1,18 @@
+from datetime import date, timedelta
+
+from storage.migrate import json_to_sqlite
+from storage.sqlite_store import SqliteEventStore
+from tools.event_scheduler import build_event
+
+
+def test_to_sqlite_copies_archived_months(store, tmp_path):
+    old = date.today() - timedelta(days=400)
+    store.add_many([build_event(old.strftime("%d-%m-%Y"), "", "Old review"),
+                    build_event(date.today().strftime("%d-%m-%Y"), "", "Standup")])
+    assert store.archive_before(date.today() - timedelta(days=100)) == 1
+    assert [e["event_name"] for e in store.all()] == ["Standup"]
+
+    db_path = str(tmp_path / "events.db")
+    assert json_to_sqlite(store.path, db_path) == 2
+    names = sorted(e["event_name"] for e in SqliteEventStore(db_path).all())
+    assert names == ["Old review", "Standup"]
@@ -0,0 +1,136 @@
+from datetime import date
+
+import pytest
+
+from storage.recurrence import expand, normalize_rule, occurrence_id, until_ordinal
+from tools.event_scheduler import build_event
+from tools.find_and_edit_tool import find_and_edit_event
+
+
+def series(start, **rule):
+    return {"id": "s1", "event_name": "Standup", "date": start, "time": "10:00 AM",
+            "recurrence": normalize_rule(rule)}
+
+
+def days(event, start=date(2024, 1, 1), end=date(2026, 12, 31)):
+    return [e["date"] for e in expand(event, start, end)]
+
+
+def test_interval_and_until():
+    assert days(series("01-01-2025", freq="daily", interval=2, until="09-01-2025")) == [
+        "01-01-2025", "03-01-2025", "05-01-2025", "07-01-2025", "09-01-2025"]
+
+
+def test_weekly_count():
+    event = series("06-01-2025", freq="weekly", interval=2, count=3)
+    assert days(event) == ["06-01-2025", "20-01-2025", "03-02-2025"]
+    assert until_ordinal(event) == date(2025, 2, 3).toordinal()
+
+
+def test_window_only_generates_its_dates():
+    event = series("01-01-2025", freq="daily")
+    assert days(event, date(2025, 6, 10), date(2025, 6, 12)) == ["10-06-2025", "11-06-2025", "12-06-2025"]
+    assert days(event, date(2024, 1, 1), date(2024, 12, 31)) == []
+
+
+@pytest.mark.parametrize("start, skipped", [
+    ("29-01-2024", ["02-2025"]),
+    ("30-01-2024", ["02-2024", "02-2025"]),
+    ("31-01-2024", ["02-2024", "04-2024", "06-2024", "09-2024", "11-2024", "02-2025", "04-2025", "06-2025",
+                    "09-2025", "11-2025"]),
+])
+def test_monthly_skips_months_without_the_day(start, skipped):
+    found = days(series(start, freq="monthly", until="31-12-2025"))
+    assert all(d.startswith(start[:2]) for d in found)
+    assert len(found) == 24 - len(skipped)
+    assert not {d[3:] for d in found} & set(skipped)
+
+
+def test_monthly_count_counts_real_occurrences():
+    event = series("31-01-2025", freq="monthly", count=3)
+    assert days(event) == ["31-01-2025", "31-03-2025", "31-05-2025"]
+    assert until_ordinal(event) == date(2025, 5, 31).toordinal()
+
+
+def test_exdates():
+    event = series("06-01-2025", freq="weekly", count=4, exdates=["13-01-2025"])
+    assert days(event) == ["06-01-2025", "20-01-2025", "27-01-2025"]
+
+
+def test_invalid_rules():
+    for rule in [{"freq": "yearly"}, {"freq": "daily", "interval": -1}, {"freq": "daily", "count": 5000}, {"freq": "daily", "until": "2025-01-01"}]:
+        with pytest.raises(ValueError):
+            normalize_rule(rule)
+
+
+@pytest.fixture
+def standup(store):
+    [event] = store.add_many([build_event("06-01-2025", "10:00 AM", "Standup", recurrence={"freq": "weekly", "count": 4})])
+    return event
+
+
+def january(store):
+    return [(e["date"], e["time"]) for e in store.range(date(2025, 1, 1), date(2025, 1, 31))]
+
+
+def test_delete_one_occurrence(store, standup):
+    assert store.delete(occurrence_id(standup["id"], date(2025, 1, 13)))
+    assert january(store) == [("06-01-2025", "10:00 AM"), ("20-01-2025", "10:00 AM"), ("27-01-2025", "10:00 AM")]
+    assert store.get(standup["id"])["recurrence"]["exdates"] == ["13-01-2025"]
+
+
+def test_edit_one_occurrence(store, standup):
+    edited = store.update(occurrence_id(standup["id"], date(2025, 1, 20)), {"time": "11:00 AM"})
+    assert edited["series_id"] == standup["id"] and edited["occurrence"] == "20-01-2025"
+    assert january(store) == [("06-01-2025", "10:00 AM"), ("13-01-2025", "10:00 AM"),
+                              ("20-01-2025", "11:00 AM"), ("27-01-2025", "10:00 AM")]
+
+
+def test_edit_occurrence_versus_whole_series(store, standup):
+    result = find_and_edit_event.invoke({"event_name": "Standup", "field_to_edit": "time",
+                                         "new_value": "9:00 AM", "date": "13-01-2025"})
+    assert result.startswith("✅"), result
+    assert [t for _, t in january(store)] == ["10:00 AM", "9:00 AM", "10:00 AM", "10:00 AM"]
+
+    result = find_and_edit_event.invoke({"event_name": "Standup", "field_to_edit": "extra_info",
+                                         "new_value": "Room 4", "date": "20-01-2025", "whole_series": True})
+    assert result == "✅ Updated 'extra_info' of all occurrences of 'Standup' to 'Room 4'.", result
+    info = {e["date"]: e["extra_info"] for e in store.range(date(2025, 1, 1), date(2025, 1, 31))}
+    # The edited occurrence is its own event now, and gets whole-series edits too
+    assert info == {"06-01-2025": "Room 4", "13-01-2025": "Room 4", "20-01-2025": "Room 4", "27-01-2025": "Room 4"}
+    assert [t for _, t in january(store)] == ["10:00 AM", "9:00 AM", "10:00 AM", "10:00 AM"]
+
+
+def test_delete_whole_series(store, standup):
+    result = find_and_edit_event.invoke({"event_name": "Standup", "field_to_edit": "delete",
+                                         "date": "27-01-2025", "whole_series": True})
+    assert result == "🗑️ Successfully deleted all occurrences of 'Standup'.", result
+    assert january(store) == []
+
+
+def test_whole_series_delete_removes_overrides(store, standup):
+    find_and_edit_event.invoke({"event_name": "Standup", "field_to_edit": "time", "new_value": "9:00 AM",
+                                "date": "13-01-2025"})
+    result = find_and_edit_event.invoke({"event_name": "Standup", "field_to_edit": "delete",
+                                         "date": "06-01-2025", "whole_series": True})
+    assert result.startswith("🗑️"), result
+    assert january(store) == []
+    assert store.all() == []
+
+
+def test_whole_series_update_reaches_overrides(store, standup):
+    store.update(occurrence_id(standup["id"], date(2025, 1, 13)), {"extra_info": "Demo day"})
+    store.update(standup["id"], {"time": "8:30 AM", "date": "07-01-2025"})
+    events = store.range(date(2025, 1, 1), date(2025, 1, 31))
+    assert {e["time"] for e in events} == {"8:30 AM"}
+    override = next(e for e in events if e.get("series_id") and "occurrence" in e and e["extra_info"] == "Demo day")
+    # Overrides keep their own date
+    assert override["date"] == "13-01-2025"
+
+
+def test_store_level_date_change_updates_day_fields(store, standup):
+    moved = store.update(occurrence_id(standup["id"], date(2025, 1, 13)), {"date": "15-01-2025"})
+    assert (moved["day"], moved["month"], moved["year"]) == ("Wednesday", "January", 2025)
+    assert moved["date_ordinal"] == date(2025, 1, 15).toordinal()
+    [added] = store.add_many([{"event_name": "Typo", "date": "01-02-2025", "day": "Monday"}])
+    assert (added["day"], added["month"], added["year"]) == ("Saturday", "February", 2025)
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from agents.router import IntentRouter
+from tools.event_scheduler import build_event
+
+
+def tomorrow():
+    return date.today() + timedelta(days=1)
+
+
+def test_date_questions_go_to_the_agent(store):
+    router = IntentRouter()
+    for text in ["what is today", "what is tomorrow", "what is the day after tomorrow", "what is in 2 days"]:
+        assert router.match(text) is None, text
+
+
+def test_schedule_questions_need_a_cue(store):
+    router = IntentRouter()
+    for text in ["what's on tomorrow", "what do i have tomorrow", "what is on my calendar next week",
+                 "what's my schedule next week", "show my events next week"]:
+        matched = router.match(text)
+        assert matched and matched[0] == "schedule", text
+
+
+def test_corrupted_store_falls_back_to_the_agent(store):
+    with open(store.path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    router = IntentRouter()
+    assert router.route("find dentist") is None
+    assert router.stats()["misses"] == 1
+
+
+def test_delete_needs_an_exact_name(store):
+    day = tomorrow().strftime("%d-%m-%Y")
+    store.add_many([build_event(day, "10:00 AM", "Amazon OA"), build_event(day, "", "Dentist")])
+    router = IntentRouter()
+    assert router.match("delete amazon on tomorrow") is None
+    assert router.route("delete amazon oa on tomorrow") is not None
+    assert [e["event_name"] for e in store.on_date(tomorrow())] == ["Dentist"]
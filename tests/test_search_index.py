@@ -0,0 +1,40 @@
+from storage.event_store import EventStore, set_store
+from storage.search_index import get_search_index
+from tools.event_scheduler import build_event
+
+
+def test_replaced_index_stops_following_the_old_store(store, tmp_path):
+    store.add(build_event("05-08-2025", "5:00 PM", "Amazon OA"))
+    old_index = get_search_index()
+    assert [e["event_name"] for e, _ in old_index.search("amazon oa")] == ["Amazon OA"]
+
+    set_store(EventStore(str(tmp_path / "other" / "event_data.json")))
+    new_index = get_search_index()
+    assert new_index is not old_index
+    assert old_index._on_change not in store._listeners
+    assert new_index.search("amazon oa") == []
+
+
+def test_sqlite_name_lookups_use_the_full_text_index(tmp_path, monkeypatch):
+    from storage.sqlite_store import SqliteEventStore
+    from tools import find_event_tool
+
+    store = SqliteEventStore(str(tmp_path / "events.db"))
+    previous = set_store(store)
+    try:
+        store.add(build_event("05-08-2025", "5:00 PM", "Amazon OA"))
+        store.add(build_event("06-08-2025", "9:00 AM", "Team standup"))
+        searches = []
+        search = store.search
+        monkeypatch.setattr(store, "search", lambda *args, **kwargs: searches.append(args) or search(*args, **kwargs))
+        built = []
+        monkeypatch.setattr(find_event_tool, "get_search_index", lambda: built.append(True))
+
+        events, error = find_event_tool.find_events("amazon", time="5:00 PM")
+        assert error is None
+        assert events[0]["event_name"] == "Amazon OA"
+        assert searches == [("amazon",)]
+        # The in-memory index was never built
+        assert built == []
+    finally:
+        set_store(previous)
@@ -0,0 +1,78 @@
+import http.client
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import serve_with_cors
+from tools.event_scheduler import build_event
+
+
+@pytest.fixture
+def server(store, monkeypatch):
+    monkeypatch.setattr(serve_with_cors.CORSRequestHandler, "log_message", lambda *args: None)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), serve_with_cors.CORSRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, path, **headers):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response
+
+
+def test_gzip_and_identity_get_different_etags(store, server):
+    store.add_many([build_event("05-08-2025", "10:00 AM", f"Event {i}", extra_info="x" * 100) for i in range(20)])
+    path = "/api/events?start=01-08-2025&end=31-08-2025"
+
+    plain = get(server, path)
+    gzipped = get(server, path, **{"Accept-Encoding": "gzip"})
+    assert gzipped.getheader("Content-Encoding") == "gzip" and plain.getheader("Content-Encoding") is None
+    assert gzipped.getheader("ETag") == plain.getheader("ETag")[:-1] + '-gz"'
+
+    assert get(server, path, **{"Accept-Encoding": "gzip", "If-None-Match": gzipped.getheader("ETag")}).status == 304
+    assert get(server, path, **{"If-None-Match": plain.getheader("ETag")}).status == 304
+    # A validator for one encoding never revalidates the other
+    assert get(server, path, **{"If-None-Match": gzipped.getheader("ETag")}).status == 200
+    assert get(server, path, **{"Accept-Encoding": "gzip", "If-None-Match": plain.getheader("ETag")}).status == 200
+
+
+def test_stream_pushes_only_real_changes(store, server, monkeypatch):
+    import json
+    from storage.watcher import ChangeWatcher
+
+    watcher = ChangeWatcher(store, interval=0.01).start()
+    monkeypatch.setattr(serve_with_cors, "watcher", watcher)
+    conn = http.client.HTTPConnection("127.0.0.1", server, timeout=5)
+    try:
+        conn.request("GET", "/events/stream")
+        response = conn.getresponse()
+
+        def next_event():
+            line = response.fp.readline()
+            response.fp.readline()
+            assert line.startswith(b"data: "), line
+            return json.loads(line[len(b"data: "):])
+
+        start = next_event()
+        assert start["boot"] == serve_with_cors.BOOT_ID
+        event = store.add(build_event("05-08-2025", "10:00 AM", "Amazon OA"))
+        pushed = next_event()
+        assert pushed["since"] == start["version"] and [c["op"] for c in pushed["changes"]] == ["upsert"]
+
+        # Reloading unchanged files is not a change; the next push is the delete
+        store._signature = None
+        store.refresh()
+        store.delete(event["id"])
+        pushed_again = next_event()
+        assert pushed_again["since"] == pushed["version"]
+        assert pushed_again["changes"] == [{"version": pushed_again["version"], "op": "delete", "id": event["id"]}]
+    finally:
+        watcher.stop()
+        conn.close()
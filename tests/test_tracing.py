@@ -0,0 +1,33 @@
+import json
+
+from utils.tracing import Tracer, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4, 5], 0.5) == 3
+    assert percentile([1, 2, 3, 4, 5], 0.95) == 5
+
+
+def test_spans_feed_stats_and_the_current_turn(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    tracer = Tracer(trace_file=str(trace_file))
+    with tracer.turn("what's on friday") as turn:
+        tracer.record("tool", "find_event", 0.002)
+        tracer.record("llm", "chat", 0.5, prompt_tokens=100, completion_tokens=20)
+    tracer.record("tool", "find_event", 0.004, turn=False)
+
+    stats = tracer.stats()
+    assert stats[("tool", "find_event")]["count"] == 2
+    assert abs(stats[("tool", "find_event")]["mean_ms"] - 3.0) < 1e-9
+    assert stats[("turn", "agent")]["count"] == 1
+    assert [s["name"] for s in turn["spans"]] == ["find_event", "chat"]
+    assert 'pacli_llm_tokens_total{type="prompt"} 100' in tracer.prometheus()
+    assert [json.loads(line)["input"] for line in trace_file.read_text().splitlines()] == ["what's on friday"]
+
+    # Another process (the HTTP server) picks up only new turns
+    server = Tracer(trace_file=None)
+    server.ingest(str(trace_file))
+    server.ingest(str(trace_file))
+    assert server.stats()[("tool", "find_event")]["count"] == 1
+    assert server.stats()[("turn", "agent")]["count"] == 1
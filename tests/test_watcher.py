@@ -0,0 +1,22 @@
+from storage.event_store import EventStore
+from storage.watcher import ChangeWatcher
+from tools.event_scheduler import build_event
+
+
+def test_generation_moves_once_per_poll_with_changes(store):
+    watcher = ChangeWatcher(store, interval=0.01).start()
+    try:
+        # Nothing changed: subscribers just time out
+        assert watcher.wait_for_change(0, timeout=0.1) == 0
+
+        # Another process writes a burst of events
+        other = EventStore(store.path)
+        other.add_many([build_event("05-08-2025", "", f"Event {i}") for i in range(3)])
+        assert watcher.wait_for_change(0, timeout=2) == 1
+        assert len(store.all()) == 3
+
+        assert watcher.wait_for_change(1, timeout=0.1) == 1
+        store.add(build_event("06-08-2025", "", "Local"))
+        assert watcher.wait_for_change(1, timeout=2) == 2
+    finally:
+        watcher.stop()
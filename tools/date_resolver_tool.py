@@ -1,6 +1,6 @@
 from langchain.tools import tool
 from datetime import datetime
-import dateparser
+from utils.date_utils import resolve_date_phrase
 
 @tool
 def resolve_day_from_date(date_str: str) -> str:
@@ -24,13 +24,25 @@ def resolve_day_from_date(date_str: str) -> str:
 @tool
 def resolve_date_from_phrase(phrase: str) -> str:
     """
-    Convert a natural language date phrase (e.g., 'next Sunday', 'this Friday') to a date string (DD-MM-YYYY).
+    Convert a natural language date phrase to a date or a date range.
+    Single days ('tomorrow', 'next Friday', 'in 2 weeks', '8th of October') give a date;
+    periods ('next week', 'this month', 'next 10 days', 'between Monday and Friday')
+    give a start and end date, with weeks running Monday to Sunday.
     Args:
         phrase (str): Natural language date phrase.
     Returns:
-        str: Date string in DD-MM-YYYY format, or error message.
+        dict: {"date", "day"} for a single day, or {"start_date", "end_date", "start_day", "end_day"}
+              for a range, dates in DD-MM-YYYY format; or an error message.
     """
-    dt = dateparser.parse(phrase)
-    if not dt:
+    period = resolve_date_phrase(phrase)
+    if not period:
         return "Could not parse the date phrase. Please try a different format."
-    return {"date": dt.strftime("%d-%m-%Y")}
+    start, end = period
+    if start == end:
+        return {"date": start.strftime("%d-%m-%Y"), "day": start.strftime("%A")}
+    return {
+        "start_date": start.strftime("%d-%m-%Y"),
+        "end_date": end.strftime("%d-%m-%Y"),
+        "start_day": start.strftime("%A"),
+        "end_day": end.strftime("%A"),
+    }
@@ -1,9 +1,6 @@
 from langchain.tools import tool
-import json
-import os
-from tools.date_resolver_tool import resolve_day_from_date
-
-EVENTS_FILE = "events/event_data.json"
+from datetime import datetime
+from storage.event_store import get_store
 
 @tool
 def edit_event(event_name: str, date: str | None, field_to_edit: str, time: str | None, new_value: str | bool = "") -> str:
@@ -20,45 +17,51 @@ def edit_event(event_name: str, date: str | None, field_to_edit: str, time: str
     Returns:
         A confirmation message about the edit or deletion.
     """
-    if not os.path.exists(EVENTS_FILE):
+    store = get_store()
+    if not store.exists():
         return "❌ Event file not found."
 
-    try:
-        with open(EVENTS_FILE, "r") as f:
-            events = json.load(f)
-    except json.JSONDecodeError:
+    events = store.all()
+    if store.error:
         return "❌ Failed to load events. The file may be corrupted."
 
-    updated = False
-    new_events = []
-    for event in events:
-        match = (
-            event.get("event_name") == event_name and
-            event.get("date") == date and
-            (time is None or time == "" or event.get("time") == time)
-        )
-        if match:
-            if field_to_edit.lower() == "delete":
-                updated = True  # Don't append this event to the new list
-                continue
-            elif field_to_edit.lower() == "date":
-                if not new_value:
-                    return "Invalid date format. Please use DD-MM-YYYY."
-                event["date"] = new_value
-                event["day"] = resolve_day_from_date(new_value)
-                updated = True
-            elif field_to_edit in event:
-                event[field_to_edit] = new_value
-                updated = True
-        new_events.append(event)
-
-    if not updated:
+    matches = [
+        event for event in events
+        if event.get("event_name") == event_name and
+        event.get("date") == date and
+        (time is None or time == "" or event.get("time") == time)
+    ]
+    if not matches:
         return None
 
+    changes = {}
+    if field_to_edit.lower() == "date":
+        try:
+            new_date = datetime.strptime(new_value, "%d-%m-%Y")
+        except (TypeError, ValueError):
+            return "Invalid date format. Please use DD-MM-YYYY."
+        changes = {
+            "date": new_date.strftime("%d-%m-%Y"),
+            "day": new_date.strftime("%A"),
+            "month": new_date.strftime("%B"),
+            "year": new_date.year,
+        }
+    elif field_to_edit.lower() != "delete":
+        changes = {field_to_edit: new_value}
+
+    records = []
+    for event in matches:
+        if field_to_edit.lower() == "delete":
+            records.append({"op": "delete", "id": event["id"], "expect": event})
+        elif field_to_edit.lower() == "date" or field_to_edit in event:
+            records.append({"op": "update", "id": event["id"], "fields": changes, "expect": event})
+
     try:
-        with open(EVENTS_FILE, "w") as f:
-            json.dump(new_events, f, indent=4)
-            
+        # All matches are written in one store transaction
+        updated = any(r is not None for r in store.write_batch(records)) if records else False
+        if not updated:
+            return None
+
         if field_to_edit.lower() == "delete":
             return f"🗑️ Successfully deleted event '{event_name}' on {date}."
         else:
@@ -1,57 +1,150 @@
 # tools/event_scheduler.py
 
-import json
-import os
 from datetime import datetime
 from langchain.tools import tool
+from storage.event_store import get_store
+from storage.recurrence import normalize_rule
+from storage.search_index import normalize_name
+from utils.date_utils import time_key
 
-# Path to events/event_data.json
-EVENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'events', 'event_data.json')
 
-@tool
-def schedule_event(date: str, time: str | None, event_name: str, extra_info: str = "", public: bool = None) -> str:
+def build_event(date: str, time: str | None, event_name: str, extra_info: str = "", public: bool = None,
+                recurrence: dict | str | None = None) -> dict:
     """
-    Schedule an event and store it in a JSON file.
-
-    Parameters:
-    - date: Date in format YYYY-MM-DD
-    - time: Time (e.g., "10:00 AM")
-    - event_name: Description or title of the event
-    - extra_info: Any additional info to store
+    Validate the fields of a new event and return it as stored. date is the
+    first occurrence when a recurrence rule is given.
+    Raises ValueError with a readable message if they are invalid.
     """
-
-    # Convert date into components
     try:
-        date_obj = datetime.strptime(date, "%d-%m-%Y")
+        date_obj = datetime.strptime(str(date), "%d-%m-%Y")
     except ValueError:
-        return "❌ Invalid date format. Use DD-MM-YYYY."
+        raise ValueError("Invalid date format. Use DD-MM-YYYY.")
+    if not str(event_name or "").strip():
+        raise ValueError("Event name is required.")
 
-    if not time:
-        time = ""
-    formatted_event = {
+    event = {
         "event_name": event_name,
         "date": date_obj.strftime("%d-%m-%Y"),
         "day": date_obj.strftime("%A"),
         "month": date_obj.strftime("%B"),
         "year": date_obj.year,
-        "time": time,
+        "time": time or "",
         "extra_info": extra_info or "None",
         "public": public if public is not None else True  # Default to public if not specified
     }
+    if recurrence:
+        event["recurrence"] = normalize_rule(recurrence)
+    return event
+
+
+def _dedup_key(event):
+    return normalize_name(event["event_name"]), event["date"], time_key(event.get("time", ""))
+
+
+def add_events(events, store=None):
+    """
+    Validate, deduplicate and store many events with a single write, e.g.
+    to import a timetable from Python.
+    Args:
+        events: dicts with date (DD-MM-YYYY), event_name and optional time, extra_info, public
+            and recurrence (e.g. {"freq": "weekly", "until": "30-11-2025"}, see storage.recurrence).
+        store: Event store to write to (default: the process-wide store).
+    Returns:
+        tuple: (added events, skipped duplicates). Events with the same name,
+               date and time as a stored event or an earlier one in the batch
+               are skipped.
+    Raises:
+        ValueError: If any event is invalid; nothing is written then.
+    """
+    store = store or get_store()
+    built, errors = [], []
+    for i, event in enumerate(events, start=1):
+        try:
+            built.append(build_event(
+                event.get("date"), event.get("time"), event.get("event_name"),
+                event.get("extra_info", ""), event.get("public"), event.get("recurrence"),
+            ))
+        except (AttributeError, ValueError) as e:
+            errors.append(f"#{i}: {e}" if isinstance(e, ValueError) else f"#{i}: not an event object")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    seen = {}
+    for day in {e["date"] for e in built}:
+        for existing in store.on_date(datetime.strptime(day, "%d-%m-%Y").date()):
+            seen[_dedup_key(existing)] = existing
+    added, duplicates = [], []
+    for event in built:
+        key = _dedup_key(event)
+        if key in seen:
+            duplicates.append(event)
+        else:
+            seen[key] = event
+            added.append(event)
+    return store.add_many(added), duplicates
+
+
+@tool
+def schedule_event(date: str, time: str | None, event_name: str, extra_info: str = "", public: bool = None,
+                   repeat: str | None = None, repeat_interval: int = 1, repeat_until: str = "",
+                   repeat_count: int | None = None, except_dates: list[str] | None = None) -> str:
+    """
+    Schedule an event and store it in a JSON file.
+    A repeating event (class, standup, ...) is stored once with its rule, not once per occurrence.
+
+    Parameters:
+    - date: Date in format YYYY-MM-DD (the first occurrence for a repeating event)
+    - time: Time (e.g., "10:00 AM")
+    - event_name: Description or title of the event
+    - extra_info: Any additional info to store
+    - repeat: Optional "daily", "weekly" or "monthly" to make the event repeat
+    - repeat_interval: Repeat every N days/weeks/months (default 1)
+    - repeat_until: Optional last date (DD-MM-YYYY) of a repeating event
+    - repeat_count: Optional number of occurrences of a repeating event
+    - except_dates: Optional dates (DD-MM-YYYY) a repeating event skips
+    """
+
+    recurrence = None
+    if repeat:
+        recurrence = {"freq": repeat, "interval": repeat_interval, "until": repeat_until,
+                      "count": repeat_count, "exdates": except_dates}
+    try:
+        formatted_event = build_event(date, time, event_name, extra_info, public, recurrence)
+    except ValueError as e:
+        return f"❌ {e}"
+
+    # Journal the new event
+    get_store().add(formatted_event)
+
+    if recurrence:
+        rule = formatted_event["recurrence"]
+        unit = {"daily": "days", "weekly": "weeks", "monthly": "months"}[rule["freq"]]
+        every = rule["freq"] if rule["interval"] == 1 else f"every {rule['interval']} {unit}"
+        end = f" until {rule['until']}" if rule["until"] else f" for {rule['count']} occurrences" if rule["count"] else ""
+        return (f"✅ Repeating event scheduled: {event_name} {every}{end}, "
+                f"starting {formatted_event['date']} at {formatted_event['time']}")
+    return f"✅ Event scheduled: {event_name} on {formatted_event['date']} at {formatted_event['time']}"
+
+
+@tool
+def schedule_events(events: list[dict]) -> str:
+    """
+    Schedule several events at once (e.g. all upcoming contests or a timetable) in a single call.
+    Events already in the calendar with the same name, date and time are skipped.
+
+    Parameters:
+    - events: List of events, each with "date" (DD-MM-YYYY), "event_name", and optionally
+      "time" (e.g. "10:00 AM"), "extra_info", "public" (true/false, default true) and "recurrence"
+      (e.g. {"freq": "weekly", "interval": 1, "until": "DD-MM-YYYY", "count": 10, "exdates": [...]})
+    """
+    try:
+        added, duplicates = add_events(events)
+    except ValueError as e:
+        return f"❌ No events scheduled. Invalid events: {e}"
 
-    # Load existing events
-    if os.path.exists(EVENTS_FILE_PATH):
-        with open(EVENTS_FILE_PATH, 'r') as f:
-            try:
-                events = json.load(f)
-            except json.JSONDecodeError:
-                events = []
-    else:
-        events = []
-
-    # Append and save
-    events.append(formatted_event)
-    with open(EVENTS_FILE_PATH, 'w') as f:
-        json.dump(events, f, indent=2)
-
-    return f"✅ Event scheduled: {event_name} on {formatted_event['date']} at {time}"
+    lines = [f"✅ Scheduled {len(added)} event(s):"]
+    lines += [f"- {e['event_name']} on {e['date']} at {e['time']}" for e in added]
+    if duplicates:
+        lines.append(f"Skipped {len(duplicates)} already scheduled: "
+                     + ", ".join(f"{e['event_name']} on {e['date']}" for e in duplicates))
+    return "\n".join(lines)
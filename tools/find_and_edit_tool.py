@@ -1,9 +1,14 @@
 from langchain.tools import tool
-from tools.find_event_tool import find_event
-from tools.edit_event_tool import edit_event
-import json
+from storage.event_store import ConflictError, get_store
+from tools.find_event_tool import find_events
 from datetime import datetime
 
+# Fields find_and_edit_event may change; day/month/year follow the date
+EDITABLE_FIELDS = ("event_name", "date", "time", "extra_info", "public")
+# Times to re-find and retry when another session edits the same event first
+EDIT_ATTEMPTS = 3
+
+
 def normalize_date(date_str):
     """
     Normalize a date string to 'DD-MM-YYYY' format.
@@ -17,68 +22,114 @@ def normalize_date(date_str):
         return None
     try:
         return datetime.strptime(date_str, "%d-%m-%Y").strftime("%d-%m-%Y")
-    except ValueError:
+    except (TypeError, ValueError):
         return None
 
+
+def build_changes(updates):
+    """
+    Validate {field: new value} edits and expand them into the stored
+    fields. Returns (changes, error).
+    """
+    changes = {}
+    for field, value in updates.items():
+        field = field.strip().lower()
+        if field not in EDITABLE_FIELDS:
+            return None, f"❌ Can't edit '{field}'. Editable fields: {', '.join(EDITABLE_FIELDS)}."
+        if field == "date":
+            new_date = normalize_date(value)
+            if not new_date:
+                return None, "Invalid date format. Please use DD-MM-YYYY."
+            day = datetime.strptime(new_date, "%d-%m-%Y")
+            changes.update({"date": new_date, "day": day.strftime("%A"), "month": day.strftime("%B"), "year": day.year})
+        elif field == "public" and isinstance(value, str):
+            changes["public"] = value.strip().lower() not in ("false", "no", "private", "0")
+        else:
+            changes[field] = value
+    return changes, None
+
+
 @tool
-def find_and_edit_event(event_name: str, field_to_edit: str, new_value: str | bool, date: str = "", time: str | None = "") -> str:
+def find_and_edit_event(event_name: str, field_to_edit: str = "", new_value: str | bool = "", date: str = "",
+                        time: str | None = "", updates: dict | None = None, whole_series: bool = False) -> str:
     """
-    Find an event by name and automatically edit a specified field in it.
-    
+    Find an event by name and automatically edit one or more fields in it, or delete it.
+
     Args:
         event_name: Name of the event to find and edit.
-        field_to_edit: The field to edit (e.g., time, date).
+        field_to_edit: The field to edit (event_name, date, time, extra_info or public). Pass 'delete' to delete the event.
         new_value: The new value for the field.
         date: (Optional) Date of the event in 'DD-MM-YYYY' format. If not provided, it will search for the event without date filtering.
         time: (Optional) Time of the event to filter by. If provided, it will only edit events that match this time.
-        
+        updates: (Optional) Several edits at once as {field: new value}, e.g. {"time": "6:00 PM", "extra_info": "Room 4"}.
+        whole_series: (Optional) For a repeating event found by date, edit or delete the whole series
+            instead of just that occurrence.
+
     Returns:
         Result of the edit operation.
     """
-    # Always pass a string for date (empty string if not provided)
-    date_arg = normalize_date(date) if date else ""
-    # Ensure date is always a string, never None
-    date_arg_str = date_arg if date_arg is not None else ""
-    time_arg = time if time is not None else ""
-    found_json = find_event.invoke({"event_name": event_name, "date": date_arg_str, "time": time_arg})
-    if "error" in found_json:
-        return "❌ Event not found. Please check the event name or date."
-    found_data = json.loads(found_json)
+    delete = (field_to_edit or "").strip().lower() == "delete"
+    edits = dict(updates or {})
+    if field_to_edit and not delete:
+        edits[field_to_edit] = new_value
+    if not delete and not edits:
+        return "❌ Nothing to edit. Pass field_to_edit and new_value, or updates."
+    changes, error = build_changes(edits)
+    if error:
+        return error
 
-    if not found_data or (isinstance(found_data, list) and len(found_data) == 0):
-        return "Event not found or invalid response from find_event."
+    # Always pass a string for date (empty string if not provided)
+    date_arg = (normalize_date(date) or "") if date else ""
+    for _ in range(EDIT_ATTEMPTS):
+        events_to_edit, error = find_events(event_name, date_arg, time or "")
+        if error:
+            return "❌ Event not found. Please check the event name or date."
+        if whole_series:
+            # Swap occurrences for the series they belong to, once each
+            store = get_store()
+            targets = {}
+            for e in events_to_edit:
+                series = store.get(e["series_id"]) if e.get("series_id") else None
+                target = series or e
+                targets.setdefault(target.get("id"), target)
+            events_to_edit = list(targets.values())
+        events_to_edit = [e for e in events_to_edit if e.get("id") and e.get("event_name") and e.get("date")]
+        if not events_to_edit:
+            return "No matching events found to edit."
 
-    if isinstance(found_data, list):
-        events_to_edit = found_data
+        # Every match is changed in one store transaction (a single write),
+        # provided none was changed by another session since it was found
+        if delete:
+            records = [{"op": "delete", "id": e["id"], "expect": e} for e in events_to_edit]
+        else:
+            records = [{"op": "update", "id": e["id"], "fields": changes, "expect": e} for e in events_to_edit]
+        try:
+            written = get_store().write_batch(records)
+            break
+        except ConflictError:
+            continue
+        except Exception as e:
+            return f"❌ Failed to save updated events: {e}"
     else:
-        events_to_edit = [found_data]
+        return "❌ The event kept changing while editing it. Please try again."
 
     results = []
-    for event in events_to_edit:
-        edit_date = event.get("date")
-        edit_name = event.get("event_name")
-        edit_time = event.get("time")
-        if not edit_name:
+    for event, result in zip(events_to_edit, written):
+        if result is None:
             continue
-        if not edit_date or not edit_name:
-            continue
-        if field_to_edit.lower() == "date":
-            new_value_norm = normalize_date(new_value)
-            if not new_value_norm:
-                results.append("Invalid date format. Please use DD-MM-YYYY.")
-                continue
-            new_value_to_use = new_value_norm
+        # A series' own date is just its first occurrence, so don't name it
+        if whole_series and event.get("recurrence"):
+            target = f"all occurrences of '{event['event_name']}'"
+        else:
+            target = f"event '{event['event_name']}' on {event['date']}"
+        if delete:
+            results.append(f"🗑️ Successfully deleted {target}.")
+        elif len(edits) == 1:
+            field, value = next(iter(edits.items()))
+            results.append(f"✅ Updated '{field}' of {target} to '{value}'.")
         else:
-            new_value_to_use = new_value
-        result = edit_event.invoke({
-            "event_name": edit_name,
-            "time": edit_time,
-            "date": edit_date,
-            "field_to_edit": field_to_edit,
-            "new_value": new_value_to_use
-        })
-        if result is not None:
-            results.append(str(result))
+            summary = ", ".join(f"{field} to '{value}'" for field, value in edits.items())
+            results.append(f"✅ Updated {target}: {summary}.")
     if not results:
         return "No matching events found to edit."
     return "\n".join(results)
@@ -1,10 +1,10 @@
 from langchain_core.tools import tool
 from datetime import datetime
-from rapidfuzz import process, fuzz
 import json
-import os
-
-EVENTS_FILE = os.path.join(os.path.dirname(__file__), '..', 'events', 'event_data.json')
+from storage.event import as_dict
+from storage.event_store import get_store
+from storage.search_index import MAX_CANDIDATES, get_search_index, rank
+from utils.date_utils import time_key
 
 def normalize_date(date_str):
     if not date_str:
@@ -20,91 +20,99 @@ def normalize_date(date_str):
             continue
     return None
 
-@tool
-def find_event(event_name: str = "", date: str = "", time: str = "") -> str:
-    
+def find_events(event_name: str = "", date: str = "", time: str = ""):
     """
-    Find a scheduled event using fuzzy matching by name, optionally filtered by date.
-    Args:
-        event_name (str): Partial or full event name (case insensitive).
-        date (str): Optional date in DD-MM-YYYY format.
-        time (str): Optional time to filter events.
+    Locate events the way find_event does, without the JSON round trip.
     Returns:
-        str: JSON string of the best matching event or list of matches.
+        tuple: (events, error). With a name, events holds the best fuzzy
+               match (with its match_score); with only a date, every event
+               that day. error is a message when nothing could be matched.
     """
-    
     # Enforce date is always a string at the function entry point
     if isinstance(date, dict):
         date = date.get('date', '')
     elif not isinstance(date, str):
         date = str(date)
-        
-    if not os.path.exists(EVENTS_FILE):
-        return "❌ Event file not found."
 
-    try:
-        with open(EVENTS_FILE, "r") as f:
-            events = json.load(f)
-    except json.JSONDecodeError:
-        return "❌ Failed to load events. File might be corrupted."
+    store = get_store()
+    if not store.exists():
+        return [], "❌ Event file not found."
+
     # String value for date has already been enforced at function entry point
     normalized_date = normalize_date(date) if date else None
+    events = None
+    if normalized_date:
+        events = store.on_date(datetime.strptime(normalized_date, "%d-%m-%Y").date())
+    else:
+        store.refresh()
+    if store.error:
+        return [], "❌ Failed to load events. File might be corrupted."
     query_name = event_name.strip().lower() if event_name and event_name.strip() else None
     query_time = time.strip().lower() if time and time.strip() else None
 
-    def normalize_time(t):
-        if not t or t == 'None':
-            return ''
-        t = t.strip().lower().replace('.', '').replace(' ', '')
-        # Try parsing 12h format with/without leading zero
-        for fmt in ["%I:%M%p", "%H:%M"]:
-            try:
-                dt = datetime.strptime(t, fmt)
-                # Always return as zero-padded 12h format (e.g., 05:00am)
-                return dt.strftime("%I:%M%p").lower().replace('.', '').replace(' ', '')
-            except:
-                continue
-        # Remove am/pm spacing
-        t = t.replace('am', 'am').replace('pm', 'pm')
-        return t
-
+    # Stores with their own full-text index (SQLite) supply name candidates,
+    # so the in-memory index is only built when that finds nothing
+    full_text = query_name and hasattr(store, "search")
     filtered = events
-    if normalized_date:
-        filtered = [e for e in filtered if e.get("date") == normalized_date]
-        if not filtered:
-            return json.dumps({"error": f"No events found on {normalized_date}."}, indent=2)
+    if normalized_date and not filtered:
+        return [], f"No events found on {normalized_date}."
 
     if query_time:
-        filtered = [e for e in filtered if normalize_time(e.get("time", "")) == normalize_time(query_time)]
-        if not filtered:
-            return json.dumps({"error": f"No events found at {time}."}, indent=2)
+        query_key = time_key(query_time)
+        if filtered is not None:
+            filtered = [e for e in filtered if time_key(e.get("time", ""), e.get("start_minutes")) == query_key]
+            no_match = not filtered
+        elif full_text:
+            # Checked against the full-text candidates below
+            no_match = False
+        else:
+            no_match = not get_search_index().at_time(query_time)
+        if no_match:
+            return [], f"No events found at {time}."
 
     if query_name:
-        # Normalize time for all events before fuzzy matching
-        norm_query_time = normalize_time(query_time) if query_time else None
-        name_map = {}
-        for e in filtered:
-            if "event_name" in e:
-                if norm_query_time is not None:
-                    if normalize_time(e.get("time", "")) != norm_query_time:
-                        continue
-                name_map[e["event_name"]] = e
-        matches = process.extract(
-            query_name,
-            name_map.keys(),
-            scorer=fuzz.WRatio,
-            limit=3
-        )
+        if full_text and filtered is None:
+            candidates = store.search(query_name, limit=MAX_CANDIDATES, any_token=True)
+            if query_time:
+                candidates = [e for e in candidates if time_key(e.get("time", ""), e.get("start_minutes")) == query_key]
+            filtered = candidates or None
+        if full_text and filtered is not None:
+            matches = rank(query_name, filtered, limit=3)
+        else:
+            # Only the index's prefiltered candidates get scored
+            matches = get_search_index().search(query_name, time=query_time, within=filtered, limit=3)
         if not matches or matches[0][1] < 60:
-            return json.dumps({"error": "No matching event found."}, indent=2)
+            return [], "No matching event found."
 
-        best_match_name, score, _ = matches[0]
-        best_event = name_map[best_match_name]
-        best_event["match_score"] = score
-        return json.dumps(best_event, indent=2, ensure_ascii=False)
+        best_event, score = matches[0]
+        best_event = {**as_dict(best_event), "match_score": score}
+        return [best_event], None
 
     # If only date was given (no event name), return all events that day
     if normalized_date:
-        return json.dumps(filtered, indent=2, ensure_ascii=False)
+        return filtered, None
 
-    return json.dumps({"error": "Please provide an event name or date."}, indent=2)
+    return [], "Please provide an event name or date."
+
+
+@tool
+def find_event(event_name: str = "", date: str = "", time: str = "") -> str:
+    
+    """
+    Find a scheduled event using fuzzy matching by name, optionally filtered by date.
+    Args:
+        event_name (str): Partial or full event name (case insensitive).
+        date (str): Optional date in DD-MM-YYYY format.
+        time (str): Optional time to filter events.
+    Returns:
+        str: JSON string of the best matching event or list of matches.
+    """
+    events, error = find_events(event_name, date, time)
+    if error:
+        # Store-level failures were always plain strings
+        if error.startswith("❌"):
+            return error
+        return json.dumps({"error": error}, indent=2)
+    if event_name and event_name.strip():
+        return json.dumps(events[0], indent=2, ensure_ascii=False)
+    return json.dumps(events, indent=2, ensure_ascii=False, default=as_dict)
@@ -1,7 +1,167 @@
-import requests
-from datetime import datetime, timedelta
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
 from langchain.tools import tool
 
+from storage.event_store import write_atomic
+
+CONTEST_LIST_URL = os.getenv("CODEFORCES_API_URL", "https://codeforces.com/api/contest.list")
+# Seconds before the cached contest list is refetched
+CACHE_TTL = int(os.getenv("CODEFORCES_CACHE_TTL", "1800"))
+# (connect, read) timeouts for the API call
+REQUEST_TIMEOUT = (3.05, 10)
+# Seconds to serve the cached copy without retrying after a failed fetch
+FAILURE_BACKOFF = 60
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', 'events', 'codeforces_cache.json')
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def to_ist(ts: int) -> datetime:
+    """Convert a UTC timestamp to an IST datetime."""
+    return datetime.fromtimestamp(ts, IST)
+
+
+class ContestCache:
+    """
+    On-disk cache of upcoming Codeforces contests.
+
+    Only contests with phase BEFORE are kept, so the cache stays small no
+    matter how long contest.list grows. Entries are refetched after `ttl`
+    seconds with a conditional request (ETag / Last-Modified) over a pooled
+    session; if the API can't be reached the last good copy is served and
+    marked stale, and the API isn't tried again for FAILURE_BACKOFF seconds.
+    Fetches run outside the lock: while one caller refreshes, the others
+    get the cached copy instead of waiting on the network. Contests are
+    also bucketed by IST date in memory so per-date lookups don't rescan
+    the list.
+    """
+
+    def __init__(self, url=CONTEST_LIST_URL, path=CACHE_FILE, ttl=CACHE_TTL, session=None):
+        self.url = url
+        self.path = os.path.abspath(path)
+        self.ttl = ttl
+        self._session = session
+        self._lock = threading.Lock()
+        self._data = None
+        self._by_date = {}
+        self._refreshing = False
+        # (time.monotonic() of the last failed fetch, its error)
+        self._failure = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            session = requests.Session()
+            retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+            self._session = session
+        return self._session
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _store(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, json.dumps(data).encode("utf-8"))
+
+    def _set(self, data):
+        self._data = data
+        by_date = {}
+        for contest in sorted(data["contests"], key=lambda c: c["startTimeSeconds"]):
+            day = to_ist(contest["startTimeSeconds"]).date()
+            by_date.setdefault(day, []).append(contest)
+        self._by_date = by_date
+
+    def _fetch(self, cached):
+        """
+        Refresh from the API. Returns the new cache payload, or raises on
+        network/API failure.
+        """
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        response = self.session.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return {**cached, "fetched_at": time.time()}
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to fetch data: {response.status_code}")
+        payload = response.json()
+        if payload.get("status") != "OK":
+            raise RuntimeError("API returned an error")
+        contests = [
+            {"id": c.get("id"), "name": c["name"], "startTimeSeconds": c["startTimeSeconds"],
+             "durationSeconds": c.get("durationSeconds")}
+            for c in payload["result"]
+            if c.get("phase") == "BEFORE" and "startTimeSeconds" in c
+        ]
+        return {
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "contests": contests,
+        }
+
+    def get(self):
+        """
+        Return (by_date, stale, error). by_date maps IST dates to contests in
+        start order; stale is True when the API was unreachable and cached
+        data was used instead; error is set only when there is no data at all.
+        """
+        with self._lock:
+            if self._data is None:
+                cached = self._load()
+                if cached:
+                    self._set(cached)
+            cached = self._data
+            if cached and time.time() - cached.get("fetched_at", 0) < self.ttl:
+                return self._by_date, False, None
+            if self._failure and time.monotonic() - self._failure[0] < FAILURE_BACKOFF:
+                return (self._by_date, True, None) if cached else ({}, False, self._failure[1])
+            if cached and self._refreshing:
+                return self._by_date, False, None
+            self._refreshing = True
+        try:
+            # requests.RequestException is an OSError
+            fresh = self._fetch(cached)
+        except (OSError, RuntimeError, ValueError) as e:
+            with self._lock:
+                self._refreshing = False
+                self._failure = (time.monotonic(), str(e))
+                if self._data:
+                    return self._by_date, True, None
+                return {}, False, str(e)
+        with self._lock:
+            self._refreshing = False
+            self._failure = None
+            self._store(fresh)
+            self._set(fresh)
+            return self._by_date, False, None
+
+
+_cache = ContestCache()
+
+
+def format_contest(contest) -> str:
+    ist_start = to_ist(contest["startTimeSeconds"])
+    date_fmt = ist_start.strftime("%d-%m-%Y")
+    time_fmt = ist_start.strftime("%I:%M %p IST")
+    return f"{contest['name']}, {date_fmt}, {time_fmt}"
+
+
 @tool
 def get_codeforces_contests_on_date(date_str: str | None) -> dict:
     """
@@ -11,43 +171,29 @@ def get_codeforces_contests_on_date(date_str: str | None) -> dict:
     Returns:
         A dictionary with a formatted list of contests or an error message.
     """
-    url = "https://codeforces.com/api/contest.list"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return {"status": "error", "message": f"Failed to fetch data: {response.status_code}"}
-
-    data = response.json()
-    if data.get("status") != "OK":
-        return {"status": "error", "message": "API returned an error"}
-
-    contests = data["result"]
-    upcoming = [c for c in contests if c.get("phase") == "BEFORE"]
-
-    matched = []
-    # helper to convert UTC timestamp to IST
-    def to_ist(ts: int) -> datetime:
-        utc_dt = datetime.utcfromtimestamp(ts)
-        return utc_dt + timedelta(hours=5, minutes=30)
-
+    target_date = None
     if date_str:
         try:
             target_date = datetime.strptime(date_str, "%d-%m-%Y").date()
         except ValueError:
             return {"status": "error", "message": "Invalid date format. Use DD-MM-YYYY."}
 
-        for contest in upcoming:
-            ist_start = to_ist(contest["startTimeSeconds"])
-            if ist_start.date() == target_date:
-                date_fmt = ist_start.strftime("%d-%m-%Y")
-                time_fmt = ist_start.strftime("%I:%M %p IST")
-                matched.append(f"{contest['name']}, {date_fmt}, {time_fmt}")
-        return {"status": "ok", "date": date_str, "contests": matched}
-
-    # no date filter: return all upcoming
-    for contest in upcoming:
-        ist_start = to_ist(contest["startTimeSeconds"])
-        date_fmt = ist_start.strftime("%d-%m-%Y")
-        time_fmt = ist_start.strftime("%I:%M %p IST")
-        matched.append(f"{contest['name']}, {date_fmt}, {time_fmt}")
-
-    return {"status": "ok", "contests": matched}
+    by_date, stale, error = _cache.get()
+    if error:
+        return {"status": "error", "message": error}
+
+    # Cached entries may have started since they were fetched
+    now = time.time()
+    if target_date:
+        contests = by_date.get(target_date, [])
+    else:
+        contests = [c for day in sorted(by_date) for c in by_date[day]]
+    matched = [format_contest(c) for c in contests if c["startTimeSeconds"] > now]
+
+    result = {"status": "ok", "contests": matched}
+    if date_str:
+        result = {"status": "ok", "date": date_str, "contests": matched}
+    if stale:
+        result["stale"] = True
+        result["message"] = "Codeforces is unreachable; showing the last cached contest list."
+    return result
@@ -1,9 +1,6 @@
 from langchain.tools import tool
 from datetime import datetime
-import json
-import os
-
-EVENTS_FILE = "events/event_data.json"
+from storage.event_store import get_store
 
 @tool
 def get_event_schedule(start_date_str: str, end_date_str: str) -> dict:
@@ -24,16 +21,15 @@ def get_event_schedule(start_date_str: str, end_date_str: str) -> dict:
             "message": "Invalid date format. Please use DD-MM-YYYY."
         }
 
-    if not os.path.exists(EVENTS_FILE):
+    store = get_store()
+    if not store.exists():
         return {
             "status": "error",
             "message": "No events have been scheduled yet."
         }
 
-    try:
-        with open(EVENTS_FILE, "r") as f:
-            events = json.load(f)
-    except json.JSONDecodeError:
+    events = store.range(start_date, end_date)
+    if store.error:
         return {
             "status": "error",
             "message": "Event file is corrupted or empty."
@@ -41,21 +37,16 @@ def get_event_schedule(start_date_str: str, end_date_str: str) -> dict:
 
     matched_events = []
     for event in events:
-        try:
-            event_date = datetime.strptime(event["date"], "%d-%m-%Y").date()
-            if start_date <= event_date <= end_date:
-                matched_events.append({
-                    "event_name": event.get("event_name", ""),
-                    "date": event.get("date", ""),
-                    "day": event.get("day", ""),
-                    "month": event.get("month", ""),
-                    "year": event.get("year", ""),
-                    "time": event.get("time", ""),
-                    "extra_info": event.get("extra_info", ""),
-                    "public": event.get("public", False)
-                })
-        except Exception:
-            continue
+        matched_events.append({
+            "event_name": event.get("event_name", ""),
+            "date": event.get("date", ""),
+            "day": event.get("day", ""),
+            "month": event.get("month", ""),
+            "year": event.get("year", ""),
+            "time": event.get("time", ""),
+            "extra_info": event.get("extra_info", ""),
+            "public": event.get("public", False)
+        })
 
     if not matched_events:
         return {
@@ -1,6 +1,6 @@
-from datetime import datetime, timedelta
-
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 def get_next_weekday(target_weekday: int, from_date: datetime = None) -> datetime:
     """
@@ -32,3 +32,218 @@ def get_next_week_range() -> tuple:
     next_sunday = next_monday + timedelta(days=6)
 
     return next_monday.date(), next_sunday.date()
+
+
+def normalize_time(t):
+    """
+    Normalize a free-form time string so equal times compare equal
+    (e.g. '5:00 PM', '05:00pm' and '17:00' all become '05:00pm').
+    Unparseable strings are returned lowercased with spaces and dots removed.
+    """
+    if not t or t == 'None':
+        return ''
+    t = t.strip().lower().replace('.', '').replace(' ', '')
+    # Try parsing 12h format with/without leading zero
+    for fmt in ["%I:%M%p", "%H:%M"]:
+        try:
+            dt = datetime.strptime(t, fmt)
+            # Always return as zero-padded 12h format (e.g., 05:00am)
+            return dt.strftime("%I:%M%p").lower()
+        except ValueError:
+            continue
+    return t
+
+
+def parse_time_minutes(t):
+    """
+    Parse a free-form time string into minutes since midnight.
+    Accepts '5:00 PM', '05:00pm', '5pm', '17:00' and similar.
+    Returns None for empty or unparseable times.
+    """
+    if not t or not isinstance(t, str) or t == 'None':
+        return None
+    t = t.strip().lower().replace('.', '').replace(' ', '')
+    for fmt in ["%I:%M%p", "%H:%M", "%I%p"]:
+        try:
+            dt = datetime.strptime(t, fmt)
+            return dt.hour * 60 + dt.minute
+        except ValueError:
+            continue
+    return None
+
+
+def time_key(t, minutes=None):
+    """
+    Comparable key for a time: minutes since midnight when known or
+    parseable, otherwise the normalized string.
+    """
+    if isinstance(minutes, int):
+        return minutes
+    parsed = parse_time_minutes(t)
+    return parsed if parsed is not None else normalize_time(t)
+
+
+DATE_FORMATS = ["%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d"]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+                "seven": 7, "eight": 8, "nine": 9, "ten": 10, "couple of": 2, "few": 3}
+# Resolved phrases kept per (phrase, today)
+PHRASE_CACHE_SIZE = 512
+
+_NUMBER = r"(?P<n>\d{1,3}|" + "|".join(NUMBER_WORDS) + r")"
+_UNIT = r"(?P<unit>day|week|month|year)s?"
+_RELATIVE = re.compile(rf"^(?:in |after )?{_NUMBER} {_UNIT}(?: from (?:now|today)| later)?$")
+_AGO = re.compile(rf"^{_NUMBER} {_UNIT} ago$")
+_WEEKDAY = re.compile(r"^(?:(?P<which>this|next|last|coming) )?(?P<weekday>" + "|".join(WEEKDAYS) + r")$")
+_NEXT_N = re.compile(rf"^(?P<which>next|last|past) {_NUMBER} (?P<unit>day|week)s?$")
+_PERIOD = re.compile(r"^(?:(?P<rest>rest of )?(?:the )?)?(?P<which>this|next|last|coming)? ?(?P<unit>week|weekend|month)$")
+_DAY_MONTH = re.compile(r"^(?P<d>\d{1,2})(?:st|nd|rd|th)?(?: of)? (?P<m>" + "|".join(MONTHS) + r")(?:,? (?P<y>\d{4}))?$")
+_MONTH_DAY = re.compile(r"^(?P<m>" + "|".join(MONTHS) + r") (?P<d>\d{1,2})(?:st|nd|rd|th)?(?:,? (?P<y>\d{4}))?$")
+_MONTH = re.compile(r"^(?:in )?(?P<m>" + "|".join(MONTHS) + r")(?: (?P<y>\d{4}))?$")
+_BETWEEN = re.compile(r"^(?:between |from )?(?P<start>.+?) (?:and|to|until|till) (?P<end>.+)$")
+
+
+def normalize_phrase(phrase: str) -> str:
+    phrase = re.sub(r"\s+", " ", str(phrase).strip().lower()).strip("?!.,")
+    for prefix in ("on ", "the "):
+        if phrase.startswith(prefix):
+            phrase = phrase[len(prefix):]
+    return phrase
+
+
+def _number(value):
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    last = ((day.replace(year=year, month=month, day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)).day
+    return day.replace(year=year, month=month, day=min(day.day, last))
+
+
+def _shift(today, n, unit):
+    if unit == "day":
+        return today + timedelta(days=n)
+    if unit == "week":
+        return today + timedelta(weeks=n)
+    return _add_months(today, n * (12 if unit == "year" else 1))
+
+
+def _month_range(day):
+    start = day.replace(day=1)
+    return start, _add_months(start, 1) - timedelta(days=1)
+
+
+def _rule_range(phrase, today):
+    """
+    Built-in grammar for common date phrases. Returns an inclusive
+    (start, end) pair of dates, equal for single days, or None.
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            day = datetime.strptime(phrase, fmt).date()
+            return day, day
+        except ValueError:
+            continue
+
+    fixed = {"today": 0, "tonight": 0, "now": 0, "tomorrow": 1, "yesterday": -1,
+             "day after tomorrow": 2, "day before yesterday": -2}
+    if phrase in fixed:
+        day = today + timedelta(days=fixed[phrase])
+        return day, day
+
+    monday = today - timedelta(days=today.weekday())
+    match = _WEEKDAY.match(phrase)
+    if match:
+        target = WEEKDAYS.index(match["weekday"])
+        if match["which"] == "next":
+            day = today + timedelta(days=(target - today.weekday()) % 7 or 7)
+        elif match["which"] == "last":
+            day = today - timedelta(days=(today.weekday() - target) % 7 or 7)
+        else:
+            day = today + timedelta(days=(target - today.weekday()) % 7)
+        return day, day
+
+    match = _RELATIVE.match(phrase)
+    if match:
+        # A bare '1 week' means one week from today, as in the system prompt
+        day = _shift(today, _number(match["n"]), match["unit"])
+        return day, day
+    match = _AGO.match(phrase)
+    if match:
+        day = _shift(today, -_number(match["n"]), match["unit"])
+        return day, day
+
+    match = _NEXT_N.match(phrase)
+    if match:
+        days = _number(match["n"]) * (7 if match["unit"] == "week" else 1)
+        if match["which"] == "next":
+            return today + timedelta(days=1), today + timedelta(days=days)
+        return today - timedelta(days=days), today - timedelta(days=1)
+
+    match = _PERIOD.match(phrase)
+    if match and (match["which"] or match["rest"]):
+        offset = {"next": 1, "coming": 1, "last": -1}.get(match["which"], 0)
+        if match["unit"] == "month":
+            start, end = _month_range(_add_months(today, offset))
+        else:
+            start = monday + timedelta(weeks=offset)
+            end = start + timedelta(days=6)
+            if match["unit"] == "weekend":
+                start = start + timedelta(days=5)
+        if match["rest"]:
+            start = max(start, today)
+        return start, end
+
+    for pattern in (_DAY_MONTH, _MONTH_DAY):
+        match = pattern.match(phrase)
+        if match:
+            try:
+                day = today.replace(year=int(match["y"] or today.year), month=MONTHS.index(match["m"]) + 1,
+                                    day=int(match["d"]))
+            except ValueError:
+                return None
+            return day, day
+    match = _MONTH.match(phrase)
+    if match:
+        return _month_range(today.replace(year=int(match["y"] or today.year), month=MONTHS.index(match["m"]) + 1, day=1))
+
+    match = _BETWEEN.match(phrase)
+    if match:
+        start, end = _rule_range(normalize_phrase(match["start"]), today), _rule_range(normalize_phrase(match["end"]), today)
+        if start and end and start[0] <= end[1]:
+            return start[0], end[1]
+    return None
+
+
+@lru_cache(maxsize=PHRASE_CACHE_SIZE)
+def _resolve(phrase, today_ordinal, fallback):
+    today = date.fromordinal(today_ordinal)
+    resolved = _rule_range(phrase, today)
+    if resolved is None and fallback:
+        import dateparser  # loads locale data; only needed for phrases the grammar misses
+        from utils.tracing import tracer
+        with tracer.span("dateparser", "parse"):
+            dt = dateparser.parse(phrase, settings={"RELATIVE_BASE": datetime.combine(today, datetime.min.time())})
+        if dt:
+            resolved = dt.date(), dt.date()
+    return resolved
+
+
+def resolve_date_phrase(phrase: str, today=None, fallback: bool = True):
+    """
+    Resolve a natural-language date phrase to an inclusive (start, end)
+    pair of dates (equal for a single day), or None.
+
+    Common phrases ('tomorrow', 'next friday', 'in 2 weeks', 'next week',
+    'rest of the month', 'between 5th august and 10th august', ...) are
+    handled by a built-in grammar; anything else goes to dateparser unless
+    fallback is False. Results are memoized per (phrase, today).
+    'next week' is the Monday to Sunday after this week; 'friday' and
+    'this friday' may be today, 'next friday' is the first one after today.
+    """
+    today = today or datetime.now().date()
+    return _resolve(normalize_phrase(phrase), today.toordinal(), fallback)
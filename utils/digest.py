@@ -0,0 +1,140 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from storage.event_store import event_ordinal
+
+# A digest section: events dated within [start, end] (date objects)
+Window = namedtuple("Window", "key heading label subject start end")
+
+DEFAULT_WINDOWS = "next_day,this_week,next_week,rest_of_month"
+
+DISCLAIMER_HTML = "<div style='font-size:0.85em;color:#888;margin-top:24px;text-align:center;'>Events may not be 100% accurate.</div>"
+
+
+def make_window(spec, today):
+    """
+    Build a Window from a spec string relative to today:
+    'next_day', 'this_week', 'next_week', 'rest_of_month' or 'next_days:N'.
+    """
+    spec = spec.strip().lower()
+    tomorrow = today + timedelta(days=1)
+    this_sunday = today + timedelta(days=(6 - today.weekday()))
+    fmt = '%d-%m-%Y'
+    if spec == "next_day":
+        return Window(spec, f"Next Day ({tomorrow.strftime(fmt)})", f"Next Day: {tomorrow.strftime(fmt)}",
+                      tomorrow.strftime(fmt), tomorrow, tomorrow)
+    if spec == "this_week":
+        span = f"{today.strftime(fmt)} to {this_sunday.strftime(fmt)}"
+        return Window(spec, f"This Week Remaining ({span})", f"This Week Remaining: {span}",
+                      f"This Week: {span}", today, this_sunday)
+    if spec == "next_week":
+        next_monday = this_sunday + timedelta(days=1)
+        next_sunday = next_monday + timedelta(days=6)
+        span = f"{next_monday.strftime(fmt)} to {next_sunday.strftime(fmt)}"
+        return Window(spec, f"Next Week ({span})", f"Next Week: {span}", f"Next Week: {span}",
+                      next_monday, next_sunday)
+    if spec == "rest_of_month":
+        month_end = (today.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        month = today.strftime('%B %Y')
+        return Window(spec, f"Remaining Events for {month}", f"Remaining Month: {month}", month,
+                      today, month_end)
+    if spec.startswith("next_days:"):
+        days = int(spec.split(":", 1)[1])
+        end = today + timedelta(days=days)
+        span = f"{tomorrow.strftime(fmt)} to {end.strftime(fmt)}"
+        return Window(spec, f"Next {days} Days ({span})", f"Next {days} Days: {span}",
+                      f"Next {days} Days", tomorrow, end)
+    raise ValueError(f"Unknown digest window: {spec}")
+
+
+def parse_windows(specs, today):
+    """Parse a comma-separated list of window specs."""
+    return [make_window(spec, today) for spec in specs.split(",") if spec.strip()]
+
+
+def render_event(e):
+    """HTML list item for one event."""
+    date_str = e.get('date', '')
+    day_str = e.get('day', '')
+    time_str = e.get('time', '')
+    extra_info = e.get('extra_info', '')
+    day_part = ' - ' + day_str if day_str else ''
+    time_part = " <span style=\"color:#3182ce;font-weight:500;\">at " + time_str + "</span>" if time_str else ''
+    extra_part = (" <span style=\"color:#555;font-style:italic;\">" + extra_info + "</span>"
+                  if extra_info and extra_info != 'None' else '')
+    return (
+        f"<li style='margin-bottom:16px;'>"
+        f"<strong style='color:#111;font-size:1.15em;'>{e['event_name']}</strong>"
+        f" <span style='color:#555;font-size:0.95em;'><b>(Date: {date_str}{day_part})</b></span>"
+        f"{time_part}{extra_part}"
+        f"</li>"
+    )
+
+
+def render_block(fragments, label):
+    """Wrap pre-rendered event fragments in the section's event list."""
+    if not fragments:
+        return f"""
+        <div style='font-family:Segoe UI,Roboto,Arial,sans-serif;padding:24px;'>
+            <h2 style='color:#222;'>No events scheduled for <span style='color:#3182ce;'>{label}</span>.</h2>
+        </div>
+        """
+    return "".join([f"""
+    <div style='font-family:Segoe UI,Roboto,Arial,sans-serif;padding:24px;'>
+        <h2 style='color:#222;'>Events for <span style='color:#3182ce;'>{label}</span>:</h2>
+        <ul style='font-size:1.1em;padding-left:18px;'>
+    """, *fragments, "</ul></div>"])
+
+
+class DigestEngine:
+    """
+    Buckets date-sorted events into digest windows in a single pass.
+
+    Every event is checked against every window once, its HTML fragment is
+    rendered at most once, and the public and full digests (for any number
+    of recipients and window sets) are assembled from those shared
+    fragments, so building all digests is O(events x windows).
+    """
+
+    def __init__(self, events, windows):
+        self.windows = {w.key: w for w in windows}
+        bounds = [(w.key, w.start.toordinal(), w.end.toordinal()) for w in self.windows.values()]
+        self._events = events
+        self._fragments = [None] * len(events)
+        self._members = {w.key: [] for w in self.windows.values()}
+        for i, e in enumerate(events):
+            ordinal = event_ordinal(e)
+            for key, start, end in bounds:
+                if start <= ordinal <= end:
+                    self._members[key].append(i)
+        self._sections = {}
+
+    def _fragment(self, i):
+        fragment = self._fragments[i]
+        if fragment is None:
+            fragment = self._fragments[i] = render_event(self._events[i])
+        return fragment
+
+    def events(self, key, public_only=False):
+        """Events in window `key`, optionally only the public ones."""
+        return [self._events[i] for i in self._members[key]
+                if not public_only or self._events[i].get('public', True)]
+
+    def section(self, key, public_only=False):
+        cache_key = (key, public_only)
+        if cache_key not in self._sections:
+            window = self.windows[key]
+            fragments = [self._fragment(i) for i in self._members[key]
+                         if not public_only or self._events[i].get('public', True)]
+            self._sections[cache_key] = (
+                f"<h2 style='color:#222;'>{window.heading}</h2>" + render_block(fragments, window.label)
+            )
+        return self._sections[cache_key]
+
+    def digest(self, keys, public_only=False):
+        """Full email body for the given windows."""
+        return "".join([*(self.section(key, public_only) for key in keys), DISCLAIMER_HTML])
+
+    def subject(self, keys, public_only=False):
+        kind = "Upcoming Public Events" if public_only else "Upcoming Events"
+        return f"Your Calendar: {kind} ({', '.join(self.windows[k].subject for k in keys)})"
@@ -0,0 +1,139 @@
+import os
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SMTP_TIMEOUT = 30
+
+# Transient failures are retried this many times with exponential backoff
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+
+
+class SMTPDelivery:
+    """
+    Sends a batch of messages over a small pool of authenticated SMTP
+    connections.
+
+    Each worker thread opens one connection (TLS handshake + login) the
+    first time it needs it and reuses it for every message it sends.
+    Dropped connections and 4xx replies are retried with exponential
+    backoff; 5xx replies fail that recipient immediately. Only a dropped
+    connection (or a 421 "closing" reply) is replaced; after a refused
+    recipient or message the same connection carries on.
+
+    Unset arguments come from the environment: SMTP_HOST (smtp.gmail.com),
+    SMTP_PORT (465), SMTP_SECURITY ('ssl', 'starttls' or 'none' for local
+    test servers) and SMTP_WORKERS (4).
+    """
+
+    def __init__(self, username=None, password=None, host=None, port=None,
+                 security=None, workers=None, retries=MAX_RETRIES,
+                 backoff=BACKOFF_SECONDS):
+        self.username = username
+        self.password = password
+        self.host = host or os.getenv('SMTP_HOST', 'smtp.gmail.com')
+        self.port = int(port or os.getenv('SMTP_PORT', '465'))
+        self.security = (security or os.getenv('SMTP_SECURITY', 'ssl')).lower()
+        self.workers = max(1, int(workers or os.getenv('SMTP_WORKERS', '4')))
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self):
+        if self.security == 'ssl':
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if self.security == 'starttls':
+                conn.starttls(context=ssl.create_default_context())
+            if self.username:
+                conn.login(self.username, self.password)
+        except BaseException:
+            # Not pooled yet, so nothing else would close it
+            conn.close()
+            raise
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _send_one(self, msg):
+        recipient = msg['To']
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self._connection().send_message(msg)
+                return {'recipient': recipient, 'ok': True, 'error': None, 'attempts': attempt}
+            except smtplib.SMTPRecipientsRefused as e:
+                transient = all(400 <= code < 500 for code, _ in e.recipients.values())
+                error, broken = e, False
+            except smtplib.SMTPResponseException as e:
+                # 5xx is permanent (bad address, auth failure, ...)
+                transient = 400 <= e.smtp_code < 500
+                # 421: the server is closing the connection
+                error, broken = e, e.smtp_code == 421
+            except smtplib.SMTPServerDisconnected as e:
+                transient = True
+                error, broken = e, True
+            except smtplib.SMTPException as e:
+                # Other protocol errors (e.g. SMTPUTF8 not supported) won't go away on retry.
+                # Checked before OSError, which SMTPException subclasses.
+                transient = False
+                error, broken = e, False
+            except OSError as e:
+                transient = True
+                error, broken = e, True
+            if broken:
+                self._drop_connection()
+            if not transient or attempt > self.retries:
+                return {'recipient': recipient, 'ok': False, 'error': str(error), 'attempts': attempt}
+            time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def send_all(self, messages):
+        """
+        Send every message, at most `workers` at a time.
+        Returns one result dict per message, in order:
+        {'recipient', 'ok', 'error', 'attempts'}.
+        """
+        if not messages:
+            return []
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(messages)),
+                                    thread_name_prefix='smtp') as pool:
+                return list(pool.map(self._send_one, messages))
+        finally:
+            self.close()
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.quit()
+            except Exception:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
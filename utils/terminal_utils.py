@@ -1,4 +1,5 @@
 from rich.console import Console
+from rich.table import Table
 from rich.theme import Theme
 
 # Custom theme for PACLI
@@ -35,3 +36,15 @@ def print_title(message):
 
 def print_event(message):
     console.print(message, style="event")
+
+def print_token(token):
+    """Print a streamed chunk of model output as-is, without a newline."""
+    console.print(token, style="event", end="", markup=False, highlight=False)
+
+def print_table(title, columns, rows):
+    table = Table(title=title, title_style="info", header_style="bold cyan")
+    for column in columns:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*[str(value) for value in row])
+    console.print(table)
@@ -0,0 +1,168 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Durations kept per span name for percentiles
+SAMPLES_PER_SPAN = 1000
+# Turns are appended here as JSON lines when set
+TRACE_FILE = os.getenv("PACLI_TRACE_FILE")
+
+_current_turn = contextvars.ContextVar("current_turn", default=None)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1))))
+    return sorted_values[rank]
+
+
+class Tracer:
+    """
+    Collects timed spans, grouped into user turns.
+
+    A span is (kind, name, seconds, attrs), e.g. ("tool", "find_event",
+    0.004, {"arg_bytes": 31}). Every span feeds per-(kind, name) aggregates
+    (count, sum, recent samples for p50/p95) and, if a turn is active in the
+    current context, that turn's span list. Finished turns can be appended
+    to a JSON lines file, and the aggregates rendered in Prometheus text
+    format.
+    """
+
+    def __init__(self, trace_file=TRACE_FILE):
+        self.trace_file = trace_file
+        self._lock = threading.Lock()
+        self._count = defaultdict(int)
+        self._sum = defaultdict(float)
+        self._samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_SPAN))
+        self._tokens = defaultdict(int)
+        self._ingest_offsets = {}
+        self._ingest_lock = threading.Lock()
+
+    def record(self, kind, name, seconds, turn=None, **attrs):
+        """
+        Add a finished span. It is attached to `turn`, or to the current
+        context's turn when None (pass False to only aggregate).
+        """
+        key = (kind, name)
+        with self._lock:
+            self._count[key] += 1
+            self._sum[key] += seconds
+            self._samples[key].append(seconds)
+            for token_type in ("prompt_tokens", "completion_tokens"):
+                if attrs.get(token_type):
+                    self._tokens[token_type] += attrs[token_type]
+        if turn is None:
+            turn = _current_turn.get()
+        if turn:
+            turn["spans"].append({"kind": kind, "name": name, "ms": round(seconds * 1000, 3), **attrs})
+
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record(kind, name, time.perf_counter() - start, **attrs)
+
+    def current_turn(self):
+        return _current_turn.get()
+
+    @contextmanager
+    def turn(self, user_input):
+        """
+        Group every span recorded in this context (including tool threads
+        that copy it) under one turn record.
+        """
+        turn = {"id": uuid.uuid4().hex[:12], "ts": time.time(), "input": user_input, "spans": []}
+        token = _current_turn.set(turn)
+        start = time.perf_counter()
+        try:
+            yield turn
+        finally:
+            _current_turn.reset(token)
+            turn["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.record("turn", turn.get("path", "agent"), turn["ms"] / 1000)
+            if self.trace_file:
+                self._export(turn)
+
+    def _export(self, turn):
+        try:
+            with open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(turn, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass
+
+    def ingest(self, path):
+        """
+        Add turns appended to a JSON lines trace file since the last call,
+        e.g. to expose the CLI's traces from the HTTP server's /metrics.
+        """
+        with self._ingest_lock:
+            try:
+                with open(path, "rb") as f:
+                    offset = self._ingest_offsets.get(path, 0)
+                    if os.fstat(f.fileno()).st_size < offset:
+                        offset = 0
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            end = data.rfind(b"\n") + 1
+            self._ingest_offsets[path] = offset + end
+        for line in data[:end].splitlines():
+            try:
+                turn = json.loads(line)
+            except ValueError:
+                continue
+            for span in turn.get("spans", []):
+                attrs = {k: v for k, v in span.items() if k not in ("kind", "name", "ms")}
+                self.record(span["kind"], span["name"], span["ms"] / 1000, turn=False, **attrs)
+            self.record("turn", turn.get("path", "agent"), turn.get("ms", 0) / 1000, turn=False)
+
+    def stats(self):
+        """Per-span aggregates: {(kind, name): {count, mean_ms, p50_ms, p95_ms}}."""
+        with self._lock:
+            snapshot = {key: (self._count[key], self._sum[key], sorted(self._samples[key])) for key in self._count}
+        return {
+            key: {
+                "count": count,
+                "mean_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+            }
+            for key, (count, total, samples) in sorted(snapshot.items())
+        }
+
+    def prometheus(self):
+        """Aggregates in Prometheus text exposition format."""
+        lines = [
+            "# HELP pacli_span_seconds Time spent in traced operations.",
+            "# TYPE pacli_span_seconds summary",
+        ]
+        with self._lock:
+            keys = sorted(self._count)
+            snapshot = {key: (self._count[key], self._sum[key], sorted(self._samples[key])) for key in keys}
+            tokens = dict(self._tokens)
+        for (kind, name), (count, total, samples) in snapshot.items():
+            labels = f'kind="{kind}",name="{name}"'
+            for q in (0.5, 0.95):
+                lines.append(f'pacli_span_seconds{{{labels},quantile="{q}"}} {percentile(samples, q):.6f}')
+            lines.append(f"pacli_span_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"pacli_span_seconds_count{{{labels}}} {count}")
+        lines += [
+            "# HELP pacli_llm_tokens_total LLM tokens used.",
+            "# TYPE pacli_llm_tokens_total counter",
+        ]
+        for token_type in ("prompt_tokens", "completion_tokens"):
+            lines.append(f'pacli_llm_tokens_total{{type="{token_type.split("_")[0]}"}} {tokens.get(token_type, 0)}')
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()